@@ -13,6 +13,13 @@ password = os.environ['DB_PASSWORD']
 db_name = os.environ['DB_NAME']
 db_port = os.environ.get('DB_PORT', '5432')  # Default PostgreSQL port is 5432
 
+# Filters the per-game pitch cache can answer. Date filters always go to SQL: Postgres accepts more
+# date formats than the cache could compare.
+CACHED_FILTERS = (
+    'pitcher_id', 'batter_id', 'catcher_id', 'inning', 'top_or_bottom', 'outs', 'strikes', 'balls',
+    'auto_pitch_type', 'play_result', 'pitch_call'
+)
+
 # Enums for specific fields
 class TopOrBottom(str, Enum):
     TOP = "Top"
@@ -114,6 +121,38 @@ def connect_to_rds():
         print(f"ERROR: Could not connect to PostgreSQL instance. {e}")
         raise e
 
+def get_cached_game_pitches(conn, params, offset):
+    """ Answer a game_id query from the per-game pitch cache in /tmp (see pitch_cache.py), filling the
+    game's entry from Postgres on a miss. Returns the page of pitches, like the SQL query below would.
+    """
+    # numpy is only imported once a query can use the cache
+    from pitch_cache import build_game_pitches, load_game_pitches, write_game_pitches
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT ingestion_version FROM game WHERE game_id = %s", (str(params.game_id),))
+        game = cur.fetchone()
+        if game is None:
+            return []
+        version, = game
+        pitches = load_game_pitches(params.game_id, version)
+        if pitches is None:
+            # every pitch of the game, like the SQL query below, including any whose Date is not the game's
+            cur.execute("SELECT * FROM pitch WHERE game_id = %s", (str(params.game_id),))
+            pitches = build_game_pitches(cur.description, cur.fetchall())
+            try:
+                write_game_pitches(params.game_id, version, pitches)
+            except OSError as e:
+                print(f"ERROR: Could not cache pitches of game {params.game_id}. {e}")
+
+    filters = []
+    for field in CACHED_FILTERS:
+        value = getattr(params, field)
+        if value is not None:
+            filters.append((field, value.value if isinstance(value, Enum) else value))
+    # same order as the SQL query: ORDER BY date, time {order}
+    order_by = [('date', False), ('time', params.order == OrderDirection.DESC)]
+    return pitches.select(filters, order_by, params.limit, offset)
+
 # Lambda handler
 def lambda_handler(event, context):
     # Get query parameters
@@ -171,6 +210,8 @@ def lambda_handler(event, context):
     if params.game_id is not None:
         filters.append("game_id = %s")
         args.append(str(params.game_id))
+        # no filter on the game's date: a pitch's Date can differ from it (ex: after midnight), and the
+        # (game_id, pitch_number) index of each season partition finds the game's rows without pruning.
     
     if params.pitcher_id is not None:
         filters.append("pitcher_id = %s")
@@ -234,18 +275,28 @@ def lambda_handler(event, context):
     query += f" ORDER BY date, time {params.order.value}"
     query += f" LIMIT %s OFFSET %s"
 
+    # A game's pitches are served from the warm container's cache when the filters allow it.
+    result = None
+    if params.game_id is not None and params.date is None and (params.date_range_start is None or params.date_range_end is None):
+        try:
+            result = get_cached_game_pitches(conn, params, offset)
+        except Exception as e:
+            print(f"ERROR: Pitch cache unavailable, querying the database. {e}")
+            conn.rollback()
+
     try:
-        with conn.cursor() as cur:
-            cur.execute(query, args)
-            rows = cur.fetchall()
-            
-            # Get the column names from the cursor
-            column_names = [desc[0] for desc in cur.description]
+        if result is None:
+            with conn.cursor() as cur:
+                cur.execute(query, args)
+                rows = cur.fetchall()
+
+                # Get the column names from the cursor
+                column_names = [desc[0] for desc in cur.description]
 
-            # Prepare the result as a list of dictionaries
-            result = [dict(zip(column_names, row)) for row in rows]
+                # Prepare the result as a list of dictionaries
+                result = [dict(zip(column_names, row)) for row in rows]
 
-            cleaned_result = replace_nan_with_none(result)
+        cleaned_result = replace_nan_with_none(result)
         return {
             'statusCode': 200,
             'body': json.dumps({
@@ -0,0 +1,225 @@
+import json
+import os
+import numpy as np
+
+# Per-game cache of 'pitch' rows in the Lambda's /tmp, so warm invocations serve a game without Postgres.
+# Entries are keyed by (game_id, game.ingestion_version), which process_trackman bumps on every re-ingest,
+# so a stale entry is never read: it just stops being looked up and is removed by the next write.
+CACHE_DIR = os.environ.get('PITCH_CACHE_DIR', '/tmp/pitch_cache')
+CACHE_MAX_BYTES = int(os.environ.get('PITCH_CACHE_MAX_BYTES', 256 * 2**20)) # Lambda's /tmp is 512 MB by default
+
+# File layout: MAGIC, the header length (uint64), a JSON header, then one array per column, each 8-byte aligned.
+# The header lists every column as {name, kind, dtype, offset} plus the string table of 'string' columns.
+MAGIC = b'PITCHES1'
+ALIGNMENT = 8
+
+# psycopg2 type codes (pg_type oids) by cached kind; every other type is cached as its str(), which is what
+# the endpoint's json.dumps(default=str) writes for dates, times, UUIDs and decimals anyway.
+REAL_OIDS = {700}         # real
+FLOAT_OIDS = {701}        # double precision
+INT_OIDS = {20, 21, 23}   # bigint, smallint, integer
+BOOL_OIDS = {16}
+
+
+def cache_path(game_id, version):
+    return os.path.join(CACHE_DIR, f'{game_id}.{version}.pitches')
+
+
+def encode_column(kind, values):
+    """ Encode one column's values (None for NULL) as (array, strings).
+
+    float  => float64, NULL as NaN
+    real   => float32, NULL as NaN
+    int    => int16 (int32 when a value does not fit), NULL as the dtype's minimum
+    bool   => int8, NULL as -1
+    string => int16/int32 codes into a table of the distinct strings, NULL as -1
+    """
+    if kind in ('float', 'real'):
+        dtype = np.float64 if kind == 'float' else np.float32
+        return np.array([np.nan if value is None else value for value in values], dtype=dtype), None
+    if kind == 'int':
+        present = [value for value in values if value is not None]
+        dtype = np.int16 if all(-2**15 < value < 2**15 for value in present) else np.int32
+        null = np.iinfo(dtype).min
+        return np.array([null if value is None else value for value in values], dtype=dtype), None
+    if kind == 'bool':
+        return np.array([-1 if value is None else value for value in values], dtype=np.int8), None
+    strings, codes = {}, []
+    for value in values:
+        codes.append(-1 if value is None else strings.setdefault(str(value), len(strings)))
+    dtype = np.int16 if len(strings) < 2**15 else np.int32
+    return np.array(codes, dtype=dtype), list(strings)
+
+
+def column_kind(type_code):
+    if type_code in REAL_OIDS:
+        return 'real'
+    if type_code in FLOAT_OIDS:
+        return 'float'
+    if type_code in INT_OIDS:
+        return 'int'
+    if type_code in BOOL_OIDS:
+        return 'bool'
+    return 'string'
+
+
+def build_game_pitches(description, rows):
+    """ Encode the result of a 'SELECT * FROM pitch' (cursor.description and fetchall()) as GamePitches. """
+    columns = {}
+    for index, column in enumerate(description):
+        kind = column_kind(column.type_code)
+        array, strings = encode_column(kind, [row[index] for row in rows])
+        columns[column.name] = (kind, array, strings)
+    return GamePitches(columns, len(rows))
+
+
+def write_game_pitches(game_id, version, pitches):
+    """ Write the game's cache entry (atomically, through a temporary file) and drop its older versions. """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    header = {'row_count': pitches.row_count, 'columns': []}
+    offset = 0
+    for name, (kind, array, strings) in pitches.columns.items():
+        header['columns'].append({'name': name, 'kind': kind, 'dtype': array.dtype.str, 'offset': offset, 'strings': strings})
+        offset += aligned(array.nbytes)
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = aligned(len(MAGIC) + 8 + len(header_bytes))
+
+    path = cache_path(game_id, version)
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+    with open(temporary_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(8, 'little'))
+        f.write(header_bytes)
+        f.write(b'\0' * (data_start - f.tell()))
+        for _, array, _ in pitches.columns.values():
+            f.write(array.tobytes())
+            f.write(b'\0' * (aligned(array.nbytes) - array.nbytes))
+    os.replace(temporary_path, path)
+
+    for file_name in os.listdir(CACHE_DIR):
+        if file_name.startswith(f'{game_id}.') and file_name != os.path.basename(path):
+            remove_quietly(os.path.join(CACHE_DIR, file_name))
+    evict(keep=path)
+
+
+def load_game_pitches(game_id, version):
+    """ Map the game's cache entry into memory. Returns GamePitches whose arrays are zero-copy views
+    of the file (pages are read on first access), or None if there is no entry for this version.
+    """
+    path = cache_path(game_id, version)
+    try:
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+    except (FileNotFoundError, ValueError):
+        return None
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        return None
+    header_length = int.from_bytes(bytes(data[len(MAGIC):len(MAGIC) + 8]), 'little')
+    header_end = len(MAGIC) + 8 + header_length
+    header = json.loads(bytes(data[len(MAGIC) + 8:header_end]))
+    data_start = aligned(header_end)
+    row_count = header['row_count']
+    columns = {}
+    for column in header['columns']:
+        start = data_start + column['offset']
+        dtype = np.dtype(column['dtype'])
+        array = np.asarray(data[start:start + row_count * dtype.itemsize]).view(dtype) # plain ndarray view: no memmap indexing overhead
+        columns[column['name']] = (column['kind'], array, column['strings'])
+    os.utime(path) # recently used entries survive eviction
+    return GamePitches(columns, row_count)
+
+
+def aligned(size):
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+def evict(keep):
+    """ Remove the least recently used entries until the cache fits in CACHE_MAX_BYTES. """
+    entries = []
+    for file_name in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, file_name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= CACHE_MAX_BYTES:
+            break
+        if path != keep:
+            remove_quietly(path)
+            total -= size
+
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class GamePitches:
+    """ A game's pitch rows as one array per column (see encode_column), queried like the endpoint's SQL. """
+
+    def __init__(self, columns, row_count):
+        self.columns = columns
+        self.row_count = row_count
+
+    def equals(self, name, value):
+        """ Mask of the rows where column = value, with SQL semantics (nothing equals NULL). """
+        kind, array, strings = self.columns[name]
+        if value is None:
+            return np.zeros(self.row_count, dtype=bool)
+        if kind == 'string':
+            value = str(value)
+            return array == strings.index(value) if value in strings else np.zeros(self.row_count, dtype=bool)
+        return array == value
+
+    def sort_key(self, name, descending=False):
+        """ Array whose ascending order is the column's order, NULLs last (first when descending, like Postgres). """
+        kind, array, strings = self.columns[name]
+        if kind == 'string':
+            ranks = np.empty(len(strings) + 1, dtype=np.int64)
+            ranks[sorted(range(len(strings)), key=strings.__getitem__)] = np.arange(len(strings))
+            ranks[-1] = len(strings) # code -1 (NULL) indexes this last rank
+            key = ranks[array]
+        elif kind in ('float', 'real'):
+            key = np.where(np.isnan(array), np.inf, array.astype(np.float64))
+        else:
+            null = array == (np.iinfo(array.dtype).min if kind == 'int' else -1)
+            key = np.where(null, np.iinfo(np.int64).max, array.astype(np.int64))
+        return -key if descending else key
+
+    def select(self, filters, order_by, limit, offset):
+        """ Rows matching every (column, value) in filters, sorted by order_by ((column, descending) pairs,
+        most significant first) and paginated, as dicts like the ones the endpoint builds from SQL rows.
+        """
+        mask = np.ones(self.row_count, dtype=bool)
+        for name, value in filters:
+            mask &= self.equals(name, value)
+        indices = np.flatnonzero(mask)
+        keys = [self.sort_key(name, descending)[indices] for name, descending in reversed(order_by) if name in self.columns]
+        if keys:
+            indices = indices[np.lexsort(keys)]
+        return self.rows(indices[offset:offset + limit])
+
+    def rows(self, indices):
+        """ The rows at indices as dicts, decoded a column at a time. NULL floats stay NaN (the endpoint maps NaN to None). """
+        names, values = [], []
+        for name, (kind, array, strings) in self.columns.items():
+            page = array[indices]
+            if kind == 'float':
+                column = page.tolist()
+            elif kind == 'real':
+                column = [float(str(value)) for value in page] # shortest decimal that reads back as the float32, like Postgres prints it
+            elif kind == 'int':
+                null = np.iinfo(array.dtype).min
+                column = [None if value == null else value for value in page.tolist()]
+            elif kind == 'bool':
+                column = [(False, True, None)[code] for code in page.tolist()]
+            else:
+                table = strings + [None] # code -1 (NULL) indexes the trailing None
+                column = [table[code] for code in page.tolist()]
+            names.append(name)
+            values.append(column)
+        return [dict(zip(names, row)) for row in zip(*values)]
@@ -0,0 +1,94 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+from functions.pitches_endpoint import pitch_cache
+from collections import namedtuple
+import datetime
+import json
+import math
+import numpy as np
+import pytest
+
+Column = namedtuple('Column', ['name', 'type_code'])
+DESCRIPTION = [
+    Column('pitch_number', 23), Column('date', 1082), Column('time', 1083), Column('inning', 23),
+    Column('pitch_call', 25), Column('rel_speed', 701), Column('detected_shift', 16),
+]
+ROWS = [
+    (1, datetime.date(2024, 6, 29), datetime.time(18, 5, 1), 1, 'StrikeCalled', 92.3, False),
+    (2, datetime.date(2024, 6, 29), datetime.time(18, 5, 30), 1, 'InPlay', None, None),
+    (3, datetime.date(2024, 6, 29), None, 2, None, 84.1, True),
+    (40000, datetime.date(2024, 6, 29), datetime.time(18, 4, 0), 2, 'InPlay', 95.0, False),
+]
+GAME_ID = '3b2c541b-adae-43a2-af9c-c694fe8d0ffb'
+
+
+class TestPitchCache:
+    @pytest.fixture(autouse=True)
+    def cache_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(pitch_cache, 'CACHE_DIR', str(tmp_path))
+        return tmp_path
+
+    def pitch_numbers(self, rows):
+        return [row['pitch_number'] for row in rows]
+
+    def test_round_trip(self):
+        pitch_cache.write_game_pitches(GAME_ID, 1, pitch_cache.build_game_pitches(DESCRIPTION, ROWS))
+        pitches = pitch_cache.load_game_pitches(GAME_ID, 1)
+        rows = pitches.select([], [], 10, 0)
+        assert rows[0] == {
+            'pitch_number': 1, 'date': '2024-06-29', 'time': '18:05:01', 'inning': 1,
+            'pitch_call': 'StrikeCalled', 'rel_speed': 92.3, 'detected_shift': False,
+        }
+        assert math.isnan(rows[1]['rel_speed']) and rows[1]['detected_shift'] is None
+        assert rows[2]['time'] is None and rows[2]['pitch_call'] is None
+        assert rows[3]['pitch_number'] == 40000 # does not fit int16, stored as int32
+
+    def test_cached_rows_equal_sql_rows(self):
+        description = DESCRIPTION + [Column('rel_height', 701), Column('plate_loc_side', 700)]
+        # as psycopg2 returns them; a real is read from the shortest decimal Postgres prints for it
+        rows = [row + values for row, values in zip(ROWS, [(2250.12345, -0.7163), (5.913387904, None), (1e-07, 1.2345678), (None, 92.3)])]
+        pitch_cache.write_game_pitches(GAME_ID, 1, pitch_cache.build_game_pitches(description, rows))
+        cached = pitch_cache.load_game_pitches(GAME_ID, 1).select([], [], 10, 0)
+        sql = [dict(zip([column.name for column in description], row)) for row in rows]
+        # the endpoint maps NaN to None and serializes dates and times with str()
+        cached = [{name: None if isinstance(value, float) and math.isnan(value) else value for name, value in row.items()} for row in cached]
+        assert json.dumps(cached, default=str) == json.dumps(sql, default=str)
+
+    def test_arrays_are_mapped_from_the_file(self):
+        pitch_cache.write_game_pitches(GAME_ID, 1, pitch_cache.build_game_pitches(DESCRIPTION, ROWS))
+        _, array, _ = pitch_cache.load_game_pitches(GAME_ID, 1).columns['rel_speed']
+        assert array.dtype == np.float64
+        while not isinstance(array, np.memmap) and array.base is not None:
+            array = array.base # a view of a view... of the file's memmap, never a copy
+        assert isinstance(array, np.memmap)
+
+    def test_other_versions_are_not_served(self, cache_dir):
+        pitch_cache.write_game_pitches(GAME_ID, 1, pitch_cache.build_game_pitches(DESCRIPTION, ROWS))
+        assert pitch_cache.load_game_pitches(GAME_ID, 2) is None
+        pitch_cache.write_game_pitches(GAME_ID, 2, pitch_cache.build_game_pitches(DESCRIPTION, ROWS[:1]))
+        assert pitch_cache.load_game_pitches(GAME_ID, 1) is None
+        assert pitch_cache.load_game_pitches(GAME_ID, 2).row_count == 1
+        assert len(list(cache_dir.iterdir())) == 1
+
+    def test_filters_follow_sql_semantics(self):
+        pitches = pitch_cache.build_game_pitches(DESCRIPTION, ROWS)
+        assert self.pitch_numbers(pitches.select([('pitch_call', 'InPlay')], [], 10, 0)) == [2, 40000]
+        assert self.pitch_numbers(pitches.select([('pitch_call', 'InPlay'), ('inning', 2)], [], 10, 0)) == [40000]
+        assert pitches.select([('pitch_call', None)], [], 10, 0) == [] # nothing equals NULL
+        assert pitches.select([('pitch_call', 'BallCalled')], [], 10, 0) == []
+
+    def test_order_puts_nulls_like_postgres(self):
+        pitches = pitch_cache.build_game_pitches(DESCRIPTION, ROWS)
+        ascending = pitches.select([], [('date', False), ('time', False)], 10, 0)
+        descending = pitches.select([], [('date', False), ('time', True)], 10, 0)
+        assert self.pitch_numbers(ascending) == [40000, 1, 2, 3]
+        assert self.pitch_numbers(descending) == [3, 2, 1, 40000]
+        assert self.pitch_numbers(pitches.select([], [('date', False), ('time', True)], 2, 1)) == [2, 1]
+
+    def test_least_recently_used_entries_are_evicted(self, cache_dir, monkeypatch):
+        pitches = pitch_cache.build_game_pitches(DESCRIPTION, ROWS)
+        pitch_cache.write_game_pitches('game-a', 1, pitches)
+        size = (cache_dir / 'game-a.1.pitches').stat().st_size
+        monkeypatch.setattr(pitch_cache, 'CACHE_MAX_BYTES', 2 * size)
+        pitch_cache.write_game_pitches('game-b', 1, pitches)
+        pitch_cache.write_game_pitches('game-c', 1, pitches)
+        assert sorted(path.name for path in cache_dir.iterdir()) == ['game-b.1.pitches', 'game-c.1.pitches']
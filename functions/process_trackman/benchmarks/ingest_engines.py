@@ -0,0 +1,118 @@
+"""
+Compare the pandas engine (process_csv) with the light engine (process_csv_light).
+
+Measures:
+    1. Cold-start import time of each engine, in a fresh interpreter per sample.
+    2. End-to-end latency of ingesting a local Trackman CSV with each engine.
+    3. With --batch-sizes, the same latency with the pitch write batch size fixed at each size,
+       to compare the adaptive batch size (see batching.py) with hand-tuned ones.
+
+Ingestion writes to the database configured in .env, so point it at a scratch database.
+Every game the benchmark creates is deleted again after each run.
+
+Usage (from the repository root):
+    python functions/process_trackman/benchmarks/ingest_engines.py <path/to/YYYYMMDD-Ballpark-N.csv> [--runs 5] [--batch-sizes 100 500 2000]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from io import StringIO
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'image', 'src'))
+sys.path.append(SRC_DIR)
+
+# What a cold start of each engine has to import before it can ingest a file.
+IMPORTS = {
+    'pandas': 'import main, summaries, validation, pending, pandas',
+    'light': 'import main, summaries, validation, pending, numpy',
+}
+
+
+def time_imports(statement, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], cwd=SRC_DIR, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def time_ingest(engine, csv_text, file_name, runs):
+    import main
+    process = main.process_csv if engine == 'pandas' else main.process_csv_light
+    conn = main.connect_to_db()
+    samples = []
+    try:
+        for _ in range(runs):
+            existing = game_ids(conn)
+            start = time.perf_counter()
+            process(StringIO(csv_text), file_name, conn, None)
+            samples.append(time.perf_counter() - start)
+            delete_games(conn, game_ids(conn) - existing)
+    finally:
+        conn.close()
+    return samples
+
+
+def time_ingest_fixed_batch(engine, csv_text, file_name, runs, batch_size):
+    import main
+    bounds = main.PITCH_BATCH_SIZE, main.PITCH_BATCH_MIN_SIZE, main.PITCH_BATCH_MAX_SIZE
+    main.PITCH_BATCH_SIZE = main.PITCH_BATCH_MIN_SIZE = main.PITCH_BATCH_MAX_SIZE = batch_size
+    try:
+        return time_ingest(engine, csv_text, file_name, runs)
+    finally:
+        main.PITCH_BATCH_SIZE, main.PITCH_BATCH_MIN_SIZE, main.PITCH_BATCH_MAX_SIZE = bounds
+
+
+def game_ids(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT game_id FROM game;")
+    ids = {row[0] for row in cursor.fetchall()}
+    conn.commit()
+    return ids
+
+
+def delete_games(conn, ids):
+    cursor = conn.cursor()
+    for game_id in ids:
+        cursor.execute(
+            """
+            DELETE FROM pitch
+            WHERE game_id = %s;
+            DELETE FROM game
+            WHERE game_id = %s;
+            """,
+            (game_id, game_id)
+        )
+    conn.commit()
+
+
+def report(label, samples):
+    print(f'{label:<28} median {statistics.median(samples) * 1000:8.1f} ms   min {min(samples) * 1000:8.1f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('csv_path', help='Trackman pitch data CSV named like the files in S3.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--batch-sizes', type=int, nargs='*', default=[], help='Fixed pitch write batch sizes to compare.')
+    args = parser.parse_args()
+
+    with open(args.csv_path, encoding='utf-8') as f:
+        csv_text = f.read()
+    file_name = os.path.basename(args.csv_path)
+    print(f'{file_name}: {len(csv_text.encode("utf-8"))} bytes, {csv_text.count(chr(10)) - 1} rows')
+
+    for engine, statement in IMPORTS.items():
+        report(f'{engine} import', time_imports(statement, args.runs))
+    for engine in IMPORTS:
+        report(f'{engine} ingest', time_ingest(engine, csv_text, file_name, args.runs))
+        for batch_size in args.batch_sizes:
+            report(f'{engine} ingest, batch {batch_size}', time_ingest_fixed_batch(engine, csv_text, file_name, args.runs, batch_size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Compare loading a batch of pitch rows into 'pitch' with a single COPY (copy_pitch_rows) and with
+concurrent COPYs over several connections (copy_pitch_rows_concurrently), as stage two of the
+two-stage ingest does.
+
+The batch is the pitch rows of a local Trackman CSV, repeated for --games copies of its game
+(created for the benchmark with daily game numbers from 101). Every run starts from an empty
+set of pitches for those games, and the games are deleted at the end.
+
+Ingestion writes to the database configured in .env, so point it at a scratch database.
+
+Usage (from the repository root):
+    python functions/process_trackman/benchmarks/parallel_copy.py <path/to/YYYYMMDD-Ballpark-N.csv> [--games 50] [--workers 2 4 8] [--runs 3]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from itertools import chain
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'image', 'src'))
+sys.path.append(SRC_DIR)
+
+FIRST_GAME_NUMBER = 101
+
+
+def batch_rows(main, conn, csv_path, games):
+    """ Return the pitch rows of the file for each of games new copies of its game, and the new game IDs. """
+    file_name = os.path.basename(csv_path)
+    with open(csv_path, encoding='utf-8') as f:
+        records = main.read_trackman_records(f)
+        head, header = main.read_game_header(records)
+        game = main.get_game_info(file_name, header, conn, None)
+        records = list(main.valid_records(chain(head, records), game['date'], []))
+    cursor = conn.cursor()
+    game_ids = []
+    for number in range(FIRST_GAME_NUMBER, FIRST_GAME_NUMBER + games):
+        cursor.execute(
+            """
+            INSERT INTO game (home_team_id, visiting_team_id, ballpark_id, verified, date, daily_game_number)
+            VALUES (%s, %s, %s, true, %s, %s)
+            RETURNING game_id;
+            """,
+            (game['home_team_id'], game['away_team_id'], game['ballpark_id'], game['date'], number)
+        )
+        game_ids.append(cursor.fetchone()[0])
+    conn.commit()
+    main.ensure_pitch_partition(conn, game['date'])
+
+    accumulators = (main.GameSummaryAccumulator(), main.ArsenalAccumulator(), main.StatDeltaAccumulator(), main.PlateAppearanceAccumulator())
+    template = [main.nan_to_none(values) for values in main.pitch_data_rows(iter(records), game_ids[0], *accumulators, conn)]
+    game_id_index = main.PITCH_DATA_COLUMNS.index('game_id')
+    rows = [
+        values[:game_id_index] + (game_id,) + values[game_id_index + 1:]
+        for game_id in game_ids for values in template
+        ]
+    return rows, game_ids
+
+
+def delete_pitches(conn, game_ids):
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM pitch WHERE game_id = ANY(%s::uuid[]);", (game_ids,))
+    conn.commit()
+
+
+def time_load(load, conn, rows, game_ids, runs):
+    samples = []
+    for _ in range(runs):
+        delete_pitches(conn, game_ids)
+        start = time.perf_counter()
+        load()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(label, samples, row_count):
+    median = statistics.median(samples)
+    print(f'{label:<20} median {median * 1000:9.1f} ms   min {min(samples) * 1000:9.1f} ms   {row_count / median:10.0f} rows/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('csv_path', help='Trackman pitch data CSV named like the files in S3.')
+    parser.add_argument('--games', type=int, default=50)
+    parser.add_argument('--workers', type=int, nargs='*', default=[2, 4, 8])
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    import main as ingest
+    conn = ingest.connect_to_db()
+    rows, game_ids = batch_rows(ingest, conn, args.csv_path, args.games)
+    print(f'{len(rows)} rows of {args.games} games')
+    try:
+        report('single COPY', time_load(lambda: ingest.copy_pitch_rows(conn, rows), conn, rows, game_ids, args.runs), len(rows))
+        for workers in args.workers:
+            samples = time_load(lambda: ingest.copy_pitch_rows_concurrently(conn, rows, workers), conn, rows, game_ids, args.runs)
+            report(f'{workers} connections', samples, len(rows))
+    finally:
+        delete_pitches(conn, game_ids)
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM game WHERE game_id = ANY(%s::uuid[]);", (game_ids,))
+        conn.commit()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
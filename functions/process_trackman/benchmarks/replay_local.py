@@ -0,0 +1,75 @@
+"""
+Replay the ingestion of Trackman files from a local copy of the bucket, through the Lambda handler.
+
+Files are read from a directory with the bucket's layout (YYYY/MM/DD/CSV/<file>) through
+sources.LocalSource, so the whole code path runs without S3. Each file gets the S3 event the
+bucket notification would send, in key order, and the time of each invocation is reported.
+
+Ingestion writes to the database configured in .env, so point it at a scratch database.
+Quarantine reports still go to S3; offline, their upload fails and is only logged.
+
+Usage (from the repository root):
+    python functions/process_trackman/benchmarks/replay_local.py <path/to/bucket/copy> [--prefix 2024/06/] [--light-max-bytes N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'image', 'src'))
+sys.path.append(SRC_DIR)
+
+TRACKMAN_SUFFIXES = ('.csv', '.csv.gz', '.csv.zst')
+
+
+def local_keys(root, prefix):
+    keys = []
+    for directory, _, files in os.walk(os.path.join(root, *prefix.split('/'))):
+        for file in files:
+            if file.endswith(TRACKMAN_SUFFIXES):
+                keys.append(os.path.relpath(os.path.join(directory, file), root).replace(os.sep, '/'))
+    return sorted(keys)
+
+
+def put_event(source, key):
+    """ The S3 event the bucket notification sends when key is uploaded. """
+    body, etag, size = source.get(key)
+    body.close()
+    return {'Records': [{'s3': {'bucket': {'name': 'local'}, 'object': {'key': key, 'size': size, 'eTag': etag}}}]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('root', help='Directory laid out like the Trackman bucket.')
+    parser.add_argument('--prefix', default='', help='Only replay keys under this prefix, ex: 2024/06/')
+    parser.add_argument('--light-max-bytes', type=int, help='Override LIGHT_INGEST_MAX_BYTES (0 always uses pandas).')
+    args = parser.parse_args()
+
+    # both are read when the modules are imported
+    os.environ['TRACKMAN_SOURCE_DIR'] = os.path.abspath(args.root)
+    if args.light_max_bytes is not None:
+        os.environ['LIGHT_INGEST_MAX_BYTES'] = str(args.light_max_bytes)
+    import main as ingest
+    from sources import LocalSource
+
+    source = LocalSource(os.environ['TRACKMAN_SOURCE_DIR'])
+    keys = local_keys(args.root, args.prefix)
+    samples = []
+    total_bytes = 0
+    for key in keys:
+        event = put_event(source, key)
+        start = time.perf_counter()
+        ingest.handler(event, None)
+        samples.append(time.perf_counter() - start)
+        total_bytes += event['Records'][0]['s3']['object']['size']
+        print(f'{key:<72} {samples[-1] * 1000:8.1f} ms')
+
+    if samples:
+        total = sum(samples)
+        print(f'{len(keys)} files, {total_bytes} bytes in {total:.2f} s: median {statistics.median(samples) * 1000:.1f} ms per file, '
+              f'{total_bytes / total / 1e6:.2f} MB/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+from psycopg2.extras import execute_values
+
+# Arsenal metrics and the Trackman column each is read from. For every metric the game_pitcher_arsenal table
+# keeps {metric}_count, {metric}_sum and {metric}_sum_sq, which add up across games: a season's mean is
+# sum / count and its variance sum_sq / count - mean^2 (see the season_pitcher_arsenal view).
+ARSENAL_METRICS = (
+    ('rel_speed', 'RelSpeed'),
+    ('spin_rate', 'SpinRate'),
+    ('induced_vert_break', 'InducedVertBreak'),
+    ('horz_break', 'HorzBreak'),
+    ('rel_height', 'RelHeight'),
+    ('rel_side', 'RelSide'),
+    ('extension', 'Extension'),
+    )
+# Columns of game_pitcher_arsenal after (game_id, pitcher_id, pitch_type), in order.
+ARSENAL_STATS = ('pitch_count',) + tuple(
+    f'{metric}_{stat}' for metric, _ in ARSENAL_METRICS for stat in ('count', 'sum', 'sum_sq')
+    )
+
+
+def compute_arsenal(df, pitcher_ids):
+    """ Aggregate a game's pitch data into per-pitcher, per-pitch-type arsenal partials.
+    Groups are numbered with pandas.factorize and every partial is one np.bincount over them.
+
+    Parameters:
+        df (dataframe): Trackman pitch data for a single game.
+        pitcher_ids (list): Resolved player ID of the pitcher for each row of df.
+
+    Returns:
+        list: (pitcher_id, pitch_type) + the ARSENAL_STATS, for each pitcher and pitch type thrown.
+    """
+    import numpy as np
+    import pandas as pd
+    pitcher_ids = pd.Series(pitcher_ids, index=df.index, dtype=object)
+    keep = pitcher_ids.notna().to_numpy()
+    if not keep.any():
+        return []
+    pitch_types = df['TaggedPitchType'].astype(object).where(df['TaggedPitchType'].notna(), 'Undefined')
+    pitcher_codes, pitchers = pd.factorize(pitcher_ids[keep])
+    type_codes, types = pd.factorize(pitch_types[keep])
+    groups, group_index = np.unique(pitcher_codes * len(types) + type_codes, return_inverse=True)
+    group_count = len(groups)
+
+    stats = [np.bincount(group_index, minlength=group_count)]
+    for _, column in ARSENAL_METRICS:
+        values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)[keep]
+        present = ~np.isnan(values)
+        values = np.where(present, values, 0.0)
+        stats += [
+            np.bincount(group_index, weights=present, minlength=group_count),
+            np.bincount(group_index, weights=values, minlength=group_count),
+            np.bincount(group_index, weights=values * values, minlength=group_count),
+            ]
+
+    rows = []
+    for index, group in enumerate(groups.tolist()):
+        row = [pitchers[group // len(types)], types[group % len(types)], int(stats[0][index])]
+        for position in range(1, len(stats), 3):
+            count = int(stats[position][index])
+            row += [count, float(stats[position + 1][index]), float(stats[position + 2][index])]
+        rows.append(tuple(row))
+    return rows
+
+
+class ArsenalAccumulator:
+    """ Streaming counterpart of compute_arsenal for the light ingest engine: running counts, sums and
+    sums of squares per (pitcher_id, pitch_type), updated as each pitch is written.
+    """
+
+    def __init__(self):
+        self.groups = {}
+
+    def add(self, pitcher_id, record):
+        if pitcher_id is None:
+            return
+        pitch_type = record['TaggedPitchType'] or 'Undefined'
+        stats = self.groups.setdefault((pitcher_id, pitch_type), [0] + [0, 0.0, 0.0] * len(ARSENAL_METRICS))
+        stats[0] += 1
+        for position, (_, column) in enumerate(ARSENAL_METRICS):
+            value = record[column]
+            if value is None:
+                continue
+            stats[3 * position + 1] += 1
+            stats[3 * position + 2] += value
+            stats[3 * position + 3] += value * value
+
+    def arsenal(self):
+        return [key + tuple(stats) for key, stats in self.groups.items()]
+
+
+def write_arsenal(conn, game_id, rows):
+    """ Replace the game's arsenal partials in a single transaction. """
+    stats_str = ', '.join(ARSENAL_STATS)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM game_pitcher_arsenal WHERE game_id = %s;", (game_id,))
+        if rows:
+            execute_values(
+                cursor,
+                f"INSERT INTO game_pitcher_arsenal (game_id, pitcher_id, pitch_type, {stats_str}) VALUES %s;",
+                [(game_id,) + row for row in rows]
+            )
+        conn.commit()
+        print(f'Wrote arsenal of {len(rows)} pitcher pitch types for game {game_id}')
+    except Exception as e:
+        conn.rollback()
+        print(f'Error writing arsenal: {e}')
+    finally:
+        cursor.close()
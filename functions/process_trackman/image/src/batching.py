@@ -0,0 +1,44 @@
+# A bigger batch has to beat the best throughput so far by this fraction to count as an improvement.
+GROWTH_GAIN = 0.05
+
+
+class AdaptiveBatchSize:
+    """ Batch size of a chunked write, adjusted from the latency and rows/sec of each batch.
+
+    The size doubles while throughput keeps improving, then settles back on the best size seen once
+    a bigger batch stops paying off. A batch slower than target_seconds halves the size, whatever its
+    throughput, and caps it there for the rest of the write: long statements are what run into lock
+    waits and statement timeouts. Sizes stay within [minimum, maximum] and every change is logged.
+    """
+
+    def __init__(self, initial, minimum, maximum, target_seconds):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.target_seconds = target_seconds
+        self.size = min(max(initial, self.minimum), self.maximum)
+        self.best_size, self.best_rate = self.size, None
+        self.settled = False
+
+    def record(self, row_count, seconds):
+        """ Record a committed batch of row_count rows that took seconds to write. """
+        if row_count < self.size:
+            return # the last, partial batch says little about the size
+        rate = row_count / max(seconds, 1e-6)
+        if seconds > self.target_seconds and self.size > self.minimum:
+            self.maximum = max(self.minimum, self.size // 2)
+            self.best_size, self.best_rate = self.maximum, None
+            self.resize(self.maximum, f'{seconds:.2f} s batch is over the {self.target_seconds} s target')
+        elif self.best_rate is None or rate > self.best_rate * (1 + GROWTH_GAIN):
+            self.best_size, self.best_rate = self.size, rate
+            if not self.settled and self.size < self.maximum:
+                self.resize(min(self.size * 2, self.maximum), f'{rate:.0f} rows/s is the best so far')
+        elif self.size != self.best_size:
+            self.settled = True
+            self.resize(self.best_size, f'{rate:.0f} rows/s is no better than {self.best_rate:.0f} rows/s at {self.best_size}')
+        else:
+            self.best_rate = rate
+
+    def resize(self, size, reason):
+        if size != self.size:
+            print(f'Batch size {self.size} -> {size}: {reason}')
+            self.size = size
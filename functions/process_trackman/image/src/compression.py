@@ -0,0 +1,66 @@
+import gzip
+import io
+
+# Compressed Trackman uploads keep the CSV name and add a suffix, ex: '20240629-ClipperMagazine-1.csv.gz'.
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.zst': 'zstd'}
+
+
+def strip_compression_suffix(file_name):
+    """ ex: '20240629-ClipperMagazine-1.csv.gz' => '20240629-ClipperMagazine-1.csv' """
+    for suffix in COMPRESSION_SUFFIXES:
+        if file_name.endswith(suffix):
+            return file_name[:-len(suffix)]
+    return file_name
+
+
+def open_text_stream(body, key):
+    """ Wrap an S3 object body (anything with read(n)) as a UTF-8 text stream for the CSV parsers.
+
+    gzip and zstd objects are detected from the key suffix or, failing that, from their magic bytes,
+    and decompressed as the parser reads. Neither the compressed nor the uncompressed body is ever
+    held in memory as a whole.
+    """
+    raw = PeekableStream(body)
+    head = raw.peek(len(ZSTD_MAGIC))
+    compression = next((name for suffix, name in COMPRESSION_SUFFIXES.items() if key.endswith(suffix)), None)
+    if compression is None and head.startswith(GZIP_MAGIC):
+        compression = 'gzip'
+    elif compression is None and head.startswith(ZSTD_MAGIC):
+        compression = 'zstd'
+
+    stream = io.BufferedReader(raw)
+    if compression == 'gzip':
+        stream = gzip.GzipFile(fileobj=stream)
+    elif compression == 'zstd':
+        import zstandard # only needed for zstd uploads
+        stream = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(stream))
+    return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+
+class PeekableStream(io.RawIOBase):
+    """ Raw stream over an object with read(n) (ex: botocore's StreamingBody) whose first bytes can be peeked. """
+
+    def __init__(self, body):
+        self.body = body
+        self.buffer = b''
+
+    def peek(self, size):
+        while len(self.buffer) < size:
+            chunk = self.body.read(size - len(self.buffer))
+            if not chunk:
+                break
+            self.buffer += chunk
+        return self.buffer
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self.buffer:
+            data, self.buffer = self.buffer[:len(b)], self.buffer[len(b):]
+        else:
+            data = self.body.read(len(b))
+        b[:len(data)] = data
+        return len(data)
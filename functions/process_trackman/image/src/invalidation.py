@@ -0,0 +1,76 @@
+import json
+
+# Every ingestion bumps the version of its game, the game's teams and the players in its pitches in 'entity_version',
+# and notifies the changed entities on CHANNEL. Both happen in the transaction that bumps game.ingestion_version,
+# which commits right after the pitches: a reader can briefly see new pitches under the old versions, never the reverse.
+CHANNEL = 'entity_version'
+# NOTIFY payloads must be shorter than 8000 bytes; 100 quoted UUIDs take about 4000.
+IDS_PER_NOTIFICATION = 100
+
+# Columns of 'pitch' that reference a player: the battery and, from player positioning files, the defense.
+PLAYER_ID_COLUMNS = (
+    'pitcher_id', 'batter_id', 'catcher_id', 'first_b_player_id', 'second_b_player_id', 'third_b_player_id',
+    'ss_player_id', 'lf_player_id', 'cf_player_id', 'rf_player_id'
+    )
+
+
+def game_entities(cursor, game_id):
+    """ Return the entities an ingestion of the game changes: {'game': [game_id], 'team': [...], 'player': [...]}.
+    The players are those now in the game's pitches and those the previous ingestion published, so a player the
+    write removed is included; the current ones are recorded in game.published_player_ids for the next ingestion.
+    """
+    cursor.execute(
+        "SELECT home_team_id, visiting_team_id, published_player_ids::text[] FROM game WHERE game_id = %s FOR UPDATE;",
+        (game_id,)
+    )
+    home_team_id, visiting_team_id, published_player_ids = cursor.fetchone()
+    cursor.execute(
+        f"""
+        SELECT DISTINCT player_id
+        FROM pitch, unnest(ARRAY[{', '.join(PLAYER_ID_COLUMNS)}]) AS player_id
+        WHERE game_id = %s AND player_id IS NOT NULL;
+        """,
+        (game_id,)
+    )
+    player_ids = sorted(str(row[0]) for row in cursor.fetchall())
+    cursor.execute("UPDATE game SET published_player_ids = %s::uuid[] WHERE game_id = %s;", (player_ids, game_id))
+    return {
+        'game': [game_id],
+        'team': [home_team_id, visiting_team_id],
+        'player': sorted(set(player_ids) | set(published_player_ids or []))
+    }
+
+
+def publish_entity_versions(cursor, entities):
+    """ Bump the version of every entity ({entity_type: [entity_id, ...]}) and queue the notifications of the change.
+    Nothing is visible until the caller commits; rolling back drops the notifications too.
+    """
+    rows = sorted({(entity_type, str(entity_id)) for entity_type, ids in entities.items() for entity_id in ids})
+    if not rows:
+        return
+    # rows are locked in key order, so ingestions of games sharing players or teams cannot deadlock
+    cursor.execute(
+        """
+        INSERT INTO entity_version (entity_type, entity_id, version)
+        SELECT entity_type, entity_id, 1
+        FROM unnest(%s::text[], %s::uuid[]) AS changed(entity_type, entity_id)
+        ORDER BY entity_type, entity_id
+        ON CONFLICT (entity_type, entity_id)
+        DO UPDATE SET version = entity_version.version + 1, updated_at = now();
+        """,
+        ([entity_type for entity_type, _ in rows], [entity_id for _, entity_id in rows])
+    )
+    for payload in notification_payloads(rows):
+        cursor.execute("SELECT pg_notify(%s, %s);", (CHANNEL, payload))
+
+
+def notification_payloads(rows):
+    """ JSON payloads of the changed (entity_type, entity_id) rows, ex: '{"type": "player", "ids": ["...", ...]}',
+    with at most IDS_PER_NOTIFICATION IDs each.
+    """
+    ids_by_type = {}
+    for entity_type, entity_id in rows:
+        ids_by_type.setdefault(entity_type, []).append(entity_id)
+    for entity_type, ids in ids_by_type.items():
+        for start in range(0, len(ids), IDS_PER_NOTIFICATION):
+            yield json.dumps({'type': entity_type, 'ids': ids[start:start + IDS_PER_NOTIFICATION]})
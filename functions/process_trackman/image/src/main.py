@@ -1,30 +1,431 @@
 import os
+import sys
+import json
+import math
+import time
+import unicodedata
+import uuid
 import boto3
 import psycopg2
-import pandas as pd
+from csv import DictReader
+from itertools import chain, islice
+from psycopg2.extras import execute_values
 from dotenv import load_dotenv
-from io import StringIO
 from datetime import datetime, timedelta
+# Adjust Python path so sibling modules resolve both in Lambda and when imported as a package:
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from summaries import compute_game_summaries, write_game_summaries, GameSummaryAccumulator
+from validation import (
+    validate_trackman_rows, quarantine_rows, record_failures, quarantine_records, QUARANTINE_PREFIX, NUMERIC_COLUMNS
+    )
+from pending import (
+    game_key, is_player_positioning_file, park_positioning_file, parked_positioning_files, release_positioning_file,
+    find_game_teams
+    )
+from progress import IngestionProgress, TimeBudgetExhausted
+from batching import AdaptiveBatchSize
+from invalidation import game_entities, publish_entity_versions
+from sources import trackman_source
+from staging import write_staged_game, read_staged_game, list_staged_games, copy_rows, copy_rows_concurrently, STAGING_PREFIX
+from compression import open_text_stream, strip_compression_suffix, COMPRESSION_SUFFIXES
+from profiling import profile_invocation, PROFILE_PREFIX
+from metrics import compute_derived_metrics, DERIVED_METRICS, METRIC_INPUTS
+from quality import compute_file_profile, write_file_profile, FileProfileAccumulator
+from plate_appearances import compute_plate_appearances, write_plate_appearances, PlateAppearanceAccumulator, PLATE_APPEARANCE_INPUTS
+from arsenal import compute_arsenal, write_arsenal, ArsenalAccumulator
+from season_stats import compute_stat_deltas, apply_stat_deltas, StatDeltaAccumulator
+# pandas is imported inside the functions of the dataframe engine only: it is the slowest import
+# of a cold start, and the light engine (process_csv_light) handles most files without it.
+
+# A pitch is identified by its game and Trackman pitch number; date is part of the key
+# because pitch is partitioned on it (and is constant within a game).
+PITCH_CONFLICT_KEY = ('game_id', 'pitch_number', 'date')
+PITCH_BATCH_SIZE = 500 # initial size; adjusted per write by AdaptiveBatchSize within the bounds below
+PITCH_BATCH_MIN_SIZE = int(os.environ.get('PITCH_BATCH_MIN_SIZE', 50))
+PITCH_BATCH_MAX_SIZE = int(os.environ.get('PITCH_BATCH_MAX_SIZE', 5000))
+# Batches slower than this shrink: long statements are the ones that hit lock waits and statement timeouts.
+PITCH_BATCH_TARGET_SECONDS = float(os.environ.get('PITCH_BATCH_TARGET_SECONDS', 2.0))
+
+# 'cpu' or 'memory' profiles every invocation (see profiling.py); a "profile" field in the event does the same for one.
+PROFILE_INGEST = os.environ.get('PROFILE_INGEST')
+
+# A file that does not fit in one invocation is continued by at most this many more (see enqueue_continuation).
+MAX_INGEST_CONTINUATIONS = int(os.environ.get('MAX_INGEST_CONTINUATIONS', 10))
+
+# With INGEST_STAGED set, pitch data files are only parsed and staged to S3 (stage one, see stage_csv); a scheduled
+# {"apply_staged": {"bucket": ...}} event then writes up to STAGED_GAMES_PER_APPLY staged games at once (stage two).
+INGEST_STAGED = os.environ.get('INGEST_STAGED')
+STAGED_GAMES_PER_APPLY = int(os.environ.get('STAGED_GAMES_PER_APPLY', 50))
+# Stage two loads its pitch rows over this many connections at once when each gets at least
+# PITCH_COPY_MIN_ROWS_PER_WORKER rows (see copy_pitch_rows_concurrently); 1 keeps a single COPY.
+PITCH_COPY_WORKERS = int(os.environ.get('PITCH_COPY_WORKERS', 1))
+PITCH_COPY_MIN_ROWS_PER_WORKER = int(os.environ.get('PITCH_COPY_MIN_ROWS_PER_WORKER', 5000))
+
+# Files up to this many bytes go through the pandas-free light engine; set to 0 to always use pandas.
+LIGHT_INGEST_MAX_BYTES = int(os.environ.get('LIGHT_INGEST_MAX_BYTES', 1_000_000))
+# Cell values read as missing, like pandas' default NA strings.
+MISSING_VALUES = frozenset(('', 'NA', 'N/A', 'n/a', 'NaN', 'nan', '-NaN', '-nan', 'NULL', 'null', '#N/A', '<NA>', 'None'))
+
+# Low-cardinality Trackman string columns (teams, calls, pitch types, handedness and player names)
+# repeat a few dozen values across thousands of rows, so they are held as categoricals.
+CATEGORICAL_COLUMNS = (
+    'HomeTeam', 'AwayTeam', 'PitcherTeam', 'BatterTeam', 'CatcherTeam', 'PitchCall', 'TaggedPitchType',
+    'AutoPitchType', 'Top/Bottom', 'PitcherThrows', 'BatterSide', 'CatcherThrows', 'PitcherSet', 'KorBB',
+    'TaggedHitType', 'PlayResult', 'AutoHitType', 'Pitcher', 'Batter', 'Catcher', '1B_Name', '2B_Name',
+    '3B_Name', 'SS_Name', 'LF_Name', 'CF_Name', 'RF_Name'
+    )
+CATEGORICAL_DTYPES = {column: 'category' for column in CATEGORICAL_COLUMNS}
+
+FIELDER_POSITIONS = ('1B', '2B', '3B', 'SS', 'LF', 'CF', 'RF')
+
+PITCH_DATA_COLUMNS = (
+    'hit_trajectory_zc2', 'pitcher_id', 'batter_id', 'game_id', 'date', 'time', 'pa_of_inning', 'pitch_of_pa', 'hit_trajectory_zc7', 
+    'hit_trajectory_zc8', 'throw_speed', 'pop_time', 'exchange_time', 'time_to_base', 'catch_position_x', 'catch_position_y', 
+    'catch_position_z', 'throw_position_x', 'throw_position_y', 'throw_position_z', 'base_position_x', 'base_position_y', 
+    'base_position_z', 'throw_trajectory_xc0', 'throw_trajectory_xc1', 'throw_trajectory_xc2', 'throw_trajectory_yc0', 
+    'throw_trajectory_yc1', 'throw_trajectory_yc2', 'throw_trajectory_zc0', 'throw_trajectory_zc1', 'throw_trajectory_zc2', 
+    'inning', 'outs', 'balls', 'strikes', 'outs_on_play', 'runs_scored', 'tilt', 'y0', 'local_date_time', 'catcher_id', 
+    'pitch_number', 'rel_speed', 'vert_rel_angle', 'horz_rel_angle', 'spin_rate', 
+    'spin_axis', 'rel_height', 'rel_side', 'extension', 'vert_break', 'induced_vert_break', 'horz_break', 'plate_loc_height', 
+    'plate_loc_side', 'zone_speed', 'vert_appr_angle', 'horz_appr_angle', 'zone_time', 'exit_speed', 'angle', 'direction', 
+    'hit_spin_rate', 'position_at_110_x', 'position_at_110_y', 'position_at_110_z', 'distance', 'last_tracked_distance', 
+    'bearing', 'hang_time', 'pfxx', 'pfxz', 'x0', 'z0', 'vx0', 'vy0', 'vz0', 'ax0', 'ay0', 'az0', 'effective_velo', 
+    'max_height', 'measured_duration', 'speed_drop', 'pitch_last_measured_x', 'pitch_last_measured_y', 'pitch_last_measured_z', 
+    'contact_position_x', 'contact_position_y', 'contact_position_z', 'pitch_trajectory_xc0', 'pitch_trajectory_xc1', 
+    'pitch_trajectory_xc2', 'pitch_trajectory_yc0', 'pitch_trajectory_yc1', 'pitch_trajectory_yc2', 'pitch_trajectory_zc0', 
+    'pitch_trajectory_zc1', 'pitch_trajectory_zc2', 'hit_spin_axis', 'hit_trajectory_xc0', 'hit_trajectory_xc1', 
+    'hit_trajectory_xc2', 'hit_trajectory_xc3', 'hit_trajectory_xc4', 'hit_trajectory_xc5', 'hit_trajectory_xc6', 
+    'hit_trajectory_xc7', 'hit_trajectory_xc8', 'hit_trajectory_yc0', 'hit_trajectory_yc1', 'hit_trajectory_yc2', 
+    'hit_trajectory_yc3', 'hit_trajectory_yc4', 'hit_trajectory_yc5', 'hit_trajectory_yc6', 'hit_trajectory_yc7', 
+    'hit_trajectory_yc8', 'hit_trajectory_zc0', 'hit_trajectory_zc1', 'hit_trajectory_zc3', 'hit_trajectory_zc4', 
+    'hit_trajectory_zc5', 'hit_trajectory_zc6', 'pitcher_throws', 'pitcher_team_code', 'batter_side', 'batter_team_code', 'pitcher_set', 
+    'catcher_throws', 'top_or_bottom', 'hit_launch_confidence', 'hit_landing_confidence', 'tagged_pitch_type', 
+    'auto_pitch_type', 'pitch_call', 'k_or_bb', 'tagged_hit_type', 'play_result', 'catcher_throw_catch_confidence', 
+    'catcher_throw_release_confidence', 'notes', 'catcher_throw_location_confidence', 'pitch_release_confidence', 
+    'pitch_location_confidence', 'auto_hit_type', 'pitch_movement_confidence'
+    ) + DERIVED_METRICS # computed at ingest by metrics.py
+
+PLAYER_POSITIONING_COLUMNS = (
+    'game_id', 'pitch_number', 'date', 'time', 'pitch_call', 'play_result', 'detected_shift', 'first_b_position_at_release_x', 'first_b_position_at_release_z',
+    'second_b_position_at_release_x', 'second_b_position_at_release_z', 'third_b_position_at_release_x', 'third_b_position_at_release_z',
+    'ss_position_at_release_x', 'ss_position_at_release_z', 'lf_position_at_release_x', 'lf_position_at_release_z', 'cf_position_at_release_x',
+    'cf_position_at_release_z', 'rf_position_at_release_x', 'rf_position_at_release_z', 'first_b_player_id', 'second_b_player_id',
+    'third_b_player_id', 'ss_player_id', 'lf_player_id', 'cf_player_id', 'rf_player_id'
+    )
 
 def handler(event, context):
     """Entry point for Lambda."""
+    if 'apply_staged' in event:
+        return apply_staged_event(event['apply_staged'])
+    profile = event.get('profile', PROFILE_INGEST)
+    if profile:
+        return profile_invocation(ingest_event, event, context, profile)
+    return ingest_event(event, context)
+
+
+def ingest_event(event, context):
+    bucket = event['Records'][0]['s3']['bucket']['name']
+    key = event['Records'][0]['s3']['object']['key']
+    if key.startswith((QUARANTINE_PREFIX, PROFILE_PREFIX, STAGING_PREFIX)):
+        return # quarantine reports, profiles and staged games are written by this function; never ingest them.
     s3 = boto3.client('s3') # init. S3 client
     csv, file_name = get_csv(event, s3)
+    if INGEST_STAGED and not is_player_positioning_file(file_name):
+        stage_csv(csv, file_name, bucket, key, s3)
+        return
     conn = connect_to_db()
-    process_csv(csv, file_name, conn, s3)
+    etag = event['Records'][0]['s3']['object'].get('eTag')
+    remaining_time = context.get_remaining_time_in_millis if context is not None else None
+    progress = IngestionProgress(conn, key, etag, remaining_time) if etag else None
+    teams = None
+    if INGEST_STAGED and is_player_positioning_file(file_name):
+        # A staged pitch data file's game is only created when stage two applies it. Taking the teams from the raw
+        # pitch file (see get_player_positioning_teams) would create the game here first, and stage two would then
+        # drop the pitch data as a duplicate; so the file waits, parked, until the game has been applied.
+        teams = find_game_teams(conn, game_key(file_name))
+        if teams is None:
+            park_positioning_file(conn, bucket, key)
+            teams = find_game_teams(conn, game_key(file_name)) # applied while parking
+            if teams:
+                ingest_parked_positioning_files(conn, game_key(file_name), teams, s3)
+            conn.close()
+            return
+    try:
+        game = ingest_csv(csv, file_name, use_light_engine(event['Records'][0]['s3']['object'].get('size')), conn, s3, teams, progress)
+    except TimeBudgetExhausted as e:
+        # the committed chunks are checkpointed: hand the rest of the file to a new invocation
+        enqueue_continuation(event, context, e.committed_rows)
+        conn.close()
+        return
+    if game is None and is_player_positioning_file(file_name):
+        # The pitch data file is not in S3 yet: park this file rather than dropping it. The pitch file
+        # may have been ingested while we were looking for it, so check the DB once more after parking.
+        park_positioning_file(conn, bucket, key)
+        teams = find_game_teams(conn, game_key(file_name))
+        if teams:
+            ingest_parked_positioning_files(conn, game_key(file_name), teams, s3)
+    elif game is not None and game['file_type'] == 'pitch data':
+        ingest_parked_positioning_files(conn, game_key(file_name), (game['home_team'], game['away_team']), s3)
     conn.close()
 
 
+def enqueue_continuation(event, context, committed_rows):
+    """ Invoke this function again, asynchronously, with the same S3 event so it ingests the rest of the file.
+    The new invocation resumes from the file's ingestion_progress checkpoints; the event's 'continuation'
+    field records the resume offset and counts continuations, up to MAX_INGEST_CONTINUATIONS.
+    """
+    key = event['Records'][0]['s3']['object']['key']
+    count = event.get('continuation', {}).get('count', 0) + 1
+    if count > MAX_INGEST_CONTINUATIONS:
+        print(f'Not continuing {key}: {MAX_INGEST_CONTINUATIONS} continuations reached after {committed_rows} rows')
+        return
+    continuation = dict(event, continuation={'count': count, 'committed_rows': committed_rows})
+    boto3.client('lambda').invoke(
+        FunctionName=context.invoked_function_arn,
+        InvocationType='Event',
+        Payload=json.dumps(continuation).encode()
+    )
+    print(f'Out of time: continuing {key} from row {committed_rows} in a new invocation ({count}/{MAX_INGEST_CONTINUATIONS})')
+
+
+def use_light_engine(size):
+    """Small files (most single games) are ingested without pandas; see process_csv_light."""
+    return size is not None and size <= LIGHT_INGEST_MAX_BYTES
+
+
+def ingest_csv(file, file_name, light, conn, s3, teams=None, progress=None):
+    """ Ingest a CSV with the light or the pandas engine.
+    progress (IngestionProgress) checkpoints the pitch writes so a retry can resume. It is marked complete
+    once the file has been handled, including when the game is not ingested, so only interrupted runs resume.
+    When progress runs out of time budget, TimeBudgetExhausted propagates and the file stays incomplete.
+
+    Returns:
+        dict: The game's details (see get_game_info) and its 'game_id' if the game was ingested; None otherwise.
+    """
+    if light:
+        game = process_csv_light(file, file_name, conn, s3, teams, progress)
+    else:
+        game = process_csv(file, file_name, conn, s3, teams, progress)
+    if game is not None:
+        bump_ingestion_version(conn, game['game_id'])
+    if progress is not None:
+        progress.complete()
+    return game
+
+
+def bump_ingestion_version(conn, game_id):
+    """ Mark the game's pitches as changed, invalidating reader caches keyed by (game_id, ingestion_version),
+    and bump and notify the versions of the game, its teams and its players (see invalidation.py).
+    Runs in its own transaction once the pitches are committed. An error propagates, leaving the file's
+    IngestionProgress incomplete, so its retry (or, for a staged game, the next apply run) resumes the file
+    and bumps the versions again.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("UPDATE game SET ingestion_version = ingestion_version + 1 WHERE game_id = %s;", (game_id,))
+        publish_entity_versions(cursor, game_entities(cursor, game_id))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def ingest_parked_positioning_files(conn, key, teams, s3):
+    """ Ingest the positioning files parked for a game, now that its teams are known.
+    Each file is fetched by its exact key; the pitch data lookup of get_player_positioning_teams is skipped.
+    """
+    for bucket, s3_key in parked_positioning_files(conn, key):
+        file_name = strip_compression_suffix(s3_key.split('/')[-1])
+        print(f'Ingesting parked file {file_name}')
+        try:
+            body, etag, size = trackman_source(bucket, s3).get(s3_key)
+            csv = open_text_stream(body, s3_key)
+            progress = IngestionProgress(conn, s3_key, etag)
+            if ingest_csv(csv, file_name, use_light_engine(size), conn, s3, teams, progress) is not None:
+                release_positioning_file(conn, s3_key)
+        except Exception as e:
+            # leave the file parked; it is retried the next time a pitch file for this game is ingested.
+            conn.rollback()
+            print(f'Error ingesting parked file {file_name}: {e}')
+
+
+def stage_csv(file, file_name, bucket, key, s3):
+    """ Stage one of the two-stage ingest: read and validate a pitch data file like process_csv_light, and
+    write its game details, quality profile and valid records to S3 as a staged game (see staging.py).
+    The database is not touched; apply_staged_games writes the game later, together with others.
+    """
+    print("Staging csv...")
+    profile = FileProfileAccumulator(NUMERIC_COLUMNS)
+    records = observed = profile.observe(read_trackman_records(file))
+    head, header = read_game_header(records)
+    if not head:
+        print(f'{file_name} has no rows.')
+        return
+    game = read_game_info(file_name, header, s3)
+    rejected = []
+    records = valid_records(chain(head, records), game['date'], rejected)
+    columns = [column for column in head[0] if column is not None] # None holds the cells of overlong rows
+
+    def staged_header():
+        for _ in observed:
+            pass # profile the rejected rows after the last valid one
+        return {'file_name': file_name, 'game': game, 'profile': profile.profile()}
+
+    write_staged_game(s3, bucket, key, staged_header, columns, records)
+    if rejected:
+        quarantine_records(rejected, file_name, s3)
+
+
+def apply_staged_event(options):
+    """ Stage two of the two-stage ingest, for a scheduled event like {"apply_staged": {"bucket": "...", "limit": 50}}. """
+    s3 = boto3.client('s3')
+    bucket = options['bucket']
+    staged = list_staged_games(s3, bucket, options.get('limit', STAGED_GAMES_PER_APPLY))
+    if not staged:
+        return
+    conn = connect_to_db()
+    apply_staged_games(conn, s3, bucket, staged)
+    conn.close()
+
+
+def apply_staged_games(conn, s3, bucket, staged):
+    """ Write many staged games (see stage_csv) in one connection: each game's players and game ID are
+    resolved as in process_csv_light, then the pitch rows of every game are loaded with a single COPY
+    (or PITCH_COPY_WORKERS concurrent ones, see copy_pitch_rows_concurrently) and upserted into 'pitch'
+    in one transaction. Each game's aggregates follow once that commits.
+
+    A game that replaces unverified data is swapped in on its own (see swap_verified_pitch_rows). If the
+    bulk write fails, each game falls back to upsert_pitch_rows, which only loses the rows that fail.
+    Staged games are deleted once applied; one left behind by a crash is taken up again by the next run
+    through its IngestionProgress.
+
+    Parameters:
+        staged (list): (key, etag) of each staged game, ex: from list_staged_games.
+    """
+    applied = []
+    for key, etag in staged:
+        header, records = read_staged_game(s3.get_object(Bucket=bucket, Key=key)['Body'])
+        file_name = header['file_name']
+        progress = IngestionProgress(conn, key, etag)
+        game = add_game_ids(header['game'], conn)
+        game_id = determine_game_id(file_name, conn, None, game, s3, resuming=progress.resuming)
+        if not game_id:
+            print(f'Not inserting {file_name}.')
+            progress.complete()
+            s3.delete_object(Bucket=bucket, Key=key)
+            continue
+        game['game_id'] = game_id
+        write_file_profile(conn, file_name, game_id, header['profile'])
+
+        pitch_table = ensure_pitch_partition(conn, game['date'])
+        accumulators = (GameSummaryAccumulator(), ArsenalAccumulator(), StatDeltaAccumulator(), PlateAppearanceAccumulator())
+        rows = pitch_data_rows(records, game_id, *accumulators, conn)
+        if game.get('replaces_unverified'):
+            if swap_verified_pitch_rows(rows, pitch_table, game_id, conn):
+                finish_staged_game(conn, s3, bucket, key, file_name, game, accumulators, progress)
+        else:
+            rows = [nan_to_none(values) for values in rows]
+            applied.append((key, file_name, game, pitch_table, rows, accumulators, progress))
+    if not applied:
+        return
+
+    rows = [values for game in applied for values in game[4]]
+    workers = min(PITCH_COPY_WORKERS, len(rows) // PITCH_COPY_MIN_ROWS_PER_WORKER)
+    try:
+        if workers > 1:
+            copy_pitch_rows_concurrently(conn, rows, workers)
+        else:
+            copy_pitch_rows(conn, rows)
+        print(f'Copied {len(rows)} rows of {len(applied)} staged games')
+    except psycopg2.Error as e:
+        print(f'Error copying staged games, upserting them one game at a time: {e}')
+        for _, _, game, pitch_table, game_rows, _, _ in applied:
+            upsert_pitch_rows(PITCH_DATA_COLUMNS, game_rows, pitch_table, conn)
+    for key, file_name, game, _, _, accumulators, progress in applied:
+        finish_staged_game(conn, s3, bucket, key, file_name, game, accumulators, progress)
+
+
+def copy_pitch_rows(conn, rows):
+    """ Upsert pitch rows into 'pitch' in one transaction: a single COPY into a temporary table, then one INSERT ... ON CONFLICT. """
+    columns_str = ', '.join(PITCH_DATA_COLUMNS)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"CREATE TEMP TABLE pitch_bulk_staging ON COMMIT DROP AS SELECT {columns_str} FROM pitch WITH NO DATA;")
+        copy_rows(cursor, 'pitch_bulk_staging', PITCH_DATA_COLUMNS, rows)
+        cursor.execute(merge_pitch_query(['pitch_bulk_staging']))
+        conn.commit()
+    except psycopg2.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def copy_pitch_rows_concurrently(conn, rows, workers):
+    """ Like copy_pitch_rows, with the COPY split over several connections for very large batches.
+
+    rows (in game and pitch order) are split into workers contiguous ranges, each loaded concurrently over
+    its own connection into its own UNLOGGED table (temporary tables are private to their session).
+    One transaction on conn then merges them all into 'pitch' and drops them, so readers see all of
+    the rows or none of them; the tables are dropped as well if anything fails.
+    """
+    columns_str = ', '.join(PITCH_DATA_COLUMNS)
+    token = uuid.uuid4().hex[:12]
+    tables = [f'pitch_load_{token}_{worker}' for worker in range(workers)]
+    part_size = math.ceil(len(rows) / workers)
+    parts = [rows[start:start + part_size] for start in range(0, len(rows), part_size)]
+    cursor = conn.cursor()
+    try:
+        for table in tables:
+            cursor.execute(f"CREATE UNLOGGED TABLE {table} AS SELECT {columns_str} FROM pitch WITH NO DATA;")
+        conn.commit()
+        copy_rows_concurrently(connect_to_db, tables[:len(parts)], PITCH_DATA_COLUMNS, parts)
+        cursor.execute(merge_pitch_query(tables))
+        cursor.execute(f"DROP TABLE {', '.join(tables)};")
+        conn.commit()
+    except psycopg2.Error:
+        conn.rollback()
+        cursor.execute(f"DROP TABLE IF EXISTS {', '.join(tables)};")
+        conn.commit()
+        raise
+    finally:
+        cursor.close()
+
+
+def merge_pitch_query(tables):
+    """ INSERT ... ON CONFLICT of the rows of the given staging tables into 'pitch'. """
+    columns_str = ', '.join(PITCH_DATA_COLUMNS)
+    update_str = ', '.join(f'{column} = EXCLUDED.{column}' for column in PITCH_DATA_COLUMNS if column not in PITCH_CONFLICT_KEY)
+    select_str = ' UNION ALL '.join(f'SELECT {columns_str} FROM {table}' for table in tables)
+    return f"""
+        INSERT INTO pitch ({columns_str})
+        {select_str}
+        ON CONFLICT ({', '.join(PITCH_CONFLICT_KEY)})
+        DO UPDATE SET {update_str};
+        """
+
+
+def finish_staged_game(conn, s3, bucket, key, file_name, game, accumulators, progress):
+    """ Write a staged game's aggregates once its pitches are in, then release it and its parked positioning files. """
+    write_pitch_aggregates(conn, game['game_id'], *accumulators)
+    bump_ingestion_version(conn, game['game_id'])
+    progress.complete()
+    s3.delete_object(Bucket=bucket, Key=key)
+    ingest_parked_positioning_files(conn, game_key(file_name), (game['home_team'], game['away_team']), s3)
+
+
 def get_csv(event, s3):
-    """Use event object's JSON to return a CSV from the S3 bucket."""
+    """Use event object's JSON to return a CSV from the S3 bucket (or TRACKMAN_SOURCE_DIR, see sources.py).
+    gzip/zstd objects (ex: '...-1.csv.gz') are decompressed as the CSV is read; file_name drops the compression suffix.
+    """
     bucket = event['Records'][0]['s3']['bucket']['name']
     key = event['Records'][0]['s3']['object']['key'] # path to CSV file in S3 bucket
-    res = s3.get_object(Bucket=bucket, Key=key)
+    body, _, _ = trackman_source(bucket, s3).get(key)
 
-
-    string = res['Body'].read().decode('utf-8')
-    csv = StringIO(string)
-    file_name = key.split('/')[-1]
+    csv = open_text_stream(body, key) # streamed from S3 as the parser reads it
+    file_name = strip_compression_suffix(key.split('/')[-1])
     print("Got csv:", file_name)
 
     return csv, file_name
@@ -50,112 +451,125 @@ def connect_to_db():
     return conn
 
 
-def process_csv(file, file_name, conn, s3):
-    """ Read CSV, operate on the data, and insert the data into the database."""
+def process_csv(file, file_name, conn, s3, teams=None, progress=None):
+    """ Read CSV, operate on the data, and insert the data into the database.
+    teams optionally gives (HomeTeam, AwayTeam) of a player positioning file; see get_game_info.
+    Returns the game's details, or None if the game was not ingested.
+    """
+    import pandas as pd
     print("Processing csv...")
-    df = pd.read_csv(file)
+    df = pd.read_csv(file, dtype=CATEGORICAL_DTYPES)
     df = df.where(pd.notnull(df), None) # cast empty values to None (instead of Float, for ex.)
-    game = get_game_info(file_name, df, conn, s3)
-    game_id = determine_game_id(file_name, conn, df, game, s3)
+    game = get_game_info(file_name, df, conn, s3, teams)
+    game_id = determine_game_id(file_name, conn, df, game, s3, resuming=bool(progress and progress.resuming))
     if not game_id:
         print("Not inserting game.")
-        return # "game_id == None" tells us that we should not insert the given data.
-    
-    # check if game exists already
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT 1
-        FROM pitch
-        WHERE game_id = %s;
-        """,
-        (game_id,)
-    )
-    game_exists = True if cursor.fetchone() else False
+        return None # "game_id == None" tells us that we should not insert the given data.
+    game['game_id'] = game_id
+    write_file_profile(conn, file_name, game_id, compute_file_profile(df, NUMERIC_COLUMNS))
     
+    # write straight into the game's season partition; rows without a Date take the game's date.
+    pitch_table = ensure_pitch_partition(conn, game['date'])
+    df['Date'] = df['Date'].where(df['Date'].notna(), game['date'])
+
+    # only rows that pass validation reach the DB; the rest are reported with their reasons.
+    df, rejected = validate_trackman_rows(df)
+    if not rejected.empty:
+        quarantine_rows(rejected, file_name, s3)
+    if df.empty:
+        print(f'No valid rows in {file_name}.')
+        return game
+
     if game['file_type'] == 'pitch data':
-        handle_pitch_data(conn, df, game_id, game_exists)
+        handle_pitch_data(conn, df, game_id, pitch_table, progress, swap=game.get('replaces_unverified', False))
     elif game['file_type'] == 'player positioning':
-        handle_playerpos_data(conn, df, game_id, game_exists)
+        handle_playerpos_data(conn, df, game_id, pitch_table, progress)
     else:
         print(f'Error: invalid file type. {file_name} was not inserted.')
+    return game
 
 
-def handle_pitch_data(conn, df, game_id, game_exists):
-    # create PITCH table linked to game_id; insert data into PITCH table.
+def ensure_pitch_partition(conn, date):
+    """ Return the season partition of 'pitch' that holds the given date, creating it if it does not exist.
+    Writing to the partition directly skips tuple routing and keeps every statement on a single season.
+    """
     cursor = conn.cursor()
+    cursor.execute("SELECT create_pitch_season_partition(EXTRACT(YEAR FROM %s::date)::integer);", (date,))
+    pitch_table = cursor.fetchone()[0]
+    conn.commit()
+    cursor.close()
+    return pitch_table
 
-    columns = (
-        'hit_trajectory_zc2', 'pitcher_id', 'batter_id', 'game_id', 'date', 'time', 'pa_of_inning', 'pitch_of_pa', 'hit_trajectory_zc7', 
-        'hit_trajectory_zc8', 'throw_speed', 'pop_time', 'exchange_time', 'time_to_base', 'catch_position_x', 'catch_position_y', 
-        'catch_position_z', 'throw_position_x', 'throw_position_y', 'throw_position_z', 'base_position_x', 'base_position_y', 
-        'base_position_z', 'throw_trajectory_xc0', 'throw_trajectory_xc1', 'throw_trajectory_xc2', 'throw_trajectory_yc0', 
-        'throw_trajectory_yc1', 'throw_trajectory_yc2', 'throw_trajectory_zc0', 'throw_trajectory_zc1', 'throw_trajectory_zc2', 
-        'inning', 'outs', 'balls', 'strikes', 'outs_on_play', 'runs_scored', 'tilt', 'y0', 'local_date_time', 'catcher_id', 
-        'pitch_number', 'rel_speed', 'vert_rel_angle', 'horz_rel_angle', 'spin_rate', 
-        'spin_axis', 'rel_height', 'rel_side', 'extension', 'vert_break', 'induced_vert_break', 'horz_break', 'plate_loc_height', 
-        'plate_loc_side', 'zone_speed', 'vert_appr_angle', 'horz_appr_angle', 'zone_time', 'exit_speed', 'angle', 'direction', 
-        'hit_spin_rate', 'position_at_110_x', 'position_at_110_y', 'position_at_110_z', 'distance', 'last_tracked_distance', 
-        'bearing', 'hang_time', 'pfxx', 'pfxz', 'x0', 'z0', 'vx0', 'vy0', 'vz0', 'ax0', 'ay0', 'az0', 'effective_velo', 
-        'max_height', 'measured_duration', 'speed_drop', 'pitch_last_measured_x', 'pitch_last_measured_y', 'pitch_last_measured_z', 
-        'contact_position_x', 'contact_position_y', 'contact_position_z', 'pitch_trajectory_xc0', 'pitch_trajectory_xc1', 
-        'pitch_trajectory_xc2', 'pitch_trajectory_yc0', 'pitch_trajectory_yc1', 'pitch_trajectory_yc2', 'pitch_trajectory_zc0', 
-        'pitch_trajectory_zc1', 'pitch_trajectory_zc2', 'hit_spin_axis', 'hit_trajectory_xc0', 'hit_trajectory_xc1', 
-        'hit_trajectory_xc2', 'hit_trajectory_xc3', 'hit_trajectory_xc4', 'hit_trajectory_xc5', 'hit_trajectory_xc6', 
-        'hit_trajectory_xc7', 'hit_trajectory_xc8', 'hit_trajectory_yc0', 'hit_trajectory_yc1', 'hit_trajectory_yc2', 
-        'hit_trajectory_yc3', 'hit_trajectory_yc4', 'hit_trajectory_yc5', 'hit_trajectory_yc6', 'hit_trajectory_yc7', 
-        'hit_trajectory_yc8', 'hit_trajectory_zc0', 'hit_trajectory_zc1', 'hit_trajectory_zc3', 'hit_trajectory_zc4', 
-        'hit_trajectory_zc5', 'hit_trajectory_zc6', 'pitcher_throws', 'pitcher_team_code', 'batter_side', 'batter_team_code', 'pitcher_set', 
-        'catcher_throws', 'top_or_bottom', 'hit_launch_confidence', 'hit_landing_confidence', 'tagged_pitch_type', 
-        'auto_pitch_type', 'pitch_call', 'k_or_bb', 'tagged_hit_type', 'play_result', 'catcher_throw_catch_confidence', 
-        'catcher_throw_release_confidence', 'notes', 'catcher_throw_location_confidence', 'pitch_release_confidence', 
-        'pitch_location_confidence', 'auto_hit_type', 'pitch_movement_confidence'
-        )
-    
-    placeholders_str = ', '.join(['%s'] * len(columns))
+
+def handle_pitch_data(conn, df, game_id, pitch_table, progress=None, swap=False):
+    # create PITCH table linked to game_id; insert data into PITCH table.
+
+    # a repeated pitch is written and summarized once, from its last row (see last_pitch_records)
+    df = df.drop_duplicates(subset=['PitchNo', 'Date'], keep='last')
+
+    # Get or insert player data for pitcher, batter, and catcher once per distinct player
+    pitcher_ids = resolve_player_ids(df, 'Pitcher', 'PitcherThrows', 'PitcherTeam', "pitcher", conn)
+    batter_ids = resolve_player_ids(df, 'Batter', 'BatterSide', 'BatterTeam', "batter", conn)
+    catcher_ids = resolve_player_ids(df, 'Catcher', 'CatcherThrows', 'CatcherTeam', "catcher", conn)
+
+    derived = compute_derived_metrics({column: df[column] for column in METRIC_INPUTS if column in df})
+
+    rows = []
     # iterate over each row in the DataFrame to insert pitch data
-    for index, row in df.iterrows():
-        # Get or insert player data for pitcher, batter, and catcher
-        pitcher_id = get_or_insert_player(row['Pitcher'], row['PitcherThrows'], row['PitcherTeam'], "pitcher", conn)
-        batter_id = get_or_insert_player(row['Batter'], row['BatterSide'], row['BatterTeam'], "batter", conn)
-        catcher_id = get_or_insert_player(row['Catcher'], row['CatcherThrows'], row['CatcherTeam'], "catcher", conn)
-        pitcher_set = check_undefined_or_nan(row['PitcherSet'])
-
-        values = ( 
-            row['HitTrajectoryZc2'], pitcher_id, batter_id, game_id, row['Date'], row['Time'], row['PAofInning'], 
-            row['PitchofPA'], row['HitTrajectoryZc7'], row['HitTrajectoryZc8'], row['ThrowSpeed'], row['PopTime'], row['ExchangeTime'], row['TimeToBase'], 
-            row['CatchPositionX'], row['CatchPositionY'], row['CatchPositionZ'], row['ThrowPositionX'], row['ThrowPositionY'], 
-            row['ThrowPositionZ'], row['BasePositionX'], row['BasePositionY'], row['BasePositionZ'], row['ThrowTrajectoryXc0'], 
-            row['ThrowTrajectoryXc1'], row['ThrowTrajectoryXc2'], row['ThrowTrajectoryYc0'], row['ThrowTrajectoryYc1'], 
-            row['ThrowTrajectoryYc2'], row['ThrowTrajectoryZc0'], row['ThrowTrajectoryZc1'], row['ThrowTrajectoryZc2'], row['Inning'], 
-            row['Outs'], row['Balls'], row['Strikes'], row['OutsOnPlay'], row['RunsScored'], row['Tilt'], row['y0'], 
-            row['LocalDateTime'], 
-            catcher_id, row['PitchNo'], row['RelSpeed'], row['VertRelAngle'], row['HorzRelAngle'], 
-            row['SpinRate'], row['SpinAxis'], row['RelHeight'], row['RelSide'], row['Extension'], row['VertBreak'], row['InducedVertBreak'], 
-            row['HorzBreak'], row['PlateLocHeight'], row['PlateLocSide'], row['ZoneSpeed'], row['VertApprAngle'], row['HorzApprAngle'], 
-            row['ZoneTime'], row['ExitSpeed'], row['Angle'], row['Direction'], row['HitSpinRate'], row['PositionAt110X'], 
-            row['PositionAt110Y'], row['PositionAt110Z'], row['Distance'], row['LastTrackedDistance'], row['Bearing'], row['HangTime'], 
-            row['pfxx'], row['pfxz'], row['x0'], row['z0'], row['vx0'], row['vy0'], row['vz0'], row['ax0'], row['ay0'], row['az0'], 
-            row['EffectiveVelo'], row['MaxHeight'], row['MeasuredDuration'], row['SpeedDrop'], row['PitchLastMeasuredX'],
-            row['PitchLastMeasuredY'], row['PitchLastMeasuredZ'], row['ContactPositionX'], row['ContactPositionY'], 
-            row['ContactPositionZ'], row['PitchTrajectoryXc0'], row['PitchTrajectoryXc1'], row['PitchTrajectoryXc2'], row['PitchTrajectoryYc0'], 
-            row['PitchTrajectoryYc1'], row['PitchTrajectoryYc2'], row['PitchTrajectoryZc0'], row['PitchTrajectoryZc1'], row['PitchTrajectoryZc2'], 
-            row['HitSpinAxis'], row['HitTrajectoryXc0'], row['HitTrajectoryXc1'], row['HitTrajectoryXc2'], row['HitTrajectoryXc3'], 
-            row['HitTrajectoryXc4'], row['HitTrajectoryXc5'], row['HitTrajectoryXc6'], row['HitTrajectoryXc7'], row['HitTrajectoryXc8'], 
-            row['HitTrajectoryYc0'], row['HitTrajectoryYc1'], row['HitTrajectoryYc2'], row['HitTrajectoryYc3'], row['HitTrajectoryYc4'], 
-            row['HitTrajectoryYc5'], row['HitTrajectoryYc6'], row['HitTrajectoryYc7'], row['HitTrajectoryYc8'], row['HitTrajectoryZc0'], 
-            row['HitTrajectoryZc1'], row['HitTrajectoryZc3'], row['HitTrajectoryZc4'], row['HitTrajectoryZc5'], 
-            row['HitTrajectoryZc6'], row['PitcherThrows'], row['PitcherTeam'], row['BatterSide'], row['BatterTeam'], pitcher_set, 
-            row['CatcherThrows'], row['Top/Bottom'], row['HitLaunchConfidence'], row['HitLandingConfidence'], 
-            row['TaggedPitchType'], row['AutoPitchType'], row['PitchCall'], row['KorBB'], row['TaggedHitType'], row['PlayResult'], 
-            row['CatcherThrowCatchConfidence'], row['CatcherThrowReleaseConfidence'], row['Notes'], row['CatcherThrowLocationConfidence'], 
-            row['PitchReleaseConfidence'], row['PitchLocationConfidence'], row['AutoHitType'], row['PitchMovementConfidence']
-            )
-        
-        if game_exists:
-            insert_data_game_exists(columns, values, game_id, row['PitchNo'], conn)
-        else:
-            insert_data_game_dne(columns, values, placeholders_str, conn)
+    for (index, row), derived_values in zip(df.iterrows(), derived):
+        values = pitch_data_values(row, game_id, pitcher_ids[index], batter_ids[index], catcher_ids[index], derived_values)
+        rows.append(values)
+
+    if swap:
+        if not swap_verified_pitch_rows(rows, pitch_table, game_id, conn):
+            return
+    else:
+        upsert_pitch_rows(PITCH_DATA_COLUMNS, rows, pitch_table, conn, progress)
+
+    # summarize the game, its pitchers' arsenals and its plate appearances while its pitches are still in memory
+    summaries = compute_game_summaries(df, pitcher_ids)
+    write_game_summaries(conn, game_id, summaries)
+    write_arsenal(conn, game_id, compute_arsenal(df, pitcher_ids))
+    apply_stat_deltas(conn, game_id, compute_stat_deltas(df, pitcher_ids, batter_ids))
+    plate_appearances = compute_plate_appearances({column: df[column] for column in PLATE_APPEARANCE_INPUTS if column in df}, pitcher_ids, batter_ids)
+    write_plate_appearances(conn, game_id, plate_appearances)
+
+
+def pitch_data_values(row, game_id, pitcher_id, batter_id, catcher_id, derived):
+    """ Return the values of one Trackman pitch data row, ordered like PITCH_DATA_COLUMNS.
+    row can be a dataframe row or a dict of CSV fields; derived holds the row's DERIVED_METRICS.
+    """
+    pitcher_set = check_undefined_or_nan(row['PitcherSet'])
+    return (
+        row['HitTrajectoryZc2'], pitcher_id, batter_id, game_id, row['Date'], row['Time'], row['PAofInning'], 
+        row['PitchofPA'], row['HitTrajectoryZc7'], row['HitTrajectoryZc8'], row['ThrowSpeed'], row['PopTime'], row['ExchangeTime'], row['TimeToBase'], 
+        row['CatchPositionX'], row['CatchPositionY'], row['CatchPositionZ'], row['ThrowPositionX'], row['ThrowPositionY'], 
+        row['ThrowPositionZ'], row['BasePositionX'], row['BasePositionY'], row['BasePositionZ'], row['ThrowTrajectoryXc0'], 
+        row['ThrowTrajectoryXc1'], row['ThrowTrajectoryXc2'], row['ThrowTrajectoryYc0'], row['ThrowTrajectoryYc1'], 
+        row['ThrowTrajectoryYc2'], row['ThrowTrajectoryZc0'], row['ThrowTrajectoryZc1'], row['ThrowTrajectoryZc2'], row['Inning'], 
+        row['Outs'], row['Balls'], row['Strikes'], row['OutsOnPlay'], row['RunsScored'], row['Tilt'], row['y0'], 
+        row['LocalDateTime'], 
+        catcher_id, row['PitchNo'], row['RelSpeed'], row['VertRelAngle'], row['HorzRelAngle'], 
+        row['SpinRate'], row['SpinAxis'], row['RelHeight'], row['RelSide'], row['Extension'], row['VertBreak'], row['InducedVertBreak'], 
+        row['HorzBreak'], row['PlateLocHeight'], row['PlateLocSide'], row['ZoneSpeed'], row['VertApprAngle'], row['HorzApprAngle'], 
+        row['ZoneTime'], row['ExitSpeed'], row['Angle'], row['Direction'], row['HitSpinRate'], row['PositionAt110X'], 
+        row['PositionAt110Y'], row['PositionAt110Z'], row['Distance'], row['LastTrackedDistance'], row['Bearing'], row['HangTime'], 
+        row['pfxx'], row['pfxz'], row['x0'], row['z0'], row['vx0'], row['vy0'], row['vz0'], row['ax0'], row['ay0'], row['az0'], 
+        row['EffectiveVelo'], row['MaxHeight'], row['MeasuredDuration'], row['SpeedDrop'], row['PitchLastMeasuredX'],
+        row['PitchLastMeasuredY'], row['PitchLastMeasuredZ'], row['ContactPositionX'], row['ContactPositionY'], 
+        row['ContactPositionZ'], row['PitchTrajectoryXc0'], row['PitchTrajectoryXc1'], row['PitchTrajectoryXc2'], row['PitchTrajectoryYc0'], 
+        row['PitchTrajectoryYc1'], row['PitchTrajectoryYc2'], row['PitchTrajectoryZc0'], row['PitchTrajectoryZc1'], row['PitchTrajectoryZc2'], 
+        row['HitSpinAxis'], row['HitTrajectoryXc0'], row['HitTrajectoryXc1'], row['HitTrajectoryXc2'], row['HitTrajectoryXc3'], 
+        row['HitTrajectoryXc4'], row['HitTrajectoryXc5'], row['HitTrajectoryXc6'], row['HitTrajectoryXc7'], row['HitTrajectoryXc8'], 
+        row['HitTrajectoryYc0'], row['HitTrajectoryYc1'], row['HitTrajectoryYc2'], row['HitTrajectoryYc3'], row['HitTrajectoryYc4'], 
+        row['HitTrajectoryYc5'], row['HitTrajectoryYc6'], row['HitTrajectoryYc7'], row['HitTrajectoryYc8'], row['HitTrajectoryZc0'], 
+        row['HitTrajectoryZc1'], row['HitTrajectoryZc3'], row['HitTrajectoryZc4'], row['HitTrajectoryZc5'], 
+        row['HitTrajectoryZc6'], row['PitcherThrows'], row['PitcherTeam'], row['BatterSide'], row['BatterTeam'], pitcher_set, 
+        row['CatcherThrows'], row['Top/Bottom'], row['HitLaunchConfidence'], row['HitLandingConfidence'], 
+        row['TaggedPitchType'], row['AutoPitchType'], row['PitchCall'], row['KorBB'], row['TaggedHitType'], row['PlayResult'], 
+        row['CatcherThrowCatchConfidence'], row['CatcherThrowReleaseConfidence'], row['Notes'], row['CatcherThrowLocationConfidence'], 
+        row['PitchReleaseConfidence'], row['PitchLocationConfidence'], row['AutoHitType'], row['PitchMovementConfidence']
+        ) + tuple(derived)
 
 
 def check_undefined_or_nan(val):
@@ -163,107 +577,403 @@ def check_undefined_or_nan(val):
         return None
     return val
 
-def handle_playerpos_data(conn, df, game_id, game_exists):
-    cursor = conn.cursor()
-    columns = (
-        'pitch_number', 'date', 'time', 'pitch_call', 'play_result', 'detected_shift', 'first_b_position_at_release_x', 'first_b_position_at_release_z',
-        'second_b_position_at_release_x', 'second_b_position_at_release_z', 'third_b_position_at_release_x', 'third_b_position_at_release_z',
-        'ss_position_at_release_x', 'ss_position_at_release_z', 'lf_position_at_release_x', 'lf_position_at_release_z', 'cf_position_at_release_x',
-        'cf_position_at_release_z', 'rf_position_at_release_x', 'rf_position_at_release_z', 'first_b_player_id', 'second_b_player_id',
-        'third_b_player_id', 'ss_player_id', 'lf_player_id', 'cf_player_id', 'rf_player_id'
-        )
-    placeholders_str = ', '.join(['%s'] * len(columns))
+def handle_playerpos_data(conn, df, game_id, pitch_table, progress=None):
+    # fielders are resolved once per distinct (name, team) rather than once per row.
+    fielder_ids = [
+        resolve_player_ids(df, f'{position}_Name', None, 'PitcherTeam', "defense", conn)
+        for position in FIELDER_POSITIONS
+        ]
+    rows = []
     for index, row in df.iterrows():
-        # could optimize these queries to only run if trackman-generated player ids in the current row
-        # are different than those in the previous row, but speed does not seem to be a high priority
-        # for our application.
-        first_base_player_id = get_or_insert_player(row['1B_Name'], None, row['PitcherTeam'], "defense", conn)
-        second_base_player_id = get_or_insert_player(row['2B_Name'], None, row['PitcherTeam'], "defense", conn)
-        third_base_player_id = get_or_insert_player(row['3B_Name'], None, row['PitcherTeam'], "defense", conn)
-        ss_player_id = get_or_insert_player(row['SS_Name'], None, row['PitcherTeam'], "defense", conn)
-        lf_player_id = get_or_insert_player(row['LF_Name'], None, row['PitcherTeam'], "defense", conn)
-        cf_player_id = get_or_insert_player(row['CF_Name'], None, row['PitcherTeam'], "defense", conn)
-        rf_player_id = get_or_insert_player(row['RF_Name'], None, row['PitcherTeam'], "defense", conn)
-        play_result = check_undefined_or_nan(row['PlayResult'])
-
-        values = (
-            row['PitchNo'], row['Date'], row['Time'], row['PitchCall'], play_result, row['DetectedShift'], row['1B_PositionAtReleaseX'], 
-            row['1B_PositionAtReleaseZ'], row['2B_PositionAtReleaseX'], row['2B_PositionAtReleaseZ'], row['3B_PositionAtReleaseX'],
-            row['3B_PositionAtReleaseZ'], row['SS_PositionAtReleaseX'], row['SS_PositionAtReleaseZ'], row['LF_PositionAtReleaseX'],
-            row['LF_PositionAtReleaseZ'], row['CF_PositionAtReleaseX'], row['CF_PositionAtReleaseZ'], row['RF_PositionAtReleaseX'],
-            row['RF_PositionAtReleaseZ'], first_base_player_id, second_base_player_id, third_base_player_id, ss_player_id, lf_player_id,
-            cf_player_id, rf_player_id
-            )
-        
-        if game_exists:
-            insert_data_game_exists(columns, values, game_id, row['PitchNo'], conn)
+        values = player_positioning_values(row, game_id, [ids[index] for ids in fielder_ids])
+        rows.append(values)
+
+    upsert_pitch_rows(PLAYER_POSITIONING_COLUMNS, rows, pitch_table, conn, progress)
+
+
+def player_positioning_values(row, game_id, fielder_ids):
+    """ Return the values of one player positioning row, ordered like PLAYER_POSITIONING_COLUMNS.
+    fielder_ids holds the player IDs of the fielders in FIELDER_POSITIONS order.
+    """
+    play_result = check_undefined_or_nan(row['PlayResult'])
+    return (
+        game_id, row['PitchNo'], row['Date'], row['Time'], row['PitchCall'], play_result, row['DetectedShift'], row['1B_PositionAtReleaseX'], 
+        row['1B_PositionAtReleaseZ'], row['2B_PositionAtReleaseX'], row['2B_PositionAtReleaseZ'], row['3B_PositionAtReleaseX'],
+        row['3B_PositionAtReleaseZ'], row['SS_PositionAtReleaseX'], row['SS_PositionAtReleaseZ'], row['LF_PositionAtReleaseX'],
+        row['LF_PositionAtReleaseZ'], row['CF_PositionAtReleaseX'], row['CF_PositionAtReleaseZ'], row['RF_PositionAtReleaseX'],
+        row['RF_PositionAtReleaseZ'], *fielder_ids
+        )
+
+
+def process_csv_light(file, file_name, conn, s3, teams=None, progress=None):
+    """ Pandas-free counterpart of process_csv for small files.
+
+    Rows are streamed from the csv module through validation, player resolution and summary
+    accumulation straight into the bulk writer, so a cold start never has to import pandas.
+    """
+    print("Processing csv (light engine)...")
+    profile = FileProfileAccumulator(NUMERIC_COLUMNS)
+    records = observed = profile.observe(read_trackman_records(file))
+
+    head, header = read_game_header(records)
+    if not head:
+        print(f'{file_name} has no rows.')
+        return None
+    game = get_game_info(file_name, header, conn, s3, teams)
+    game_id = determine_game_id(file_name, conn, header, game, s3, resuming=bool(progress and progress.resuming))
+    if not game_id:
+        print("Not inserting game.")
+        return None
+    game['game_id'] = game_id
+
+    pitch_table = ensure_pitch_partition(conn, game['date'])
+    rejected = []
+    records = valid_records(chain(head, records), game['date'], rejected)
+
+    if game['file_type'] == 'pitch data':
+        summary = GameSummaryAccumulator()
+        arsenal = ArsenalAccumulator()
+        stat_deltas = StatDeltaAccumulator()
+        plate_appearances = PlateAppearanceAccumulator()
+        rows = pitch_data_rows(records, game_id, summary, arsenal, stat_deltas, plate_appearances, conn)
+        if game.get('replaces_unverified'):
+            written = swap_verified_pitch_rows(rows, pitch_table, game_id, conn)
         else:
-            insert_data_game_dne(columns, values, placeholders_str, conn)
+            upsert_pitch_rows(PITCH_DATA_COLUMNS, rows, pitch_table, conn, progress)
+            written = True
+        if written:
+            write_pitch_aggregates(conn, game_id, summary, arsenal, stat_deltas, plate_appearances)
+    elif game['file_type'] == 'player positioning':
+        upsert_pitch_rows(PLAYER_POSITIONING_COLUMNS, player_positioning_rows(records, game_id, conn), pitch_table, conn, progress)
+    else:
+        print(f'Error: invalid file type. {file_name} was not inserted.')
 
+    if rejected:
+        quarantine_records(rejected, file_name, s3)
+    for _ in observed:
+        pass # profile any rows a failed write left unread
+    write_file_profile(conn, file_name, game_id, profile.profile())
+    return game
+
+
+def read_game_header(records):
+    """ Read records up to the first one with a Date: get_game_info needs the teams and the first
+    non-empty Date, so only those rows are buffered.
+
+    Returns:
+        tuple: The records read (list), and the columns get_game_info reads from them (dict of lists).
+    """
+    head = []
+    for record in records:
+        head.append(record)
+        if record.get('Date'):
+            break
+    header = {
+        'HomeTeam': [head[0].get('HomeTeam')] if head else [],
+        'AwayTeam': [head[0].get('AwayTeam')] if head else [],
+        'Date': [record.get('Date') for record in head],
+        }
+    return head, header
+
+
+def write_pitch_aggregates(conn, game_id, summary, arsenal, stat_deltas, plate_appearances):
+    """ Write the per-game aggregates the light engine's accumulators collected while the pitches were written. """
+    if not summary.pitch_count:
+        return
+    write_game_summaries(conn, game_id, summary.summaries())
+    write_arsenal(conn, game_id, arsenal.arsenal())
+    apply_stat_deltas(conn, game_id, stat_deltas.deltas())
+    write_plate_appearances(conn, game_id, plate_appearances.plate_appearances())
+
+
+def read_trackman_records(file):
+    """ Yield each CSV row as a dict. Missing cells become None and numeric columns are parsed to floats
+    (values that do not parse are left as strings for validation to report).
+    """
+    numeric_columns = frozenset(NUMERIC_COLUMNS)
+    for record in DictReader(file):
+        for column, value in record.items():
+            if column is None:
+                continue # cells past the header's last column (a list), kept as is for the quarantine report
+            if value in MISSING_VALUES:
+                record[column] = None
+            elif column in numeric_columns:
+                try:
+                    record[column] = float(value)
+                except ValueError:
+                    pass
+        yield record
+
+
+def valid_records(records, game_date, rejected):
+    """ Yield the records that pass validation; rows without a Date take the game's date.
+    Failing records are appended to rejected as (reasons, record) pairs.
+    """
+    for record in records:
+        if not record.get('Date'):
+            record['Date'] = game_date
+        failures = record_failures(record)
+        if failures:
+            rejected.append(('; '.join(failures), record))
+        else:
+            yield record
 
-def insert_data_game_exists(columns, values, game_id, pitch_number, conn):
+
+def pitch_data_rows(records, game_id, summary, arsenal, stat_deltas, plate_appearances, conn):
+    """ Yield pitch data values for each record, resolving each distinct player once.
+    Records are taken PITCH_BATCH_SIZE at a time so the derived metrics are computed a chunk at once.
+    A repeated pitch is only yielded (and accumulated) once; see last_pitch_records.
+    """
+    records = last_pitch_records(records)
+    players = {}
+    while True:
+        chunk = list(islice(records, PITCH_BATCH_SIZE))
+        if not chunk:
+            break
+        derived = compute_derived_metrics({column: [record.get(column) for record in chunk] for column in METRIC_INPUTS})
+        for record, derived_values in zip(chunk, derived):
+            pitcher_id = resolve_player_id(players, record['Pitcher'], record['PitcherThrows'], record['PitcherTeam'], "pitcher", conn)
+            batter_id = resolve_player_id(players, record['Batter'], record['BatterSide'], record['BatterTeam'], "batter", conn)
+            catcher_id = resolve_player_id(players, record['Catcher'], record['CatcherThrows'], record['CatcherTeam'], "catcher", conn)
+            summary.add(pitcher_id, record)
+            arsenal.add(pitcher_id, record)
+            stat_deltas.add(pitcher_id, batter_id, record)
+            plate_appearances.add(pitcher_id, batter_id, record)
+            yield pitch_data_values(record, game_id, pitcher_id, batter_id, catcher_id, derived_values)
+
+
+def last_pitch_records(records):
+    """ Return an iterator over the last record of each pitch (PitchNo and Date), in the order of those last records.
+    'pitch' keeps one row per pitch and a file that repeats one ends up with its last row, so the per-game
+    aggregates count it once, from that row. A file holds a single game, so its records are read up front.
+    """
+    latest = {}
+    for record in records:
+        key = (record['PitchNo'], record['Date'])
+        latest.pop(key, None) # re-inserted at the end, where the repeat is
+        latest[key] = record
+    return iter(latest.values())
+
+
+def player_positioning_rows(records, game_id, conn):
+    """ Yield player positioning values for each record, resolving each distinct fielder once. """
+    players = {}
+    for record in records:
+        fielder_ids = [
+            resolve_player_id(players, record[f'{position}_Name'], None, record['PitcherTeam'], "defense", conn)
+            for position in FIELDER_POSITIONS
+            ]
+        yield player_positioning_values(record, game_id, fielder_ids)
+
+
+def resolve_player_id(players, player_name, handedness, team_code, player_type, conn):
+    """ Memoized get_or_insert_player: the DB is only queried the first time a player is seen. """
+    key = (player_name_key(player_name), handedness, team_code, player_type)
+    if key not in players:
+        players[key] = get_or_insert_player(player_name, handedness, team_code, player_type, conn)
+    return players[key]
+
+
+def upsert_pitch_rows(columns, rows, pitch_table, conn, progress=None):
+    """ Insert or update pitch rows in batches, one INSERT ... ON CONFLICT statement per batch.
+
+    New pitch numbers are inserted and existing ones are updated, so new, re-sent and partially
+    re-sent games all take the same path. Only the given columns are overwritten on conflict,
+    which lets pitch data and player positioning files fill in the same rows independently.
+
+    With progress (IngestionProgress), each batch commits together with its checkpoint, and the rows
+    an interrupted earlier run already committed are skipped. Skipped rows are still consumed from
+    rows, so generators that accumulate over every row (ex: game summaries) see the whole file.
+
+    Batches start at PITCH_BATCH_SIZE rows and are resized from their write latency (see AdaptiveBatchSize).
+    """
+    columns_str = ', '.join(columns)
+    update_str = ', '.join(f'{column} = EXCLUDED.{column}' for column in columns if column not in PITCH_CONFLICT_KEY)
+    query = f"""
+        INSERT INTO {pitch_table} ({columns_str})
+        VALUES %s
+        ON CONFLICT ({', '.join(PITCH_CONFLICT_KEY)})
+        DO UPDATE SET {update_str};
+        """
     cursor = conn.cursor()
+    rows = iter(rows) # rows may be a list or a generator streaming from the CSV
+    if progress is not None and progress.committed_rows:
+        for _ in islice(rows, progress.committed_rows):
+            pass
+    batch_size = pitch_batch_size()
     try:
-        set_clause = construct_set_clause(columns)
-        # update data
-        cursor.execute(
-            f"""
-            UPDATE pitch
-            SET {set_clause}
-            WHERE game_id = %s
-            AND pitch_number = %s;
-            """,
-            values + (game_id,) + (pitch_number,)
-            )
-        # commit the transaction
-        conn.commit()
-        print('updated row')
-    except psycopg2.DataError as e:
-        conn.rollback()
-        print(f"DataError inserting data: {e}")
-        print(f"Problematic values: {values}")
-    except Exception as e:
-        # rollback the transaction in case of error
-        conn.rollback()
-        print(f"Error inserting data when game exists in DB: {e}")
+        while True:
+            batch = [nan_to_none(values) for values in islice(rows, batch_size.size)]
+            if not batch:
+                break
+            try:
+                start = time.perf_counter()
+                execute_values(cursor, query, batch, page_size=len(batch))
+                if progress is not None:
+                    progress.checkpoint(cursor, len(batch))
+                conn.commit()
+                batch_size.record(len(batch), time.perf_counter() - start)
+                print(f'upserted {len(batch)} rows')
+            except psycopg2.Error as e:
+                # rollback the batch and retry its rows one at a time so a single bad row is all we lose
+                conn.rollback()
+                print(f"Error upserting batch, retrying row by row: {e}")
+                upsert_rows_individually(cursor, query, batch, conn)
+                if progress is not None:
+                    progress.checkpoint(cursor, len(batch))
+                    conn.commit()
+            if progress is not None:
+                progress.chunk_committed(len(batch))
     finally:
         cursor.close()
 
-def insert_data_game_dne(columns, values, placeholders_str, conn):
-    columns_str = ', '.join(columns)
+
+def pitch_batch_size():
+    return AdaptiveBatchSize(PITCH_BATCH_SIZE, PITCH_BATCH_MIN_SIZE, PITCH_BATCH_MAX_SIZE, PITCH_BATCH_TARGET_SECONDS)
+
+
+def swap_verified_pitch_rows(rows, pitch_table, game_id, conn):
+    """ Replace an unverified game's pitch data with the rows of its verified file and mark the game
+    verified, all in one transaction, so readers never see a verified game with unverified data.
+
+    The rows are bulk-loaded into a temporary staging table first (the light engine's row generator
+    commits player inserts while it is consumed, so the staging table is dropped explicitly rather
+    than on commit). The swap then upserts them (keeping the player positioning columns of existing
+    rows), deletes the game's pitches that the verified file does not have, and flips game.verified.
+    When the file repeats a pitch number, its last row wins, as it does in upsert_pitch_rows.
+
+    Returns:
+        bool: True if the swap committed. On failure nothing changes and the game stays unverified.
+    """
+    columns_str = ', '.join(PITCH_DATA_COLUMNS)
+    update_str = ', '.join(f'{column} = EXCLUDED.{column}' for column in PITCH_DATA_COLUMNS if column not in PITCH_CONFLICT_KEY)
     cursor = conn.cursor()
-    # insert data
+    rows = iter(rows)
     try:
         cursor.execute(
             f"""
-            INSERT INTO pitch ({columns_str})
-            VALUES ({placeholders_str});
+            CREATE TEMP TABLE pitch_staging AS SELECT {columns_str} FROM {pitch_table} WITH NO DATA;
+            ALTER TABLE pitch_staging ADD COLUMN row_order BIGSERIAL; -- file order, numbered as rows are inserted
+            """
+        )
+        row_count = 0
+        batch_size = pitch_batch_size()
+        while True:
+            batch = [nan_to_none(values) for values in islice(rows, batch_size.size)]
+            if not batch:
+                break
+            start = time.perf_counter()
+            execute_values(cursor, f"INSERT INTO pitch_staging ({columns_str}) VALUES %s;", batch, page_size=len(batch))
+            batch_size.record(len(batch), time.perf_counter() - start)
+            row_count += len(batch)
+        cursor.execute(
+            f"""
+            INSERT INTO {pitch_table} ({columns_str})
+            SELECT DISTINCT ON ({', '.join(PITCH_CONFLICT_KEY)}) {columns_str} FROM pitch_staging
+            ORDER BY {', '.join(PITCH_CONFLICT_KEY)}, row_order DESC
+            ON CONFLICT ({', '.join(PITCH_CONFLICT_KEY)})
+            DO UPDATE SET {update_str};
+
+            DELETE FROM {pitch_table} p
+            WHERE p.game_id = %s
+                AND NOT EXISTS (
+                    SELECT 1 FROM pitch_staging s
+                    WHERE s.pitch_number = p.pitch_number AND s.date = p.date
+                );
+
+            UPDATE game
+            SET verified = true
+            WHERE game_id = %s;
+
+            DROP TABLE pitch_staging;
             """,
-            values
+            (game_id, game_id)
         )
         conn.commit()
-        print('inserted row')
-    except Exception as e:
-        # rollback the transaction in case of error
+        print(f'Swapped in {row_count} verified rows for game {game_id}')
+        return True
+    except psycopg2.Error as e:
         conn.rollback()
-        print(f"Error inserting data when game previously DNE in DB: {e}")
+        cursor.execute("DROP TABLE IF EXISTS pitch_staging;")
+        conn.commit()
+        print(f'Error swapping in verified rows for game {game_id}; the game stays unverified: {e}')
+        return False
     finally:
         cursor.close()
 
 
+def nan_to_none(values):
+    """ Missing pandas values (NaN, including missing categories) are written as NULL. """
+    return tuple(None if isinstance(value, float) and math.isnan(value) else value for value in values)
+
+
+def upsert_rows_individually(cursor, query, rows, conn):
+    for values in rows:
+        try:
+            execute_values(cursor, query, [values])
+            conn.commit()
+        except psycopg2.DataError as e:
+            conn.rollback()
+            print(f"DataError inserting data: {e}")
+            print(f"Problematic values: {values}")
+        except Exception as e:
+            conn.rollback()
+            print(f"Error upserting pitch row: {e}")
+
+
 def validate_type(data):
     return data if isinstance(data, str) else None
 
-def construct_set_clause(columns):
-    set_clause = ''
-    for i in range(len(columns)):
-        set_clause += (f'{columns[i]} = %s, ')
-    set_clause = set_clause[:-2] # remove final ', '
-    return set_clause  
+
+def resolve_player_ids(df, name_column, hand_column, team_column, player_type, conn):
+    """ Get or insert the player for every row of df, querying the DB once per distinct player.
+
+    Names are grouped by player_name_key, so spelling variants within the file are one lookup.
+    The handedness and team columns are categoricals, so grouping them works on their integer
+    codes. Groups are numbered in order of first appearance, which keeps handedness updates
+    (ex: detecting switch hitters) in the same order as a row-by-row pass.
+
+    Returns:
+        Series: The player ID for each row of df (None where the row has no player).
+    """
+    keys = df[[column for column in (hand_column, team_column) if column]].assign(name_key=df[name_column].map(player_name_key))
+    groups = keys.groupby(list(keys.columns), observed=True, dropna=False, sort=False).ngroup()
+    player_ids = {}
+    for index, group in groups.drop_duplicates().items():
+        player_ids[group] = get_or_insert_player(
+            missing_to_none(df.at[index, name_column]),
+            missing_to_none(df.at[index, hand_column]) if hand_column else None,
+            missing_to_none(df.at[index, team_column]),
+            player_type,
+            conn
+        )
+    return groups.map(player_ids).astype(object)
+
+
+def missing_to_none(value):
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+
+def player_name_key(player_name):
+    """ Normalize a Trackman player name so its spelling variants match: Unicode NFKC, 'Last, First' =>
+    'First Last', whitespace collapsed, lowercase. Same as the player_name_key() SQL function behind
+    player.player_name_key (migrations/009_player_name_key.sql).
+
+    ex: ' SMITH,  John ' => 'john smith'
+    """
+    if not isinstance(player_name, str):
+        return None
+    name = unicodedata.normalize('NFKC', player_name)
+    if name.count(',') == 1:
+        last, first = name.split(',')
+        name = f'{first} {last}'
+    return ' '.join(name.split()).lower() or None
 
 
 def get_or_insert_player(player_name, handedness, team_code, player_type, conn):
-    """ Get the player ID from the player name, handedness, and team. Insert the player if they do not exist. """
+    """ Get the player ID from the player name, handedness, and team. Insert the player if they do not exist.
+    Players are matched on their normalized name (player_name_key), so spelling variants share one row.
+    """
 
     # Edge case: player_name is null (not usefull to us)
     if not player_name or (isinstance(player_name, str) and player_name.lower() == "nan"):
@@ -282,12 +992,14 @@ def get_or_insert_player(player_name, handedness, team_code, player_type, conn):
     
     try:
         cursor = conn.cursor()
+        # serialize concurrent ingestions on this player until the transaction below commits
+        lock_key(conn, 'player', player_name_key(player_name), team_id)
         # check if the player already exists
         cursor.execute(
             """
             SELECT player_id, player_pitching_handedness, player_batting_handedness
             FROM player 
-            WHERE player_name = %s AND team_id = %s;
+            WHERE player_name_key = player_name_key(%s) AND team_id = %s;
             """,
             (player_name, team_id)
         )
@@ -302,6 +1014,7 @@ def get_or_insert_player(player_name, handedness, team_code, player_type, conn):
                 handle_update_batting_handedness(player_id, handedness, existing_bat_hand, conn)
             elif player_type == "pitcher":
                 handle_update_pitching_handedness(player_id, handedness, existing_pitch_hand, conn)
+            conn.commit() # release the player lock
             return player_id
         else:
             # insert the player if they do not exist
@@ -333,6 +1046,7 @@ def get_or_insert_player(player_name, handedness, team_code, player_type, conn):
             result = cursor.fetchone()
             return result[0]
     except Exception as e:
+        conn.rollback()
         print(f'Error getting or inserting player id: {e}')
         return None
 
@@ -380,6 +1094,7 @@ def get_or_insert_team_id(team_code, conn):
     Will not fill in "league" (North or South) or "home_ballpark_id" fields.
     """
     cursor = conn.cursor()
+    lock_key(conn, 'team', team_code)
     cursor.execute(
         """
         SELECT team_id FROM team
@@ -389,6 +1104,7 @@ def get_or_insert_team_id(team_code, conn):
     )
     result = cursor.fetchone()
     if result:
+        conn.commit() # release the team lock
         return result[0]
     else:
         # insert team if it does not exist
@@ -404,7 +1120,19 @@ def get_or_insert_team_id(team_code, conn):
         return result[0]
     
 
-def determine_game_id(file_name, conn, df, game, s3):
+def lock_key(conn, *parts):
+    """ Take a transaction-scoped advisory lock on the key made of parts (ex: 'player', name, team_id).
+
+    Each get-or-insert below takes the lock for the row it looks up before its SELECT, so two
+    invocations resolving the same game, player or team cannot both miss it and insert a duplicate.
+    The lock is released when the caller commits or rolls back.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT pg_advisory_xact_lock(hashtextextended(%s, 0));", (':'.join(str(part) for part in parts),))
+    cursor.close()
+
+
+def determine_game_id(file_name, conn, df, game, s3, resuming=False):
     """ Determine the appropriate game ID for the file.
     If the game does not already have an associated ID, 
     this function will create a new row in 'game'.
@@ -414,6 +1142,10 @@ def determine_game_id(file_name, conn, df, game, s3):
         conn (connection): PostgreSQL connection object.
         df (dataframe): Dataframe containing the CSV's data.
         game (dict): Contains crucial information about the game.
+        resuming (bool): The file's previous ingestion was interrupted (see IngestionProgress),
+            so the existing game is this file's own and its ingestion continues.
+
+    Sets game['replaces_unverified'] when a verified file replaces an unverified game's data.
 
     Returns:
         int: The game ID the new game is associated with; 
@@ -434,6 +1166,8 @@ def determine_game_id(file_name, conn, df, game, s3):
 
         cursor.execute(team_id_query, (game['away_team'],))
         visiting_team_id = cursor.fetchone()[0]
+        # files of the same game wait here for each other; different games do not contend.
+        lock_key(conn, 'game', home_team_id, visiting_team_id, game['date'], game['daily_game_number'])
         # query the databse to check if this game already exists.
         cursor.execute(
             """
@@ -450,22 +1184,16 @@ def determine_game_id(file_name, conn, df, game, s3):
             existing_is_verified, existing_game_id = res
             if (game['verified'] and not existing_is_verified):
                 # If there already exists pitch data for this game, we only want to replace it if
-                # the old data is unverified and the new data is verified.
+                # the old data is unverified and the new data is verified. The game is marked verified
+                # by swap_verified_pitch_rows, in the same transaction that replaces its rows.
                 game_id = existing_game_id
-                cursor.execute(
-                    """
-                    UPDATE game
-                    SET verified = true
-                    WHERE game_id = %s;
-                    """,
-                    (game_id,)
-
-                )
-                conn.commit()
+                game['replaces_unverified'] = True
             elif game['file_type'] == 'player positioning':
                 # We assume that all player positioning data is unverified, so we can insert it regardless
                 # of whether the existing game is verified or not.
                 game_id = existing_game_id
+            elif resuming:
+                game_id = existing_game_id
         else:
             cursor.execute(
                 """
@@ -476,8 +1204,9 @@ def determine_game_id(file_name, conn, df, game, s3):
                 (home_team_id, visiting_team_id, game['ballpark_id'], game['verified'], game['date'], game['daily_game_number'])
             )
             game_id = cursor.fetchone()[0]
-            conn.commit()
+        conn.commit() # release the game lock
     except psycopg2.Error as db_error:
+        conn.rollback()
         print(f'Database error: {db_error}')
     except KeyError as key_error:
         print(f'Key error: {key_error}')
@@ -502,18 +1231,27 @@ def get_date_from_df(df):
     raise ValueError('All values in Date column are null.')
 
 
-def get_game_info(file_name, df, conn, s3):
+def get_game_info(file_name, df, conn, s3, teams=None):
     """ Return the game's details based on the CSV data, its file name, and existing data in the DB.
 
     Parameters:
         file_name (str): The name of the file to analyze.
         conn (connection): PostgreSQL connection object.
         df (dataframe): Dataframe containing the CSV's data.
+        teams (tuple): (HomeTeam, AwayTeam) of a player positioning file, if already known.
+            Otherwise they are read from the game's pitch data file in S3.
 
     Returns:
         dict: Dictionary containing data about the game.
     """
-    cursor = conn.cursor()
+    game = read_game_info(file_name, df, s3, teams)
+    if game is None:
+        return None
+    return add_game_ids(game, conn)
+
+
+def read_game_info(file_name, df, s3, teams=None):
+    """ The part of get_game_info read from the file alone, without the DB (see stage_csv). """
     game = {}
 
     # get game info from file name
@@ -524,9 +1262,9 @@ def get_game_info(file_name, df, conn, s3):
         game['verified'] = False
     else:
         game['verified'] = True
-    if len(file_name_details[2]) > 1 and file_name_details[2].endswith('playerpositioning_FHC.csv'):
+    if len(file_name_details[2]) > 1 and is_player_positioning_file(file_name_details[2]):
         game['file_type'] = 'player positioning'
-        home_and_away = get_player_positioning_teams(file_name, s3)
+        home_and_away = teams or get_player_positioning_teams(file_name, s3)
         if not home_and_away:
             # Could not find corresponding pitch data in S3 for given player positioning data. Abort insertion.
             return None
@@ -538,7 +1276,12 @@ def get_game_info(file_name, df, conn, s3):
         game['away_team'] = df['AwayTeam'][0][:3]
 
     game['date'] = get_date_from_df(df)
+    return game
+
 
+def add_game_ids(game, conn):
+    """ Add the IDs of the game's ballpark and teams to the details read by read_game_info. """
+    cursor = conn.cursor()
     # query database for ids based on names.
     ballpark_id_query = """
         SELECT ballpark_id FROM ballpark
@@ -562,10 +1305,10 @@ def get_game_info(file_name, df, conn, s3):
 def get_player_positioning_teams(file_name, s3):
     """
     Get the home team and away team for player positioning files by looking at the
-    corresponding pitch data CSVs in S3.
+    corresponding pitch data CSVs in S3 (or TRACKMAN_SOURCE_DIR, see sources.py).
 
     Returns:
-        2-tuple: (HomeTeam, AwayTeam); Strings.
+        2-tuple: (HomeTeam, AwayTeam); Strings. None if there is no pitch data file, or it has no rows.
     """
     split = file_name.split('_')
     verified_pitch_file_name = split[0] + '.csv'
@@ -580,37 +1323,43 @@ def get_player_positioning_teams(file_name, s3):
 
     day_after_year, day_after_month, day_after_day = get_day_after(year, month, day)
 
-    bucket = os.environ['BUCKET']
+    source = trackman_source(os.environ.get('BUCKET'), s3)
     key_prefixes = [None] * 2
     key_prefixes[0] = '/'.join([year, month, day, 'CSV'])
     key_prefixes[1] = '/'.join([day_after_year, day_after_month, day_after_day, 'CSV'])
     file = None
+    file_path = None
     exception_message = None
 
     for key_prefix in key_prefixes:
-        try:
-            # First, try to retrieve verified pitching data file.
-            verified_file_path = '/'.join([key_prefix, verified_pitch_file_name])
-            file = s3.get_object(Bucket=bucket, Key=verified_file_path)
-            break
-        except Exception:
-            try:
-                # Then, if unsuccessful, try to retrieve unverified pitching data file.
-                unverified_file_path = '/'.join([key_prefix, unverified_pitch_file_name])
-                file = s3.get_object(Bucket=bucket, Key=unverified_file_path)
+        # First, try to retrieve the verified pitching data file, then the unverified one;
+        # either may have been uploaded plain or compressed.
+        for pitch_file_name in (verified_pitch_file_name, unverified_pitch_file_name):
+            for suffix in ('',) + tuple(COMPRESSION_SUFFIXES):
+                try:
+                    file_path = '/'.join([key_prefix, pitch_file_name + suffix])
+                    file = source.get(file_path)
+                    break
+                except Exception as e:
+                    exception_message = e
+            if file:
                 break
-            except Exception as e:
-                exception_message = e
+        if file:
+            break
     
     if not file:
         print(exception_message)
         return None
     
-    file_content = file['Body'].read().decode('utf-8')
-    csv = StringIO(file_content) # Convert file from str. to csv
-    df = pd.read_csv(csv)
+    body, _, _ = file
+    csv = open_text_stream(body, file_path)
+    first_row = next(DictReader(csv), None) # only the first row is needed for the teams; the rest is never downloaded
+    body.close()
+    if first_row is None:
+        print(f'{file_path} has no rows.')
+        return None # like a missing pitch file: the positioning file is parked until a usable one is ingested
 
-    return (df['HomeTeam'][0][:3], df['AwayTeam'][0][:3])
+    return (first_row['HomeTeam'][:3], first_row['AwayTeam'][:3])
 
 
 def get_day_after(year, month, day):
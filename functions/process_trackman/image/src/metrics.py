@@ -0,0 +1,101 @@
+# Derived pitch metrics computed from Trackman's nine-parameter (constant acceleration) trajectory fit,
+# x(t) = x0 + vx0*t + ax0*t^2/2 (same for y and z), where t = 0 at y = y0 (50 ft from home plate).
+# Units follow Trackman: feet, seconds, ft/s, ft/s^2, inches for pfxx/pfxz and rpm for SpinRate.
+
+# Planes (name, distance in ft from home plate) at which approach angles are stored, in the columns
+# <name>_vert_appr_angle and <name>_horz_appr_angle. Trackman reports the angles at the front of the plate itself
+# (VertApprAngle/HorzApprAngle), so these are other planes: about where a hitter has to commit to a swing
+# (the "tunnel point") and the back tip of the plate. A new plane needs a migration adding its columns.
+APPROACH_ANGLE_PLANES = (('tunnel', 23.8), ('plate_back', 0.0))
+
+# Columns of 'pitch' filled with compute_derived_metrics, in order.
+DERIVED_METRICS = (
+    ('release_to_plate_time',)
+    + tuple(f'{name}_{angle}_appr_angle' for name, _ in APPROACH_ANGLE_PLANES for angle in ('vert', 'horz'))
+    + ('total_break', 'transverse_spin_rate', 'spin_efficiency')
+    )
+# Trackman columns the metrics are computed from.
+METRIC_INPUTS = ('y0', 'vx0', 'vy0', 'vz0', 'ax0', 'ay0', 'az0', 'pfxx', 'pfxz', 'SpinRate', 'Extension')
+
+PLATE_FRONT_Y = 17 / 12 # front edge of home plate
+RUBBER_Y = 60.5
+GRAVITY = 32.174
+# Drag/lift constant K = rho * A / (2m) for a regulation ball at sea level and 70F (Alan Nathan's trajectory model), 1/ft.
+LIFT_K = 0.005383
+# rpm per (ft/s) of surface speed for a 9.125 in circumference ball: 60 / (2*pi*r) with r in ft.
+RPM_PER_SURFACE_SPEED = 78.92
+
+
+def compute_derived_metrics(columns, planes=APPROACH_ANGLE_PLANES):
+    """ Compute DERIVED_METRICS for every pitch at once.
+
+    Parameters:
+        columns (dict): Maps each METRIC_INPUTS name to a sequence with one value per pitch
+            (a dataframe column, a list...). None, NaN and missing columns count as missing.
+        planes (tuple): (name, distance from home plate) of each plane to compute approach angles at;
+            the metrics only match DERIVED_METRICS with the default.
+
+    Returns:
+        list: One tuple per pitch ordered like DERIVED_METRICS; NaN where a metric cannot be computed.
+    """
+    import numpy as np
+    count = len(next(iter(columns.values()))) if columns else 0
+    c = {
+        name: np.asarray(columns[name], dtype=float) if name in columns else np.full(count, np.nan)
+        for name in METRIC_INPUTS
+        }
+    with np.errstate(invalid='ignore', divide='ignore'):
+        angles = [angle for _, y in planes for angle in approach_angles(c, y)]
+        transverse_spin = transverse_spin_rate(c)
+        metrics = (
+            release_to_plate_time(c),
+            *angles,
+            np.hypot(c['pfxx'], c['pfxz']), # total break, inches
+            transverse_spin,
+            np.clip(transverse_spin / np.where(c['SpinRate'] > 0, c['SpinRate'], np.nan), 0, 1),
+            )
+    return list(zip(*(metric.tolist() for metric in metrics)))
+
+
+def time_at_plane(c, y):
+    """ Time (s) at which each pitch crosses the plane at distance y (ft) from home plate; negative before y0. """
+    import numpy as np
+    # root of ay0*t^2/2 + vy0*t + (y0 - y) = 0 on the ball's path (vy0 < 0), in the form that stays exact as ay0 -> 0
+    return 2 * (c['y0'] - y) / (-c['vy0'] + np.sqrt(c['vy0'] ** 2 - 2 * c['ay0'] * (c['y0'] - y)))
+
+
+def approach_angles(c, y):
+    """ Vertical and horizontal approach angles (degrees) of each pitch at the plane y, defined like Trackman's
+    VertApprAngle/HorzApprAngle at the front of the plate. Negative vertical angles are descending.
+    """
+    import numpy as np
+    t = time_at_plane(c, y)
+    vx = c['vx0'] + c['ax0'] * t
+    vy = c['vy0'] + c['ay0'] * t
+    vz = c['vz0'] + c['az0'] * t
+    return -np.degrees(np.arctan(vz / vy)), -np.degrees(np.arctan(vx / vy))
+
+
+def release_to_plate_time(c):
+    """ Flight time (s) from the release point (RUBBER_Y - Extension) to the front of the plate. """
+    return time_at_plane(c, PLATE_FRONT_Y) - time_at_plane(c, RUBBER_Y - c['Extension'])
+
+
+def transverse_spin_rate(c):
+    """ Spin (rpm) perpendicular to the flight path, estimated from the Magnus part of the acceleration.
+
+    The acceleration less gravity is split into drag (along the velocity) and Magnus (across it) at the
+    midpoint of the flight; the Magnus acceleration gives the lift coefficient, and Nathan's
+    lift-vs-spin-factor relation C_L = S / (0.4 + 2.32 S) gives the spin factor S = r*omega/v.
+    """
+    import numpy as np
+    t = time_at_plane(c, PLATE_FRONT_Y) / 2
+    velocity = np.stack([c['vx0'] + c['ax0'] * t, c['vy0'] + c['ay0'] * t, c['vz0'] + c['az0'] * t])
+    acceleration = np.stack([c['ax0'], c['ay0'], c['az0'] + GRAVITY])
+    speed = np.linalg.norm(velocity, axis=0)
+    direction = velocity / speed
+    drag = (acceleration * direction).sum(axis=0) * direction
+    magnus = np.linalg.norm(acceleration - drag, axis=0)
+    lift_coefficient = magnus / (LIFT_K * speed ** 2)
+    spin_factor = 0.4 * lift_coefficient / (1 - 2.32 * lift_coefficient)
+    return np.where(spin_factor >= 0, RPM_PER_SURFACE_SPEED * spin_factor * speed, np.nan)
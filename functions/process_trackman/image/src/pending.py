@@ -0,0 +1,81 @@
+# Player positioning files only carry the teams of their game through the matching pitch data file.
+# When that file is not in S3 yet, the positioning file is parked in 'pending_positioning_file'
+# under its game key and ingested once the pitch data file arrives.
+
+PLAYER_POSITIONING_SUFFIX = 'playerpositioning_FHC.csv'
+
+
+def game_key(file_name):
+    """ Return the part of a Trackman file name shared by all of a game's files.
+    ex: '20240629-ClipperMagazine-1_unverified_playerpositioning_FHC.csv' => '20240629-ClipperMagazine-1'
+    """
+    return file_name.removesuffix('.csv').split('_')[0]
+
+
+def is_player_positioning_file(file_name):
+    return file_name.endswith(PLAYER_POSITIONING_SUFFIX)
+
+
+def park_positioning_file(conn, bucket, key):
+    """ Record an orphaned positioning file under its game key (re-parking a file only refreshes parked_at). """
+    file_name = key.split('/')[-1]
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        INSERT INTO pending_positioning_file (s3_key, bucket, game_key)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (s3_key)
+        DO UPDATE SET parked_at = now();
+        """,
+        (key, bucket, game_key(file_name))
+    )
+    conn.commit()
+    cursor.close()
+    print(f'Parked {file_name} until the pitch data for {game_key(file_name)} arrives.')
+
+
+def parked_positioning_files(conn, key):
+    """ Return the (bucket, s3_key) of every positioning file parked for the given game key. """
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT bucket, s3_key FROM pending_positioning_file
+        WHERE game_key = %s
+        ORDER BY parked_at;
+        """,
+        (key,)
+    )
+    files = cursor.fetchall()
+    conn.commit()
+    cursor.close()
+    return files
+
+
+def release_positioning_file(conn, key):
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM pending_positioning_file WHERE s3_key = %s;", (key,))
+    conn.commit()
+    cursor.close()
+
+
+def find_game_teams(conn, key):
+    """ Return (home team code, away team code) of the game with the given game key, or None if it is not in the DB. """
+    date, ballpark, daily_game_number = key.split('-')
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT home.team_code, away.team_code
+        FROM game g
+        JOIN ballpark b ON b.ballpark_id = g.ballpark_id
+        JOIN team home ON home.team_id = g.home_team_id
+        JOIN team away ON away.team_id = g.visiting_team_id
+        WHERE b.ballpark_name = %s
+            AND g.date = %s::date
+            AND g.daily_game_number = %s;
+        """,
+        (ballpark, date, int(daily_game_number))
+    )
+    teams = cursor.fetchone()
+    conn.commit()
+    cursor.close()
+    return teams
@@ -0,0 +1,158 @@
+from psycopg2.extras import execute_values
+
+# Trackman columns a game's plate appearances are rebuilt from.
+PLATE_APPEARANCE_INPUTS = (
+    'PitchNo', 'Inning', 'Top/Bottom', 'PAofInning', 'PitchofPA', 'Balls', 'Strikes', 'Outs',
+    'PitchCall', 'KorBB', 'PlayResult', 'OutsOnPlay', 'RunsScored'
+    )
+# Columns of the plate_appearance table after game_id, in order.
+PLATE_APPEARANCE_COLUMNS = (
+    'pa_number', 'inning', 'top_or_bottom', 'pa_of_inning', 'pitcher_id', 'batter_id',
+    'first_pitch_number', 'last_pitch_number', 'pitch_count', 'outs', 'start_balls', 'start_strikes',
+    'end_balls', 'end_strikes', 'result', 'outs_on_play', 'runs_scored',
+    'balls_sequence', 'strikes_sequence', 'pitch_calls'
+    )
+# KorBB values that end a plate appearance; otherwise its PlayResult or, failing that, these PitchCalls.
+KORBB_RESULTS = ('Strikeout', 'Walk')
+PITCH_CALL_RESULTS = ('HitByPitch',)
+
+
+def compute_plate_appearances(columns, pitcher_ids, batter_ids):
+    """ Rebuild a game's plate appearances from its pitches with vectorized ops.
+
+    Pitches are ordered by PitchNo, and a plate appearance starts wherever the inning, half or PAofInning
+    changes (or PitchofPA does not increase). Each one keeps its pitch number range, the count before its
+    first and last pitches, its result and the count and PitchCall of every pitch, so "how did this at-bat
+    unfold" questions read one row instead of sorting the game's pitches.
+
+    Parameters:
+        columns (dict): Maps each PLATE_APPEARANCE_INPUTS name to a sequence with one value per pitch
+            (a dataframe column, a list...). None, NaN and missing columns count as missing.
+        pitcher_ids, batter_ids (sequence): Resolved player IDs for each pitch.
+
+    Returns:
+        list: One tuple per plate appearance ordered like PLATE_APPEARANCE_COLUMNS.
+    """
+    import numpy as np
+    count = len(pitcher_ids)
+    if not count:
+        return []
+    numbers = {
+        name: to_float_array(columns.get(name), count)
+        for name in ('PitchNo', 'Inning', 'PAofInning', 'PitchofPA', 'Balls', 'Strikes', 'Outs', 'OutsOnPlay', 'RunsScored')
+        }
+    strings = {name: to_object_array(columns.get(name), count) for name in ('Top/Bottom', 'PitchCall', 'KorBB', 'PlayResult')}
+
+    order = np.argsort(numbers['PitchNo'], kind='stable')
+    numbers = {name: values[order] for name, values in numbers.items()}
+    strings = {name: values[order] for name, values in strings.items()}
+    pitcher_ids = to_object_array(pitcher_ids, count)[order]
+    batter_ids = to_object_array(batter_ids, count)[order]
+
+    changed = (
+        (numbers['Inning'][1:] != numbers['Inning'][:-1])
+        | (strings['Top/Bottom'][1:] != strings['Top/Bottom'][:-1])
+        | (numbers['PAofInning'][1:] != numbers['PAofInning'][:-1])
+        | (numbers['PitchofPA'][1:] <= numbers['PitchofPA'][:-1])
+        )
+    starts = np.flatnonzero(np.concatenate(([True], changed)))
+    ends = np.concatenate((starts[1:], [count])) - 1
+
+    korbb, play_result, pitch_call = strings['KorBB'][ends], strings['PlayResult'][ends], strings['PitchCall'][ends]
+    result = np.where(
+        np.isin(korbb, KORBB_RESULTS), korbb,
+        np.where(~np.isin(play_result, (None, 'Undefined')), play_result,
+                 np.where(np.isin(pitch_call, PITCH_CALL_RESULTS), pitch_call, None))
+        )
+    outs_on_play = np.add.reduceat(np.nan_to_num(numbers['OutsOnPlay']), starts)
+    runs_scored = np.add.reduceat(np.nan_to_num(numbers['RunsScored']), starts)
+    balls_sequences = np.split(numbers['Balls'], starts[1:])
+    strikes_sequences = np.split(numbers['Strikes'], starts[1:])
+    pitch_call_sequences = np.split(strings['PitchCall'], starts[1:])
+
+    rows = []
+    for pa, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        rows.append((
+            pa + 1,
+            to_int(numbers['Inning'][start]),
+            strings['Top/Bottom'][start],
+            to_int(numbers['PAofInning'][start]),
+            pitcher_ids[end],
+            batter_ids[end],
+            to_int(numbers['PitchNo'][start]),
+            to_int(numbers['PitchNo'][end]),
+            end - start + 1,
+            to_int(numbers['Outs'][start]),
+            to_int(numbers['Balls'][start]),
+            to_int(numbers['Strikes'][start]),
+            to_int(numbers['Balls'][end]),
+            to_int(numbers['Strikes'][end]),
+            result[pa],
+            int(outs_on_play[pa]),
+            int(runs_scored[pa]),
+            [to_int(value) for value in balls_sequences[pa]],
+            [to_int(value) for value in strikes_sequences[pa]],
+            pitch_call_sequences[pa].tolist(),
+            ))
+    return rows
+
+
+def to_float_array(values, count):
+    import numpy as np
+    if values is None:
+        return np.full(count, np.nan)
+    return np.array([np.nan if value is None else value for value in values], dtype=float)
+
+
+def to_object_array(values, count):
+    """ Values as an object array, with NaN (ex: from a categorical column) as None. """
+    import numpy as np
+    array = np.empty(count, dtype=object)
+    if values is not None:
+        array[:] = [None if isinstance(value, float) and value != value else value for value in values]
+    return array
+
+
+def to_int(value):
+    return None if value != value else int(value) # NaN => None
+
+
+class PlateAppearanceAccumulator:
+    """ Streaming counterpart of compute_plate_appearances for the light ingest engine.
+    Only the few fields plate appearances are built from are kept per pitch; plate_appearances()
+    then runs the same vectorized pass, so both engines store the same rows.
+    """
+
+    def __init__(self):
+        self.columns = {name: [] for name in PLATE_APPEARANCE_INPUTS}
+        self.pitcher_ids = []
+        self.batter_ids = []
+
+    def add(self, pitcher_id, batter_id, record):
+        for name, values in self.columns.items():
+            values.append(record.get(name))
+        self.pitcher_ids.append(pitcher_id)
+        self.batter_ids.append(batter_id)
+
+    def plate_appearances(self):
+        return compute_plate_appearances(self.columns, self.pitcher_ids, self.batter_ids)
+
+
+def write_plate_appearances(conn, game_id, rows):
+    """ Replace the game's plate appearances in a single transaction. """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM plate_appearance WHERE game_id = %s;", (game_id,))
+        if rows:
+            execute_values(
+                cursor,
+                f"INSERT INTO plate_appearance (game_id, {', '.join(PLATE_APPEARANCE_COLUMNS)}) VALUES %s;",
+                [(game_id,) + row for row in rows]
+            )
+        conn.commit()
+        print(f'Wrote {len(rows)} plate appearances for game {game_id}')
+    except Exception as e:
+        conn.rollback()
+        print(f'Error writing plate appearances: {e}')
+    finally:
+        cursor.close()
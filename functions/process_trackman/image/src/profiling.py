@@ -0,0 +1,72 @@
+import os
+from datetime import datetime, timezone
+
+# Profiles are written under this prefix of the Trackman bucket, or to PROFILE_DIR when it is set (ex: /tmp locally).
+PROFILE_PREFIX = 'profiles/'
+PROFILE_MODES = ('cpu', 'memory') # 'memory' adds tracemalloc allocation sites to the cProfile run
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+
+def profile_invocation(function, event, context, mode):
+    """ Run function(event, context) under cProfile (and tracemalloc for mode 'memory') and write
+    the pstats dump plus a text report of the slowest functions and largest allocation sites,
+    tagged with the event's file key.
+
+    Only called when profiling is requested, so the profilers are imported here rather than at cold start.
+    """
+    import cProfile
+    import tracemalloc
+    mode = mode if mode in PROFILE_MODES else 'cpu'
+    key = event['Records'][0]['s3']['object']['key']
+    profiler = cProfile.Profile()
+    if mode == 'memory':
+        tracemalloc.start()
+    try:
+        return profiler.runcall(function, event, context)
+    finally:
+        memory = None
+        if mode == 'memory':
+            memory = (tracemalloc.take_snapshot(), tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        try:
+            write_profile(profiler, memory, key)
+        except Exception as e:
+            print(f'Error writing profile for {key}: {e}')
+
+
+def write_profile(profiler, memory, key):
+    """ memory is (tracemalloc snapshot at the end of the invocation, peak traced bytes), or None. """
+    import pstats
+    from io import StringIO
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    base = f'{PROFILE_PREFIX}{key}/{stamp}'
+
+    report = StringIO()
+    report.write(f'Profile of {key} at {stamp}\n\n')
+    pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+    if memory is not None:
+        snapshot, peak = memory
+        report.write(f'Peak traced memory: {peak / 2**20:.1f} MiB\n')
+        report.write(f'Top {TOP_ALLOCATIONS} allocation sites still held at the end of the invocation:\n')
+        for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+            report.write(f'{stat}\n')
+
+    profile_dir = os.environ.get('PROFILE_DIR')
+    if profile_dir:
+        path = os.path.join(profile_dir, base)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        profiler.dump_stats(path + '.pstats')
+        with open(path + '.txt', 'w', encoding='utf-8') as f:
+            f.write(report.getvalue())
+        print(f'Wrote profile to {path}.pstats and {path}.txt')
+        return
+
+    import boto3
+    import marshal
+    profiler.create_stats()
+    s3 = boto3.client('s3')
+    bucket = os.environ['BUCKET']
+    s3.put_object(Bucket=bucket, Key=base + '.pstats', Body=marshal.dumps(profiler.stats)) # same format as dump_stats
+    s3.put_object(Bucket=bucket, Key=base + '.txt', Body=report.getvalue().encode('utf-8'), ContentType='text/plain')
+    print(f'Wrote profile to s3://{bucket}/{base}.pstats and .txt')
@@ -0,0 +1,89 @@
+import os
+
+# Chunked writes stop once the invocation has less than this left, leaving time to commit the
+# chunk and enqueue a continuation before Lambda's timeout (see TimeBudgetExhausted).
+TIME_BUDGET_MARGIN_MS = int(os.environ.get('INGEST_TIME_MARGIN_MS', 60_000))
+
+
+class TimeBudgetExhausted(Exception):
+    """ Raised right after a chunk commits when the invocation is running out of time.
+    Everything up to committed_rows is checkpointed, so a new invocation can resume from there.
+    """
+
+    def __init__(self, committed_rows):
+        super().__init__(f'time budget exhausted after {committed_rows} committed rows')
+        self.committed_rows = committed_rows
+
+
+class IngestionProgress:
+    """ Chunk checkpoints for the ingestion of one S3 object version, stored in 'ingestion_progress'.
+
+    A previous run of the same key and ETag that did not complete is resumed: its committed rows
+    are skipped by upsert_pitch_rows. A new ETag, or a run that already completed, starts over.
+
+    remaining_time (callable returning milliseconds, ex: the Lambda context's get_remaining_time_in_millis)
+    makes chunk_committed raise TimeBudgetExhausted when less than TIME_BUDGET_MARGIN_MS is left.
+    """
+
+    def __init__(self, conn, key, etag, remaining_time=None):
+        self.conn = conn
+        self.key = key
+        self.remaining_time = remaining_time
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT etag, last_committed_chunk, committed_rows, completed_at
+            FROM ingestion_progress
+            WHERE s3_key = %s;
+            """,
+            (key,)
+        )
+        row = cursor.fetchone()
+        self.resuming = bool(row) and row[0] == etag and row[3] is None
+        if self.resuming:
+            self.last_committed_chunk, self.committed_rows = row[1], row[2]
+            print(f'Resuming {key} after chunk {self.last_committed_chunk} ({self.committed_rows} rows)')
+        else:
+            self.last_committed_chunk, self.committed_rows = 0, 0
+            cursor.execute(
+                """
+                INSERT INTO ingestion_progress (s3_key, etag)
+                VALUES (%s, %s)
+                ON CONFLICT (s3_key)
+                DO UPDATE SET etag = EXCLUDED.etag, last_committed_chunk = 0, committed_rows = 0,
+                    started_at = now(), updated_at = now(), completed_at = NULL;
+                """,
+                (key, etag)
+            )
+        conn.commit()
+        cursor.close()
+
+    def checkpoint(self, cursor, row_count):
+        """ Record the next chunk in the caller's transaction; call chunk_committed once it commits. """
+        cursor.execute(
+            """
+            UPDATE ingestion_progress
+            SET last_committed_chunk = %s, committed_rows = %s, updated_at = now()
+            WHERE s3_key = %s;
+            """,
+            (self.last_committed_chunk + 1, self.committed_rows + row_count, self.key)
+        )
+
+    def chunk_committed(self, row_count):
+        self.last_committed_chunk += 1
+        self.committed_rows += row_count
+        if self.remaining_time is not None and self.remaining_time() < TIME_BUDGET_MARGIN_MS:
+            raise TimeBudgetExhausted(self.committed_rows)
+
+    def complete(self):
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            UPDATE ingestion_progress
+            SET completed_at = now(), updated_at = now()
+            WHERE s3_key = %s;
+            """,
+            (self.key,)
+        )
+        self.conn.commit()
+        cursor.close()
@@ -0,0 +1,140 @@
+import math
+from psycopg2.extras import Json
+
+# String values Trackman writes when it could not determine a field.
+SENTINEL_VALUE = 'Undefined'
+
+# Headline counts stored as their own columns of 'file_quality_profile' so they can be aggregated cheaply.
+PROFILE_COUNTS = ('row_count', 'duplicate_pitch_numbers', 'missing_date_rows', 'undefined_pitch_call_rows', 'missing_spin_rate_rows')
+
+
+def compute_file_profile(df, numeric_columns):
+    """ Profile a Trackman dataframe (as read, before validation) in one vectorized pass over each column.
+    numeric_columns names the columns profiled by min/max (validation.NUMERIC_COLUMNS); the rest are strings.
+
+    Returns:
+        dict: The PROFILE_COUNTS plus 'columns', which maps each CSV column to its null rate and either
+            its min/max (numeric columns) or its count of SENTINEL_VALUE (string columns).
+    """
+    import pandas as pd
+    row_count = len(df)
+    nulls = df.isna().sum()
+    numeric = df[[column for column in df.columns if column in numeric_columns]].apply(pd.to_numeric, errors='coerce')
+    minima, maxima = numeric.min(), numeric.max()
+    string_columns = [column for column in df.columns if column not in numeric_columns]
+    sentinels = (df[string_columns].astype(object) == SENTINEL_VALUE).sum()
+
+    columns = {}
+    for column in df.columns:
+        stats = {'null_rate': int(nulls[column]) / row_count if row_count else None}
+        if column in numeric_columns:
+            stats['min'] = finite_or_none(minima[column])
+            stats['max'] = finite_or_none(maxima[column])
+        elif sentinels[column]:
+            stats['sentinels'] = int(sentinels[column])
+        columns[column] = stats
+
+    return {
+        'row_count': row_count,
+        'duplicate_pitch_numbers': int(df['PitchNo'].dropna().duplicated().sum()) if 'PitchNo' in df else None,
+        'missing_date_rows': int(nulls['Date']) if 'Date' in df else None,
+        'undefined_pitch_call_rows': int(sentinels['PitchCall']) if 'PitchCall' in df else None,
+        'missing_spin_rate_rows': int(nulls['SpinRate']) if 'SpinRate' in df else None,
+        'columns': columns,
+        }
+
+
+def finite_or_none(value):
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+class FileProfileAccumulator:
+    """ Streaming counterpart of compute_file_profile for the light ingest engine.
+    observe() wraps the record stream; profile() returns the same dict once the stream is consumed.
+    """
+
+    def __init__(self, numeric_columns):
+        self.numeric_columns = frozenset(numeric_columns)
+        self.row_count = 0
+        self.nulls = {}
+        self.minima = {}
+        self.maxima = {}
+        self.sentinels = {}
+        self.pitch_numbers = set()
+        self.duplicate_pitch_numbers = 0
+
+    def observe(self, records):
+        for record in records:
+            self.add(record)
+            yield record
+
+    def add(self, record):
+        if not self.row_count:
+            for column in record:
+                self.nulls[column] = 0
+                if column in self.numeric_columns:
+                    self.minima[column] = self.maxima[column] = None
+                else:
+                    self.sentinels[column] = 0
+        self.row_count += 1
+        for column, value in record.items():
+            if value is None:
+                self.nulls[column] += 1
+            elif column in self.minima:
+                if isinstance(value, float) and not math.isnan(value):
+                    if self.minima[column] is None or value < self.minima[column]:
+                        self.minima[column] = value
+                    if self.maxima[column] is None or value > self.maxima[column]:
+                        self.maxima[column] = value
+            elif value == SENTINEL_VALUE:
+                self.sentinels[column] += 1
+        pitch_number = record.get('PitchNo')
+        if pitch_number is not None:
+            if pitch_number in self.pitch_numbers:
+                self.duplicate_pitch_numbers += 1
+            self.pitch_numbers.add(pitch_number)
+
+    def profile(self):
+        columns = {}
+        for column, null_count in self.nulls.items():
+            stats = {'null_rate': null_count / self.row_count}
+            if column in self.minima:
+                stats['min'] = self.minima[column]
+                stats['max'] = self.maxima[column]
+            elif self.sentinels[column]:
+                stats['sentinels'] = self.sentinels[column]
+            columns[column] = stats
+        return {
+            'row_count': self.row_count,
+            'duplicate_pitch_numbers': self.duplicate_pitch_numbers if 'PitchNo' in self.nulls else None,
+            'missing_date_rows': self.nulls.get('Date'),
+            'undefined_pitch_call_rows': self.sentinels.get('PitchCall'),
+            'missing_spin_rate_rows': self.nulls.get('SpinRate'),
+            'columns': columns,
+            }
+
+
+def write_file_profile(conn, file_name, game_id, profile):
+    """ Store (or replace) the profile of a file in 'file_quality_profile'. """
+    ballpark_name = file_name.split('-')[1]
+    game_date = file_name[:8]
+    counts_str = ', '.join(PROFILE_COUNTS)
+    update_str = ', '.join(f'{column} = EXCLUDED.{column}' for column in PROFILE_COUNTS)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            f"""
+            INSERT INTO file_quality_profile (file_name, game_id, ballpark_name, game_date, {counts_str}, columns)
+            VALUES (%s, %s, %s, %s::date, {', '.join(['%s'] * len(PROFILE_COUNTS))}, %s)
+            ON CONFLICT (file_name)
+            DO UPDATE SET game_id = EXCLUDED.game_id, {update_str}, columns = EXCLUDED.columns, profiled_at = now();
+            """,
+            (file_name, game_id, ballpark_name, game_date, *(profile[count] for count in PROFILE_COUNTS), Json(profile['columns']))
+        )
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f'Error writing data quality profile for {file_name}: {e}')
+    finally:
+        cursor.close()
@@ -0,0 +1,112 @@
+from psycopg2.extras import execute_values
+
+# Season counters kept per player and role in season_player_stats, and per game in game_player_stat_delta.
+SEASON_COUNTERS = ('pitch_count', 'strikeouts', 'walks', 'balls_in_play', 'hard_hit_balls')
+ROLES = ('pitcher', 'batter')
+HARD_HIT_EXIT_SPEED = 95.0 # mph, Statcast's hard-hit threshold
+
+
+def compute_stat_deltas(df, pitcher_ids, batter_ids):
+    """ Count a game's SEASON_COUNTERS for each pitcher and batter.
+
+    Parameters:
+        df (dataframe): Trackman pitch data for a single game.
+        pitcher_ids, batter_ids (list): Resolved player IDs for each row of df.
+
+    Returns:
+        list: (player_id, role) + SEASON_COUNTERS for each player and role in the game.
+    """
+    import pandas as pd
+    exit_speed = pd.to_numeric(df['ExitSpeed'], errors='coerce')
+    in_play = (df['PitchCall'] == 'InPlay').to_numpy(dtype=bool)
+    counters = pd.DataFrame({
+        'pitch_count': 1,
+        'strikeouts': (df['KorBB'] == 'Strikeout').to_numpy(dtype=int),
+        'walks': (df['KorBB'] == 'Walk').to_numpy(dtype=int),
+        'balls_in_play': in_play.astype(int),
+        'hard_hit_balls': (in_play & (exit_speed >= HARD_HIT_EXIT_SPEED).to_numpy(dtype=bool)).astype(int),
+    }, index=df.index)
+
+    rows = []
+    for role, player_ids in zip(ROLES, (pitcher_ids, batter_ids)):
+        player_ids = pd.Series(player_ids, index=df.index, dtype=object)
+        totals = counters[player_ids.notna()].groupby(player_ids.dropna()).sum()
+        for player_id, values in zip(totals.index, totals[list(SEASON_COUNTERS)].itertuples(index=False, name=None)):
+            rows.append((player_id, role) + tuple(int(value) for value in values))
+    return rows
+
+
+class StatDeltaAccumulator:
+    """ Streaming counterpart of compute_stat_deltas for the light ingest engine. """
+
+    def __init__(self):
+        self.counters = {}
+
+    def add(self, pitcher_id, batter_id, record):
+        in_play = record['PitchCall'] == 'InPlay'
+        exit_speed = record['ExitSpeed']
+        values = (
+            1,
+            record['KorBB'] == 'Strikeout',
+            record['KorBB'] == 'Walk',
+            in_play,
+            in_play and exit_speed is not None and exit_speed >= HARD_HIT_EXIT_SPEED,
+            )
+        for role, player_id in zip(ROLES, (pitcher_id, batter_id)):
+            if player_id is None:
+                continue
+            counters = self.counters.setdefault((player_id, role), [0] * len(SEASON_COUNTERS))
+            for index, value in enumerate(values):
+                counters[index] += value
+
+    def deltas(self):
+        return [key + tuple(counters) for key, counters in self.counters.items()]
+
+
+def apply_stat_deltas(conn, game_id, rows):
+    """ Replace the game's counters in game_player_stat_delta and move season_player_stats by the difference
+    (new counters minus the ones the game was last ingested with), all in a single transaction.
+
+    Only the game's own rows are read or written, so keeping season totals current costs O(game), not O(season).
+    Season rows are upserted in key order, so concurrent ingestions touching the same players cannot deadlock.
+    """
+    counters_str = ', '.join(SEASON_COUNTERS)
+    returning_str = ', '.join(('player_id', 'role') + SEASON_COUNTERS)
+    cursor = conn.cursor()
+    try:
+        # serialize re-ingestions of this game so each one subtracts the delta the previous one added
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtextextended(%s, 0));", (f'season_stats:{game_id}',))
+        cursor.execute("SELECT EXTRACT(YEAR FROM date)::INTEGER FROM game WHERE game_id = %s;", (game_id,))
+        season = cursor.fetchone()[0]
+        cursor.execute(f"DELETE FROM game_player_stat_delta WHERE game_id = %s RETURNING {returning_str};", (game_id,))
+        net = {}
+        for player_id, role, *counters in cursor.fetchall():
+            net[(player_id, role)] = [-value for value in counters]
+        for player_id, role, *counters in rows:
+            previous = net.setdefault((player_id, role), [0] * len(SEASON_COUNTERS))
+            net[(player_id, role)] = [a + b for a, b in zip(previous, counters)]
+
+        if rows:
+            execute_values(
+                cursor,
+                f"INSERT INTO game_player_stat_delta (game_id, player_id, role, {counters_str}) VALUES %s;",
+                [(game_id,) + tuple(row) for row in rows]
+            )
+        changes = [(str(player_id), season, role) + tuple(counters) for (player_id, role), counters in sorted(net.items()) if any(counters)]
+        if changes:
+            update_str = ', '.join(f'{counter} = season_player_stats.{counter} + EXCLUDED.{counter}' for counter in SEASON_COUNTERS)
+            execute_values(
+                cursor,
+                f"""
+                INSERT INTO season_player_stats (player_id, season, role, {counters_str}) VALUES %s
+                ON CONFLICT (player_id, season, role) DO UPDATE SET {update_str};
+                """,
+                changes
+            )
+        conn.commit()
+        print(f'Applied season stat deltas of game {game_id} ({len(changes)} player seasons changed)')
+    except Exception as e:
+        conn.rollback()
+        print(f'Error applying season stat deltas: {e}')
+    finally:
+        cursor.close()
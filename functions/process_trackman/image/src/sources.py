@@ -0,0 +1,50 @@
+import io
+import mmap
+import os
+
+# A local directory laid out like the Trackman bucket (YYYY/MM/DD/CSV/<file>) to read files from instead of S3,
+# ex: to profile or replay ingestion offline (see benchmarks/replay_local.py).
+TRACKMAN_SOURCE_DIR = os.environ.get('TRACKMAN_SOURCE_DIR')
+
+
+def trackman_source(bucket, s3):
+    """ Return the source Trackman files are read from: TRACKMAN_SOURCE_DIR if it is set, the bucket otherwise.
+    Sources return ETags without quotes, like S3 event records carry them, so ingestion progress is keyed
+    the same whether a file comes from its event or is fetched again (ex: a parked positioning file).
+    """
+    if TRACKMAN_SOURCE_DIR:
+        return LocalSource(TRACKMAN_SOURCE_DIR)
+    return S3Source(bucket, s3)
+
+
+class S3Source:
+    """ Trackman files in an S3 bucket. """
+
+    def __init__(self, bucket, s3):
+        self.bucket = bucket
+        self.s3 = s3
+
+    def get(self, key):
+        """ Return (body, etag, size) of the file at key; body is read with read(n) as it streams from S3. """
+        res = self.s3.get_object(Bucket=self.bucket, Key=key)
+        return res['Body'], res['ETag'].strip('"'), res['ContentLength']
+
+
+class LocalSource:
+    """ Trackman files in a local directory, at the same keys as in the bucket.
+    Files are memory-mapped, so parsing reads them straight from the page cache.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def get(self, key):
+        """ Return (body, etag, size) of the file at key. The ETag is derived from the file's size and
+        modification time, so an edited file starts a new ingestion rather than resuming the old one.
+        Raises FileNotFoundError if there is no such file.
+        """
+        with open(os.path.join(self.root, *key.split('/')), 'rb') as f:
+            stat = os.fstat(f.fileno())
+            # mmap cannot map an empty file; the mapping stays valid once the file is closed.
+            body = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else io.BytesIO()
+        return body, f'{stat.st_size:x}-{stat.st_mtime_ns:x}', stat.st_size
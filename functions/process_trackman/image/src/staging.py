@@ -0,0 +1,102 @@
+import gzip
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from csv import writer
+
+# Two-stage ingest: stage one parses and validates a pitch data file without the DB and writes it here as a
+# staged game, '<prefix><source key>.jsonl.gz'; stage two applies many staged games at once in one connection.
+STAGING_PREFIX = 'staged/'
+STAGING_SUFFIX = '.jsonl.gz'
+
+
+def staged_key(key):
+    """ ex: '2024/06/30/CSV/20240629-ClipperMagazine-1.csv' => 'staged/2024/06/30/CSV/20240629-ClipperMagazine-1.csv.jsonl.gz' """
+    return f'{STAGING_PREFIX}{key}{STAGING_SUFFIX}'
+
+
+def write_staged_game(s3, bucket, key, header, columns, records):
+    """ Write a staged game to S3 as gzipped JSON lines: a header (a JSON object, with the columns added),
+    then one JSON array of values per record, in column order. Values keep their parsed types
+    (str, float or None), so stage two reads them back exactly as stage one validated them.
+
+    header is called once the records are written, so it can describe them (ex: their quality profile).
+    The records are compressed as they are read and the header is prepended as its own gzip member.
+
+    Returns:
+        int: The number of records staged.
+    """
+    buffer = io.BytesIO()
+    row_count = 0
+    with gzip.GzipFile(fileobj=buffer, mode='wb') as f:
+        for record in records:
+            f.write(json.dumps([record.get(column) for column in columns]).encode() + b'\n')
+            row_count += 1
+    head = gzip.compress(json.dumps(dict(header(), columns=columns)).encode() + b'\n')
+    s3.put_object(Bucket=bucket, Key=staged_key(key), Body=head + buffer.getvalue())
+    print(f'Staged {row_count} rows of {key}')
+    return row_count
+
+
+def read_staged_game(body):
+    """ Read a staged game from an S3 object body.
+
+    Returns:
+        tuple: The header (dict) and a generator of the records, as dicts keyed by column.
+    """
+    lines = io.TextIOWrapper(gzip.GzipFile(fileobj=body), encoding='utf-8')
+    header = json.loads(lines.readline())
+    columns = header['columns']
+    return header, (dict(zip(columns, json.loads(line))) for line in lines)
+
+
+def list_staged_games(s3, bucket, limit):
+    """ Return the (key, etag) of up to limit staged games, oldest game dates first (keys start with YYYY/MM/DD). """
+    staged = []
+    for page in s3.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=STAGING_PREFIX):
+        for item in page.get('Contents', []):
+            if item['Key'].endswith(STAGING_SUFFIX):
+                staged.append((item['Key'], item['ETag']))
+            if len(staged) == limit:
+                return staged
+    return staged
+
+
+def copy_rows(cursor, table, columns, rows):
+    """ Load rows into table with a single COPY, sent as CSV.
+    None is written as NULL (an unquoted empty field; empty strings never get here, they are read as missing),
+    and floats holding whole numbers without a fraction, so they load into integer columns as they do with INSERT.
+
+    Returns:
+        int: The number of rows copied.
+    """
+    buffer = io.StringIO()
+    csv_writer = writer(buffer, lineterminator='\n')
+    row_count = 0
+    for row in rows:
+        csv_writer.writerow([int(value) if isinstance(value, float) and value.is_integer() else value for value in row])
+        row_count += 1
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    return row_count
+
+
+def copy_rows_concurrently(connect, tables, columns, parts):
+    """ COPY each part of the rows into its own table, over its own connection (from connect()), all at once.
+    Each worker commits its table, so the tables must be regular ones (ex: UNLOGGED), not temporary.
+
+    Returns:
+        int: The number of rows copied.
+    """
+    def load(table, rows):
+        conn = connect()
+        try:
+            cursor = conn.cursor()
+            row_count = copy_rows(cursor, table, columns, rows)
+            conn.commit()
+            return row_count
+        finally:
+            conn.close()
+
+    with ThreadPoolExecutor(max_workers=len(parts)) as executor:
+        return sum(executor.map(load, tables, parts))
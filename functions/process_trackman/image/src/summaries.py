@@ -0,0 +1,179 @@
+from psycopg2.extras import execute_values
+
+# PitchCall values counted towards a pitcher's strikes and balls.
+STRIKE_CALLS = ('StrikeCalled', 'StrikeSwinging', 'FoulBall', 'FoulBallNotFieldable', 'FoulBallFieldable', 'InPlay')
+BALL_CALLS = ('BallCalled', 'BallInDirt', 'BallIntentional')
+
+# Order matches the stat columns of the game_summary, game_pitcher_summary and game_pitch_type_summary tables.
+SUMMARY_STATS = (
+    'pitch_count', 'strike_count', 'ball_count', 'max_rel_speed', 'avg_rel_speed',
+    'max_exit_speed', 'avg_exit_speed', 'max_spin_rate', 'avg_spin_rate'
+    )
+
+
+def compute_game_summaries(df, pitcher_ids):
+    """ Aggregate a game's pitch data into per-game, per-pitcher and per-pitch-type summaries.
+
+    Parameters:
+        df (dataframe): Trackman pitch data for a single game.
+        pitcher_ids (list): Resolved player ID of the pitcher for each row of df.
+
+    Returns:
+        3-tuple: (game row, pitcher rows, pitch type rows). The game row is a tuple of
+            SUMMARY_STATS; the others are lists of tuples keyed by pitcher_id / pitch type.
+    """
+    import pandas as pd
+    frame = pd.DataFrame({
+        'pitcher_id': pd.Series(pitcher_ids, index=df.index, dtype=object),
+        'pitch_type': df['TaggedPitchType'].astype(object).where(df['TaggedPitchType'].notna(), 'Undefined'),
+        'is_strike': df['PitchCall'].isin(STRIKE_CALLS),
+        'is_ball': df['PitchCall'].isin(BALL_CALLS),
+        'rel_speed': pd.to_numeric(df['RelSpeed'], errors='coerce'),
+        'exit_speed': pd.to_numeric(df['ExitSpeed'], errors='coerce'),
+        'spin_rate': pd.to_numeric(df['SpinRate'], errors='coerce'),
+    })
+    aggregations = {
+        'pitch_count': ('is_strike', 'size'),
+        'strike_count': ('is_strike', 'sum'),
+        'ball_count': ('is_ball', 'sum'),
+        'max_rel_speed': ('rel_speed', 'max'),
+        'avg_rel_speed': ('rel_speed', 'mean'),
+        'max_exit_speed': ('exit_speed', 'max'),
+        'avg_exit_speed': ('exit_speed', 'mean'),
+        'max_spin_rate': ('spin_rate', 'max'),
+        'avg_spin_rate': ('spin_rate', 'mean'),
+    }
+
+    game_row = frame.assign(game=0).groupby('game').agg(**aggregations)
+    pitcher_rows = frame.dropna(subset=['pitcher_id']).groupby('pitcher_id').agg(**aggregations)
+    pitch_type_rows = frame.groupby('pitch_type').agg(**aggregations)
+
+    return (
+        summary_rows(game_row, include_key=False)[0],
+        summary_rows(pitcher_rows),
+        summary_rows(pitch_type_rows)
+        )
+
+
+def summary_rows(grouped, include_key=True):
+    """ Convert an aggregated dataframe into DB-ready tuples (NaN => None, numpy => python types). """
+    import pandas as pd
+    grouped = grouped[list(SUMMARY_STATS)].astype(object)
+    grouped = grouped.where(pd.notnull(grouped), None)
+    rows = []
+    for key, stats in zip(grouped.index, grouped.itertuples(index=False, name=None)):
+        stats = tuple(to_python(value) for value in stats)
+        rows.append(((key,) + stats) if include_key else stats)
+    return rows
+
+
+def to_python(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+class GameSummaryAccumulator:
+    """ Streaming counterpart of compute_game_summaries for the light ingest engine.
+    Rows are added one at a time as they are written; summaries() returns the same 3-tuple.
+    """
+
+    def __init__(self):
+        self.game = SummaryStats()
+        self.pitchers = {}
+        self.pitch_types = {}
+
+    @property
+    def pitch_count(self):
+        return self.game.pitch_count
+
+    def add(self, pitcher_id, record):
+        """ Add one Trackman row (a dict of CSV fields with numeric columns already parsed). """
+        pitch_type = record['TaggedPitchType'] or 'Undefined'
+        groups = [self.game, self.pitch_types.setdefault(pitch_type, SummaryStats())]
+        if pitcher_id is not None:
+            groups.append(self.pitchers.setdefault(pitcher_id, SummaryStats()))
+        for stats in groups:
+            stats.add(record)
+
+    def summaries(self):
+        return (
+            self.game.row(),
+            [(pitcher_id,) + stats.row() for pitcher_id, stats in self.pitchers.items()],
+            [(pitch_type,) + stats.row() for pitch_type, stats in self.pitch_types.items()]
+            )
+
+
+class SummaryStats:
+    """ Running counts, maxima and sums for one summary row. """
+    METRICS = (('rel_speed', 'RelSpeed'), ('exit_speed', 'ExitSpeed'), ('spin_rate', 'SpinRate'))
+
+    def __init__(self):
+        self.pitch_count = 0
+        self.strike_count = 0
+        self.ball_count = 0
+        self.maxima = {metric: None for metric, _ in self.METRICS}
+        self.sums = {metric: 0.0 for metric, _ in self.METRICS}
+        self.counts = {metric: 0 for metric, _ in self.METRICS}
+
+    def add(self, record):
+        self.pitch_count += 1
+        self.strike_count += record['PitchCall'] in STRIKE_CALLS
+        self.ball_count += record['PitchCall'] in BALL_CALLS
+        for metric, column in self.METRICS:
+            value = record[column]
+            if value is None:
+                continue
+            self.sums[metric] += value
+            self.counts[metric] += 1
+            if self.maxima[metric] is None or value > self.maxima[metric]:
+                self.maxima[metric] = value
+
+    def row(self):
+        """ Return the stats ordered like SUMMARY_STATS. """
+        row = [self.pitch_count, self.strike_count, self.ball_count]
+        for metric, _ in self.METRICS:
+            average = self.sums[metric] / self.counts[metric] if self.counts[metric] else None
+            row += [self.maxima[metric], average]
+        return tuple(row)
+
+
+def write_game_summaries(conn, game_id, summaries):
+    """ Replace every summary row for the given game in a single transaction.
+
+    Re-ingesting a game therefore swaps its summaries atomically: readers see either
+    the previous summaries or the new ones, never a mix.
+    """
+    game_row, pitcher_rows, pitch_type_rows = summaries
+    stats_str = ', '.join(SUMMARY_STATS)
+    update_str = ', '.join(f'{stat} = EXCLUDED.{stat}' for stat in SUMMARY_STATS)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            f"""
+            INSERT INTO game_summary (game_id, {stats_str}, updated_at)
+            VALUES (%s, {', '.join(['%s'] * len(SUMMARY_STATS))}, now())
+            ON CONFLICT (game_id)
+            DO UPDATE SET {update_str}, updated_at = EXCLUDED.updated_at;
+            """,
+            (game_id,) + game_row
+        )
+        cursor.execute("DELETE FROM game_pitcher_summary WHERE game_id = %s;", (game_id,))
+        cursor.execute("DELETE FROM game_pitch_type_summary WHERE game_id = %s;", (game_id,))
+        if pitcher_rows:
+            execute_values(
+                cursor,
+                f"INSERT INTO game_pitcher_summary (game_id, pitcher_id, {stats_str}) VALUES %s;",
+                [(game_id,) + row for row in pitcher_rows]
+            )
+        if pitch_type_rows:
+            execute_values(
+                cursor,
+                f"INSERT INTO game_pitch_type_summary (game_id, pitch_type, {stats_str}) VALUES %s;",
+                [(game_id,) + row for row in pitch_type_rows]
+            )
+        conn.commit()
+        print(f'Wrote game summaries for game {game_id}')
+    except Exception as e:
+        conn.rollback()
+        print(f'Error writing game summaries: {e}')
+    finally:
+        cursor.close()
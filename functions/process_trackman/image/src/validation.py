@@ -0,0 +1,145 @@
+import os
+from csv import DictWriter
+from io import StringIO
+
+QUARANTINE_PREFIX = 'quarantine/'
+REASONS_COLUMN = 'QuarantineReasons'
+# Cells past the header's last column, which DictReader collects in a list under the key None.
+EXTRA_VALUES_COLUMN = 'ExtraValues'
+
+# Trackman columns that are stored as numbers in 'pitch'.
+NUMERIC_COLUMNS = (
+    'PitchNo', 'Inning', 'Outs', 'Balls', 'Strikes', 'PAofInning', 'PitchofPA', 'OutsOnPlay', 'RunsScored',
+    'RelSpeed', 'VertRelAngle', 'HorzRelAngle', 'SpinRate', 'SpinAxis', 'RelHeight', 'RelSide', 'Extension',
+    'VertBreak', 'InducedVertBreak', 'HorzBreak', 'PlateLocHeight', 'PlateLocSide', 'ZoneSpeed', 'VertApprAngle',
+    'HorzApprAngle', 'ZoneTime', 'ExitSpeed', 'Angle', 'Direction', 'HitSpinRate', 'Distance', 'Bearing', 'HangTime',
+    'pfxx', 'pfxz', 'x0', 'y0', 'z0', 'vx0', 'vy0', 'vz0', 'ax0', 'ay0', 'az0', 'EffectiveVelo', 'MaxHeight', 'SpeedDrop'
+    )
+
+# Inclusive (min, max) bounds; empty values are allowed.
+RANGE_CHECKS = {
+    'PitchNo': (1, 1000),
+    'Inning': (1, 30),
+    'Outs': (0, 3),
+    'Balls': (0, 4),
+    'Strikes': (0, 3),
+    'RelSpeed': (30, 110),
+    'ZoneSpeed': (30, 110),
+    'EffectiveVelo': (30, 115),
+    'SpinRate': (0, 4500),
+    'ExitSpeed': (0, 130),
+    'HitSpinRate': (0, 10000),
+    }
+
+PITCH_CALLS = (
+    'BallCalled', 'BallInDirt', 'BallinDirt', 'BallIntentional', 'HitByPitch', 'StrikeCalled', 'StrikeSwinging',
+    'FoulBall', 'FoulBallNotFieldable', 'FoulBallFieldable', 'InPlay', 'CatchersInterference', 'AutomaticBall',
+    'AutomaticStrike', 'Undefined'
+    )
+PITCH_TYPES = (
+    'Fastball', 'FourSeamFastBall', 'TwoSeamFastBall', 'Sinker', 'Cutter', 'Curveball', 'Slider', 'Sweeper',
+    'Changeup', 'ChangeUp', 'Splitter', 'Knuckleball', 'Other', 'Undefined'
+    )
+ENUM_CHECKS = {
+    'PitchCall': PITCH_CALLS,
+    'TaggedPitchType': PITCH_TYPES,
+    }
+
+REQUIRED_COLUMNS = ('PitchNo',)
+
+
+def validate_trackman_rows(df):
+    """ Check every row of a Trackman dataframe at once and split it into clean and rejected rows.
+
+    Each check produces a boolean column over the whole frame; a row is rejected if any check fails.
+
+    Returns:
+        2-tuple: (clean dataframe, rejected dataframe). The rejected dataframe has an extra
+            REASONS_COLUMN listing every check the row failed.
+    """
+    import pandas as pd
+    failures = {}
+    for column in REQUIRED_COLUMNS:
+        if column in df:
+            failures[f'{column} is missing'] = df[column].isna()
+    for column in NUMERIC_COLUMNS:
+        if column in df:
+            numeric = pd.to_numeric(df[column], errors='coerce')
+            failures[f'{column} is not numeric'] = numeric.isna() & df[column].notna()
+    for column, (low, high) in RANGE_CHECKS.items():
+        if column in df:
+            numeric = pd.to_numeric(df[column], errors='coerce')
+            failures[f'{column} outside [{low}, {high}]'] = (numeric < low) | (numeric > high)
+    for column, allowed in ENUM_CHECKS.items():
+        if column in df:
+            failures[f'{column} not a known value'] = df[column].notna() & ~df[column].isin(allowed)
+
+    failed = pd.DataFrame(failures, index=df.index, dtype=bool)
+    is_rejected = failed.any(axis=1)
+    if not is_rejected.any():
+        return df, df.iloc[0:0]
+
+    # bool x str concatenates the names of the failed checks for each rejected row
+    reasons = failed[is_rejected].dot(failed.columns + '; ').str.rstrip('; ')
+    rejected = df[is_rejected].copy()
+    rejected.insert(0, REASONS_COLUMN, reasons)
+    return df[~is_rejected], rejected
+
+
+def record_failures(record):
+    """ Run the checks of validate_trackman_rows on a single CSV record (a dict with numeric columns
+    already parsed to floats where possible). Used by the light ingest engine.
+
+    Returns:
+        list: The names of the failed checks, in the same order and wording as validate_trackman_rows.
+    """
+    failures = []
+    for column in REQUIRED_COLUMNS:
+        if column in record and record[column] is None:
+            failures.append(f'{column} is missing')
+    for column in NUMERIC_COLUMNS:
+        if isinstance(record.get(column), str):
+            failures.append(f'{column} is not numeric')
+    for column, (low, high) in RANGE_CHECKS.items():
+        value = record.get(column)
+        if isinstance(value, float) and not low <= value <= high:
+            failures.append(f'{column} outside [{low}, {high}]')
+    for column, allowed in ENUM_CHECKS.items():
+        if column in record and record[column] is not None and record[column] not in allowed:
+            failures.append(f'{column} not a known value')
+    return failures
+
+
+def quarantine_rows(rejected, file_name, s3):
+    """ Write rejected dataframe rows and their reasons to a CSV under QUARANTINE_PREFIX in the Trackman bucket. """
+    write_quarantine_report(rejected.to_csv(index=False), len(rejected), file_name, s3)
+
+
+def quarantine_records(rejected, file_name, s3):
+    """ Same as quarantine_rows for the light engine's (reasons, record) pairs.
+    The report has every column of any record, in order of appearance, so rows of different lengths all fit.
+    """
+    rows = [
+        {REASONS_COLUMN: reasons, **{EXTRA_VALUES_COLUMN if column is None else column: value for column, value in record.items()}}
+        for reasons, record in rejected
+        ]
+    report = StringIO()
+    writer = DictWriter(report, fieldnames=list(dict.fromkeys(column for row in rows for column in row)))
+    writer.writeheader()
+    writer.writerows(rows)
+    write_quarantine_report(report.getvalue(), len(rejected), file_name, s3)
+
+
+def write_quarantine_report(body, row_count, file_name, s3):
+    bucket = os.environ['BUCKET']
+    key = QUARANTINE_PREFIX + file_name
+    try:
+        s3.put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=body.encode('utf-8'),
+            ContentType='text/csv'
+        )
+        print(f'Quarantined {row_count} rows to s3://{bucket}/{key}')
+    except Exception as e:
+        print(f'Error quarantining rows for {file_name}: {e}')
@@ -0,0 +1,46 @@
+-- Per-game summaries maintained by process_trackman at ingest time.
+-- Every row for a game is replaced in a single transaction when the game is re-ingested.
+
+CREATE TABLE IF NOT EXISTS game_summary (
+    game_id UUID PRIMARY KEY REFERENCES game (game_id) ON DELETE CASCADE,
+    pitch_count INTEGER NOT NULL,
+    strike_count INTEGER NOT NULL,
+    ball_count INTEGER NOT NULL,
+    max_rel_speed DOUBLE PRECISION,
+    avg_rel_speed DOUBLE PRECISION,
+    max_exit_speed DOUBLE PRECISION,
+    avg_exit_speed DOUBLE PRECISION,
+    max_spin_rate DOUBLE PRECISION,
+    avg_spin_rate DOUBLE PRECISION,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS game_pitcher_summary (
+    game_id UUID NOT NULL REFERENCES game (game_id) ON DELETE CASCADE,
+    pitcher_id UUID NOT NULL REFERENCES player (player_id) ON DELETE CASCADE,
+    pitch_count INTEGER NOT NULL,
+    strike_count INTEGER NOT NULL,
+    ball_count INTEGER NOT NULL,
+    max_rel_speed DOUBLE PRECISION,
+    avg_rel_speed DOUBLE PRECISION,
+    max_exit_speed DOUBLE PRECISION,
+    avg_exit_speed DOUBLE PRECISION,
+    max_spin_rate DOUBLE PRECISION,
+    avg_spin_rate DOUBLE PRECISION,
+    PRIMARY KEY (game_id, pitcher_id)
+);
+
+CREATE TABLE IF NOT EXISTS game_pitch_type_summary (
+    game_id UUID NOT NULL REFERENCES game (game_id) ON DELETE CASCADE,
+    pitch_type TEXT NOT NULL,
+    pitch_count INTEGER NOT NULL,
+    strike_count INTEGER NOT NULL,
+    ball_count INTEGER NOT NULL,
+    max_rel_speed DOUBLE PRECISION,
+    avg_rel_speed DOUBLE PRECISION,
+    max_exit_speed DOUBLE PRECISION,
+    avg_exit_speed DOUBLE PRECISION,
+    max_spin_rate DOUBLE PRECISION,
+    avg_spin_rate DOUBLE PRECISION,
+    PRIMARY KEY (game_id, pitch_type)
+);
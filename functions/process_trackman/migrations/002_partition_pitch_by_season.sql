@@ -0,0 +1,107 @@
+-- Convert pitch into a table range-partitioned by date, with one partition per season.
+-- process_trackman writes straight into the season partition (see ensure_pitch_partition),
+-- and queries filtering on date (or joining through game.date) only touch the seasons they need.
+--
+-- Old seasons can be maintained on their own, e.g.:
+--     VACUUM (ANALYZE) pitch_y2023;
+--     ALTER TABLE pitch DETACH PARTITION pitch_y2023;  -- archive, then DROP or move to cold storage
+--
+-- pitch_default holds rows whose date has no season partition yet (ex: a pitch dated in the season after its game's).
+-- Postgres refuses to create a season partition while pitch_default has rows for it, so
+-- create_pitch_season_partition moves them: it creates the partition detached, moves the season's rows out of
+-- pitch_default into it and attaches it. The same can be done by hand for a season, ex: 2025:
+--     SELECT create_pitch_season_partition(2025);
+
+BEGIN;
+
+-- Rows missing a Date in the CSV inherit their game's date so they can be routed to a season.
+UPDATE pitch p
+SET date = g.date
+FROM game g
+WHERE p.game_id = g.game_id
+    AND p.date IS NULL;
+
+ALTER TABLE pitch RENAME TO pitch_unpartitioned;
+
+CREATE TABLE pitch (
+    LIKE pitch_unpartitioned INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING CONSTRAINTS,
+    PRIMARY KEY (pitch_id, date)
+) PARTITION BY RANGE (date);
+
+-- Catches rows whose date falls outside every season partition.
+CREATE TABLE pitch_default PARTITION OF pitch DEFAULT;
+
+-- Create the season's partition, moving any of its rows already in pitch_default into it.
+CREATE OR REPLACE FUNCTION create_pitch_partition(partition_name TEXT, season INTEGER)
+RETURNS VOID AS $$
+DECLARE
+    season_start DATE := make_date(season, 1, 1);
+    season_end DATE := make_date(season + 1, 1, 1);
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pitch_default WHERE date >= season_start AND date < season_end) THEN
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF pitch FOR VALUES FROM (%L) TO (%L)',
+            partition_name, season_start, season_end
+        );
+        RETURN;
+    END IF;
+    EXECUTE format('CREATE TABLE %I (LIKE pitch INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM pitch_default WHERE date >= %L AND date < %L RETURNING *) INSERT INTO %I SELECT * FROM moved',
+        season_start, season_end, partition_name
+    );
+    -- Attaching creates the parent's indexes and foreign keys on the partition.
+    EXECUTE format(
+        'ALTER TABLE pitch ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, season_start, season_end
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION create_pitch_season_partition(season INTEGER)
+RETURNS TEXT AS $$
+DECLARE
+    partition_name TEXT := format('pitch_y%s', season);
+BEGIN
+    -- Only take the lock on the parent when the season partition is actually missing.
+    IF to_regclass(partition_name) IS NULL THEN
+        PERFORM create_pitch_partition(partition_name, season);
+    END IF;
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT create_pitch_season_partition(season)
+FROM (
+    SELECT DISTINCT EXTRACT(YEAR FROM date)::INTEGER AS season
+    FROM pitch_unpartitioned
+    WHERE date IS NOT NULL
+) seasons;
+
+-- Indexes on the parent are created on every current and future partition.
+CREATE INDEX IF NOT EXISTS pitch_game_id_pitch_number_idx ON pitch (game_id, pitch_number);
+CREATE INDEX IF NOT EXISTS pitch_pitcher_id_idx ON pitch (pitcher_id);
+CREATE INDEX IF NOT EXISTS pitch_batter_id_idx ON pitch (batter_id);
+
+INSERT INTO pitch SELECT * FROM pitch_unpartitioned;
+
+-- LIKE does not copy foreign keys: re-create those of the old table (to game and player) on the parent,
+-- which adds them to every partition. They are checked once, against the copied rows.
+DO $$
+DECLARE
+    foreign_key RECORD;
+BEGIN
+    FOR foreign_key IN
+        SELECT conname, pg_get_constraintdef(oid) AS definition
+        FROM pg_constraint
+        WHERE conrelid = 'pitch_unpartitioned'::regclass AND contype = 'f'
+    LOOP
+        EXECUTE format('ALTER TABLE pitch ADD CONSTRAINT %I %s', foreign_key.conname, foreign_key.definition);
+    END LOOP;
+END;
+$$;
+
+COMMIT;
+
+-- Once the migrated data has been verified:
+--     DROP TABLE pitch_unpartitioned;
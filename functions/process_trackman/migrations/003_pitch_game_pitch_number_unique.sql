@@ -0,0 +1,21 @@
+-- One row per (game_id, pitch_number), so process_trackman can write every file with a single
+-- INSERT ... ON CONFLICT DO UPDATE path. date is part of the key because unique constraints on a
+-- partitioned table must include the partition key; it is constant within a game.
+
+BEGIN;
+
+-- Keep a single row for any pitch that was inserted more than once.
+DELETE FROM pitch a
+USING pitch b
+WHERE a.game_id = b.game_id
+    AND a.pitch_number = b.pitch_number
+    AND a.date = b.date
+    AND a.pitch_id < b.pitch_id;
+
+ALTER TABLE pitch
+    ADD CONSTRAINT pitch_game_id_pitch_number_key UNIQUE (game_id, pitch_number, date);
+
+-- Superseded by the unique constraint's index.
+DROP INDEX IF EXISTS pitch_game_id_pitch_number_idx;
+
+COMMIT;
@@ -0,0 +1,12 @@
+-- Ledger of player positioning files that arrived before their game's pitch data file.
+-- process_trackman parks such files here instead of dropping them, and ingests them as soon
+-- as the matching pitch file (same game key, ex: '20240629-ClipperMagazine-1') has been ingested.
+
+CREATE TABLE IF NOT EXISTS pending_positioning_file (
+    s3_key TEXT PRIMARY KEY,
+    bucket TEXT NOT NULL,
+    game_key TEXT NOT NULL,
+    parked_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS pending_positioning_file_game_key_idx ON pending_positioning_file (game_key);
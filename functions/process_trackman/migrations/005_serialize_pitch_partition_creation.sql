@@ -0,0 +1,18 @@
+-- Concurrent ingestions of the first games of a season could both find the season partition
+-- missing and race to create it. Take a per-season advisory lock before checking, so one of them
+-- creates the partition and the other waits and then sees it.
+
+CREATE OR REPLACE FUNCTION create_pitch_season_partition(season INTEGER)
+RETURNS TEXT AS $$
+DECLARE
+    partition_name TEXT := format('pitch_y%s', season);
+BEGIN
+    IF to_regclass(partition_name) IS NULL THEN
+        PERFORM pg_advisory_xact_lock(hashtextextended('pitch_partition:' || season, 0));
+        IF to_regclass(partition_name) IS NULL THEN
+            PERFORM create_pitch_partition(partition_name, season);
+        END IF;
+    END IF;
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
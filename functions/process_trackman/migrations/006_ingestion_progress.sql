@@ -0,0 +1,13 @@
+-- Chunk-level checkpoints of process_trackman's pitch writes, one row per S3 object.
+-- Each chunk of upserted rows and its checkpoint commit together, so a retry of the same
+-- object version (same ETag) after a timeout or failover resumes at the first uncommitted chunk.
+
+CREATE TABLE IF NOT EXISTS ingestion_progress (
+    s3_key TEXT PRIMARY KEY,
+    etag TEXT NOT NULL,
+    last_committed_chunk INTEGER NOT NULL DEFAULT 0, -- 1-based; 0 means no chunk is committed yet
+    committed_rows INTEGER NOT NULL DEFAULT 0,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    completed_at TIMESTAMPTZ
+);
@@ -0,0 +1,11 @@
+-- Derived pitch metrics computed by process_trackman at ingest (see image/src/metrics.py).
+-- Columns added to the partitioned parent are added to every season partition.
+-- Rows ingested before this migration keep NULLs until their game's file is ingested again.
+
+ALTER TABLE pitch
+    ADD COLUMN IF NOT EXISTS release_to_plate_time DOUBLE PRECISION, -- s, release point to front of plate
+    ADD COLUMN IF NOT EXISTS plate_vert_appr_angle DOUBLE PRECISION, -- degrees at the front of the plate; negative is descending
+    ADD COLUMN IF NOT EXISTS plate_horz_appr_angle DOUBLE PRECISION, -- degrees at the front of the plate
+    ADD COLUMN IF NOT EXISTS total_break DOUBLE PRECISION, -- inches, magnitude of (pfxx, pfxz)
+    ADD COLUMN IF NOT EXISTS transverse_spin_rate DOUBLE PRECISION, -- rpm, estimated from the Magnus acceleration
+    ADD COLUMN IF NOT EXISTS spin_efficiency DOUBLE PRECISION; -- transverse_spin_rate / spin_rate, in [0, 1]
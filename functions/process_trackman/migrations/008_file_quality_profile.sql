@@ -0,0 +1,34 @@
+-- Data quality profile of every Trackman file process_trackman ingests, one row per file.
+-- The headline counts are columns so ballparks can be compared cheaply over time (see ballpark_data_quality);
+-- 'columns' holds per-column detail: {"SpinRate": {"null_rate": 0.02, "min": 1012.5, "max": 2950.1}, "PitchCall": {"null_rate": 0, "sentinels": 3}, ...}
+
+CREATE TABLE IF NOT EXISTS file_quality_profile (
+    file_name TEXT PRIMARY KEY,
+    game_id UUID REFERENCES game (game_id) ON DELETE CASCADE,
+    ballpark_name TEXT NOT NULL,
+    game_date DATE NOT NULL,
+    row_count INTEGER NOT NULL,
+    duplicate_pitch_numbers INTEGER,
+    missing_date_rows INTEGER,
+    undefined_pitch_call_rows INTEGER,
+    missing_spin_rate_rows INTEGER,
+    columns JSONB NOT NULL,
+    profiled_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS file_quality_profile_ballpark_date_idx ON file_quality_profile (ballpark_name, game_date);
+
+-- Weekly feed quality per ballpark, ex:
+--     SELECT * FROM ballpark_data_quality WHERE week >= now() - interval '8 weeks' ORDER BY missing_spin_rate DESC;
+CREATE OR REPLACE VIEW ballpark_data_quality AS
+SELECT
+    ballpark_name,
+    date_trunc('week', game_date)::date AS week,
+    COUNT(*) AS files,
+    SUM(row_count) AS row_count,
+    SUM(missing_spin_rate_rows)::DOUBLE PRECISION / NULLIF(SUM(row_count), 0) AS missing_spin_rate,
+    SUM(undefined_pitch_call_rows)::DOUBLE PRECISION / NULLIF(SUM(row_count), 0) AS undefined_pitch_call_rate,
+    SUM(missing_date_rows)::DOUBLE PRECISION / NULLIF(SUM(row_count), 0) AS missing_date_rate,
+    SUM(duplicate_pitch_numbers) AS duplicate_pitch_numbers
+FROM file_quality_profile
+GROUP BY ballpark_name, date_trunc('week', game_date);
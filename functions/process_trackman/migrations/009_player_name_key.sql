@@ -0,0 +1,81 @@
+-- Normalized player name key, so Trackman's spelling variants of a player ("Smith, John", "John  Smith",
+-- "SMITH, JOHN") resolve to one 'player' row per team. process_trackman looks players up by this key.
+-- Keep player_name_key() in step with player_name_key() in image/src/main.py.
+--
+-- Also the one-time merge of the duplicates already in 'player': every reference is repointed to one
+-- player per (name key, team) before the unique index is created. Run it in a quiet window (no ingestion).
+
+CREATE OR REPLACE FUNCTION player_name_key(name TEXT) RETURNS TEXT
+LANGUAGE SQL IMMUTABLE STRICT PARALLEL SAFE AS $$
+    SELECT NULLIF(lower(regexp_replace(btrim(
+        CASE WHEN n ~ '^[^,]*,[^,]*$' THEN split_part(n, ',', 2) || ' ' || split_part(n, ',', 1) ELSE n END -- 'Last, First' => 'First Last'
+        ), '\s+', ' ', 'g')), '')
+    FROM (SELECT normalize(name, NFKC) AS n) AS normalized;
+$$;
+
+ALTER TABLE player ADD COLUMN IF NOT EXISTS player_name_key TEXT GENERATED ALWAYS AS (player_name_key(player_name)) STORED;
+
+BEGIN;
+
+-- Keep one player per (key, team), preferring Trackman's own 'Last, First' spelling.
+CREATE TEMP TABLE player_merge ON COMMIT DROP AS
+SELECT player_id, keep_id
+FROM (
+    SELECT
+        player_id,
+        first_value(player_id) OVER (
+            PARTITION BY player_name_key, team_id
+            ORDER BY player_name ~ '^[^,]+, [^,]+$' DESC, player_id
+            ) AS keep_id
+    FROM player
+    WHERE player_name_key IS NOT NULL
+) AS ranked
+WHERE player_id <> keep_id;
+
+-- The kept player inherits handedness it is missing; differing batting sides make a switch hitter.
+UPDATE player AS kept
+SET player_pitching_handedness = COALESCE(kept.player_pitching_handedness, merged.pitching_handedness),
+    player_batting_handedness = CASE
+        WHEN kept.player_batting_handedness IS NULL THEN merged.batting_handedness
+        WHEN merged.batting_handedness IS NOT NULL AND merged.batting_handedness <> kept.player_batting_handedness THEN 'Switch'
+        ELSE kept.player_batting_handedness
+    END
+FROM (
+    SELECT m.keep_id, MAX(p.player_pitching_handedness) AS pitching_handedness, MAX(p.player_batting_handedness) AS batting_handedness
+    FROM player_merge AS m
+    JOIN player AS p ON p.player_id = m.player_id
+    GROUP BY m.keep_id
+) AS merged
+WHERE kept.player_id = merged.keep_id;
+
+UPDATE pitch SET pitcher_id = m.keep_id FROM player_merge AS m WHERE pitch.pitcher_id = m.player_id;
+UPDATE pitch SET batter_id = m.keep_id FROM player_merge AS m WHERE pitch.batter_id = m.player_id;
+UPDATE pitch SET catcher_id = m.keep_id FROM player_merge AS m WHERE pitch.catcher_id = m.player_id;
+UPDATE pitch SET first_b_player_id = m.keep_id FROM player_merge AS m WHERE pitch.first_b_player_id = m.player_id;
+UPDATE pitch SET second_b_player_id = m.keep_id FROM player_merge AS m WHERE pitch.second_b_player_id = m.player_id;
+UPDATE pitch SET third_b_player_id = m.keep_id FROM player_merge AS m WHERE pitch.third_b_player_id = m.player_id;
+UPDATE pitch SET ss_player_id = m.keep_id FROM player_merge AS m WHERE pitch.ss_player_id = m.player_id;
+UPDATE pitch SET lf_player_id = m.keep_id FROM player_merge AS m WHERE pitch.lf_player_id = m.player_id;
+UPDATE pitch SET cf_player_id = m.keep_id FROM player_merge AS m WHERE pitch.cf_player_id = m.player_id;
+UPDATE pitch SET rf_player_id = m.keep_id FROM player_merge AS m WHERE pitch.rf_player_id = m.player_id;
+
+-- Only one summary row per game can be repointed to the kept player: the kept player's own row, else the
+-- row of its first duplicate. The others are dropped (re-ingesting the game rebuilds its summaries).
+DELETE FROM game_pitcher_summary AS s
+USING player_merge AS m
+WHERE s.pitcher_id = m.player_id
+  AND EXISTS (
+    SELECT 1
+    FROM game_pitcher_summary AS k
+    LEFT JOIN player_merge AS km ON km.player_id = k.pitcher_id
+    WHERE k.game_id = s.game_id
+      AND COALESCE(km.keep_id, k.pitcher_id) = m.keep_id
+      AND (km.player_id IS NULL OR k.pitcher_id < s.pitcher_id)
+    );
+UPDATE game_pitcher_summary SET pitcher_id = m.keep_id FROM player_merge AS m WHERE game_pitcher_summary.pitcher_id = m.player_id;
+
+DELETE FROM player WHERE player_id IN (SELECT player_id FROM player_merge);
+
+CREATE UNIQUE INDEX IF NOT EXISTS player_name_key_team_idx ON player (player_name_key, team_id);
+
+COMMIT;
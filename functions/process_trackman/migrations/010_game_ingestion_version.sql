@@ -0,0 +1,4 @@
+-- Bumped by process_trackman every time it writes a game's pitches (pitch data or player positioning).
+-- Readers key caches of a game's pitches by (game_id, ingestion_version), so a re-ingested game is never served stale.
+
+ALTER TABLE game ADD COLUMN IF NOT EXISTS ingestion_version INTEGER NOT NULL DEFAULT 0;
@@ -0,0 +1,33 @@
+-- Plate appearances rebuilt by process_trackman from each game's pitches (see image/src/plate_appearances.py).
+-- Every row for a game is replaced in a single transaction when the game is re-ingested.
+-- A plate appearance's pitches are pitch rows of the same game with pitch_number BETWEEN first_pitch_number AND last_pitch_number;
+-- the *_sequence arrays hold the count before each of them, so count transitions need no pitch scan, ex:
+--     SELECT batter_id, result FROM plate_appearance WHERE balls_sequence[1:2] = '{0,1}' AND strikes_sequence[1:2] = '{0,0}';
+
+CREATE TABLE IF NOT EXISTS plate_appearance (
+    game_id UUID NOT NULL REFERENCES game (game_id) ON DELETE CASCADE,
+    pa_number INTEGER NOT NULL, -- order of the plate appearance in the game, from 1
+    inning INTEGER,
+    top_or_bottom TEXT,
+    pa_of_inning INTEGER,
+    pitcher_id UUID REFERENCES player (player_id) ON DELETE SET NULL, -- pitcher of the final pitch
+    batter_id UUID REFERENCES player (player_id) ON DELETE SET NULL,
+    first_pitch_number INTEGER,
+    last_pitch_number INTEGER,
+    pitch_count INTEGER NOT NULL,
+    outs INTEGER,
+    start_balls INTEGER,
+    start_strikes INTEGER,
+    end_balls INTEGER, -- count before the final pitch
+    end_strikes INTEGER,
+    result TEXT, -- KorBB (Strikeout, Walk), else PlayResult, else HitByPitch; NULL when the plate appearance did not finish
+    outs_on_play INTEGER NOT NULL,
+    runs_scored INTEGER NOT NULL,
+    balls_sequence SMALLINT[] NOT NULL,
+    strikes_sequence SMALLINT[] NOT NULL,
+    pitch_calls TEXT[] NOT NULL,
+    PRIMARY KEY (game_id, pa_number)
+);
+
+CREATE INDEX IF NOT EXISTS plate_appearance_batter_idx ON plate_appearance (batter_id);
+CREATE INDEX IF NOT EXISTS plate_appearance_pitcher_idx ON plate_appearance (pitcher_id);
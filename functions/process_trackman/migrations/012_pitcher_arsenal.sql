@@ -0,0 +1,62 @@
+-- Pitcher arsenal partials computed by process_trackman at ingest (see image/src/arsenal.py), one row per
+-- game x pitcher x pitch type. Every row for a game is replaced in a single transaction when the game is re-ingested.
+-- Each metric keeps its count, sum and sum of squares, so partials merge by addition: season_pitcher_arsenal
+-- derives season usage, means and (population) standard deviations from them without reading pitch.
+
+CREATE TABLE IF NOT EXISTS game_pitcher_arsenal (
+    game_id UUID NOT NULL REFERENCES game (game_id) ON DELETE CASCADE,
+    pitcher_id UUID NOT NULL REFERENCES player (player_id) ON DELETE CASCADE,
+    pitch_type TEXT NOT NULL,
+    pitch_count INTEGER NOT NULL,
+    rel_speed_count INTEGER NOT NULL,
+    rel_speed_sum DOUBLE PRECISION NOT NULL,
+    rel_speed_sum_sq DOUBLE PRECISION NOT NULL,
+    spin_rate_count INTEGER NOT NULL,
+    spin_rate_sum DOUBLE PRECISION NOT NULL,
+    spin_rate_sum_sq DOUBLE PRECISION NOT NULL,
+    induced_vert_break_count INTEGER NOT NULL,
+    induced_vert_break_sum DOUBLE PRECISION NOT NULL,
+    induced_vert_break_sum_sq DOUBLE PRECISION NOT NULL,
+    horz_break_count INTEGER NOT NULL,
+    horz_break_sum DOUBLE PRECISION NOT NULL,
+    horz_break_sum_sq DOUBLE PRECISION NOT NULL,
+    rel_height_count INTEGER NOT NULL,
+    rel_height_sum DOUBLE PRECISION NOT NULL,
+    rel_height_sum_sq DOUBLE PRECISION NOT NULL,
+    rel_side_count INTEGER NOT NULL,
+    rel_side_sum DOUBLE PRECISION NOT NULL,
+    rel_side_sum_sq DOUBLE PRECISION NOT NULL,
+    extension_count INTEGER NOT NULL,
+    extension_sum DOUBLE PRECISION NOT NULL,
+    extension_sum_sq DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (game_id, pitcher_id, pitch_type)
+);
+
+CREATE INDEX IF NOT EXISTS game_pitcher_arsenal_pitcher_idx ON game_pitcher_arsenal (pitcher_id);
+
+-- ex: SELECT * FROM season_pitcher_arsenal WHERE pitcher_id = '...' AND season = 2024 ORDER BY usage DESC;
+CREATE OR REPLACE VIEW season_pitcher_arsenal AS
+SELECT
+    a.pitcher_id,
+    EXTRACT(YEAR FROM g.date)::INTEGER AS season,
+    a.pitch_type,
+    COUNT(DISTINCT a.game_id) AS games,
+    SUM(a.pitch_count) AS pitch_count,
+    SUM(a.pitch_count)::DOUBLE PRECISION / SUM(SUM(a.pitch_count)) OVER (PARTITION BY a.pitcher_id, EXTRACT(YEAR FROM g.date)) AS usage,
+    SUM(a.rel_speed_sum) / NULLIF(SUM(a.rel_speed_count), 0) AS avg_rel_speed,
+    sqrt(GREATEST(SUM(a.rel_speed_sum_sq) / NULLIF(SUM(a.rel_speed_count), 0) - (SUM(a.rel_speed_sum) / NULLIF(SUM(a.rel_speed_count), 0)) ^ 2, 0)) AS std_rel_speed,
+    SUM(a.spin_rate_sum) / NULLIF(SUM(a.spin_rate_count), 0) AS avg_spin_rate,
+    sqrt(GREATEST(SUM(a.spin_rate_sum_sq) / NULLIF(SUM(a.spin_rate_count), 0) - (SUM(a.spin_rate_sum) / NULLIF(SUM(a.spin_rate_count), 0)) ^ 2, 0)) AS std_spin_rate,
+    SUM(a.induced_vert_break_sum) / NULLIF(SUM(a.induced_vert_break_count), 0) AS avg_induced_vert_break,
+    sqrt(GREATEST(SUM(a.induced_vert_break_sum_sq) / NULLIF(SUM(a.induced_vert_break_count), 0) - (SUM(a.induced_vert_break_sum) / NULLIF(SUM(a.induced_vert_break_count), 0)) ^ 2, 0)) AS std_induced_vert_break,
+    SUM(a.horz_break_sum) / NULLIF(SUM(a.horz_break_count), 0) AS avg_horz_break,
+    sqrt(GREATEST(SUM(a.horz_break_sum_sq) / NULLIF(SUM(a.horz_break_count), 0) - (SUM(a.horz_break_sum) / NULLIF(SUM(a.horz_break_count), 0)) ^ 2, 0)) AS std_horz_break,
+    SUM(a.rel_height_sum) / NULLIF(SUM(a.rel_height_count), 0) AS avg_rel_height,
+    sqrt(GREATEST(SUM(a.rel_height_sum_sq) / NULLIF(SUM(a.rel_height_count), 0) - (SUM(a.rel_height_sum) / NULLIF(SUM(a.rel_height_count), 0)) ^ 2, 0)) AS std_rel_height,
+    SUM(a.rel_side_sum) / NULLIF(SUM(a.rel_side_count), 0) AS avg_rel_side,
+    sqrt(GREATEST(SUM(a.rel_side_sum_sq) / NULLIF(SUM(a.rel_side_count), 0) - (SUM(a.rel_side_sum) / NULLIF(SUM(a.rel_side_count), 0)) ^ 2, 0)) AS std_rel_side,
+    SUM(a.extension_sum) / NULLIF(SUM(a.extension_count), 0) AS avg_extension,
+    sqrt(GREATEST(SUM(a.extension_sum_sq) / NULLIF(SUM(a.extension_count), 0) - (SUM(a.extension_sum) / NULLIF(SUM(a.extension_count), 0)) ^ 2, 0)) AS std_extension
+FROM game_pitcher_arsenal AS a
+JOIN game AS g ON g.game_id = a.game_id
+GROUP BY a.pitcher_id, EXTRACT(YEAR FROM g.date), a.pitch_type;
@@ -0,0 +1,37 @@
+-- Season counters per player and role, kept current by process_trackman from per-game deltas (see image/src/season_stats.py).
+-- game_player_stat_delta holds what each game last contributed; re-ingesting a game subtracts that and adds the new
+-- counters in the same transaction, so season_player_stats never needs a scan of pitch.
+--
+-- Deleting a game drops its delta rows (ON DELETE CASCADE) but not their contribution; rebuild the totals afterwards with:
+--     BEGIN;
+--     DELETE FROM season_player_stats;
+--     INSERT INTO season_player_stats
+--     SELECT d.player_id, EXTRACT(YEAR FROM g.date)::INTEGER, d.role, SUM(d.pitch_count), SUM(d.strikeouts), SUM(d.walks),
+--            SUM(d.balls_in_play), SUM(d.hard_hit_balls)
+--     FROM game_player_stat_delta AS d JOIN game AS g ON g.game_id = d.game_id
+--     GROUP BY d.player_id, EXTRACT(YEAR FROM g.date), d.role;
+--     COMMIT;
+
+CREATE TABLE IF NOT EXISTS game_player_stat_delta (
+    game_id UUID NOT NULL REFERENCES game (game_id) ON DELETE CASCADE,
+    player_id UUID NOT NULL REFERENCES player (player_id) ON DELETE CASCADE,
+    role TEXT NOT NULL CHECK (role IN ('pitcher', 'batter')),
+    pitch_count INTEGER NOT NULL, -- thrown by a pitcher, seen by a batter
+    strikeouts INTEGER NOT NULL,
+    walks INTEGER NOT NULL,
+    balls_in_play INTEGER NOT NULL,
+    hard_hit_balls INTEGER NOT NULL, -- balls in play with exit_speed >= 95 mph
+    PRIMARY KEY (game_id, player_id, role)
+);
+
+CREATE TABLE IF NOT EXISTS season_player_stats (
+    player_id UUID NOT NULL REFERENCES player (player_id) ON DELETE CASCADE,
+    season INTEGER NOT NULL,
+    role TEXT NOT NULL CHECK (role IN ('pitcher', 'batter')),
+    pitch_count INTEGER NOT NULL,
+    strikeouts INTEGER NOT NULL,
+    walks INTEGER NOT NULL,
+    balls_in_play INTEGER NOT NULL,
+    hard_hit_balls INTEGER NOT NULL,
+    PRIMARY KEY (player_id, season, role)
+);
@@ -0,0 +1,12 @@
+-- Version of every game, team and player process_trackman has written, bumped right after the pitches are written
+-- (see image/src/invalidation.py) and announced on the 'entity_version' channel with NOTIFY when that commits.
+-- Readers cache anything derived from an entity under its version and check it with one primary key read
+-- (a missing row is version 0), or LISTEN on the channel to drop entries as soon as they change.
+
+CREATE TABLE IF NOT EXISTS entity_version (
+    entity_type TEXT NOT NULL CHECK (entity_type IN ('game', 'team', 'player')),
+    entity_id UUID NOT NULL,
+    version BIGINT NOT NULL, -- only ever incremented
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (entity_type, entity_id)
+);
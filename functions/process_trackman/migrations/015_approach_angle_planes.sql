@@ -0,0 +1,11 @@
+-- Approach angles at the planes of metrics.APPROACH_ANGLE_PLANES, replacing the ones at the front of the plate,
+-- which repeated Trackman's own VertApprAngle/HorzApprAngle (vert_appr_angle/horz_appr_angle in 'pitch').
+-- Rows ingested before this migration keep NULLs until their game's file is ingested again.
+
+ALTER TABLE pitch
+    ADD COLUMN IF NOT EXISTS tunnel_vert_appr_angle DOUBLE PRECISION, -- degrees, 23.8 ft from home plate; negative is descending
+    ADD COLUMN IF NOT EXISTS tunnel_horz_appr_angle DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS plate_back_vert_appr_angle DOUBLE PRECISION, -- degrees, at the back tip of the plate
+    ADD COLUMN IF NOT EXISTS plate_back_horz_appr_angle DOUBLE PRECISION,
+    DROP COLUMN IF EXISTS plate_vert_appr_angle,
+    DROP COLUMN IF EXISTS plate_horz_appr_angle;
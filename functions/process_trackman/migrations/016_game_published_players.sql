@@ -0,0 +1,5 @@
+-- Players whose versions the last ingestion of the game bumped (see image/src/invalidation.py). The next ingestion
+-- bumps these as well as the players now in the game's pitches, so a player removed by a re-ingestion or a verified
+-- swap is invalidated too.
+
+ALTER TABLE game ADD COLUMN IF NOT EXISTS published_player_ids UUID[];
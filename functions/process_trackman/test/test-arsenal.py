@@ -0,0 +1,60 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+from functions.process_trackman.image.src.arsenal import compute_arsenal, ArsenalAccumulator, ARSENAL_STATS
+import math
+import pandas as pd
+import pytest
+
+
+class TestComputeArsenal:
+    df = pd.DataFrame({
+        'TaggedPitchType': ['Fastball', 'Fastball', 'Slider', None, 'Fastball'],
+        'RelSpeed': [95.0, 93.0, 84.0, 90.0, 91.0],
+        'SpinRate': [2300.0, None, 2500.0, 2400.0, 2200.0],
+        'InducedVertBreak': [18.0, 16.0, 2.0, 10.0, 15.0],
+        'HorzBreak': [-8.0, -9.0, 6.0, 0.0, 7.0],
+        'RelHeight': [6.0, 6.1, 5.9, 6.0, 5.5],
+        'RelSide': [-2.0, -2.1, -1.9, -2.0, 1.5],
+        'Extension': [6.2, 6.3, 6.0, 6.1, 5.8],
+    })
+    pitcher_ids = ['p1', 'p1', 'p1', 'p1', 'p2']
+
+    def arsenal(self, rows):
+        return {(pitcher_id, pitch_type): dict(zip(ARSENAL_STATS, stats)) for pitcher_id, pitch_type, *stats in rows}
+
+    def test_partials_per_pitcher_and_pitch_type(self):
+        arsenal = self.arsenal(compute_arsenal(self.df, self.pitcher_ids))
+        assert set(arsenal) == {('p1', 'Fastball'), ('p1', 'Slider'), ('p1', 'Undefined'), ('p2', 'Fastball')}
+        fastball = arsenal[('p1', 'Fastball')]
+        assert fastball['pitch_count'] == 2
+        assert (fastball['rel_speed_count'], fastball['rel_speed_sum'], fastball['rel_speed_sum_sq']) == (2, 188.0, 95.0 ** 2 + 93.0 ** 2)
+        assert (fastball['spin_rate_count'], fastball['spin_rate_sum']) == (1, 2300.0)
+
+    def test_partials_merge_into_mean_and_variance(self):
+        # the same pitcher over two "games" merges to the statistics of all their pitches
+        first, second = self.df.iloc[:2], self.df.iloc[[4]]
+        merged = [
+            a + b for a, b in zip(
+                self.arsenal(compute_arsenal(first, ['p1', 'p1']))[('p1', 'Fastball')].values(),
+                self.arsenal(compute_arsenal(second, ['p1']))[('p1', 'Fastball')].values(),
+            )
+        ]
+        stats = dict(zip(ARSENAL_STATS, merged))
+        speeds = [95.0, 93.0, 91.0]
+        mean = stats['rel_speed_sum'] / stats['rel_speed_count']
+        variance = stats['rel_speed_sum_sq'] / stats['rel_speed_count'] - mean ** 2
+        assert mean == pytest.approx(sum(speeds) / 3)
+        assert math.sqrt(variance) == pytest.approx(pd.Series(speeds).std(ddof=0))
+
+    def test_pitches_without_pitcher_are_skipped(self):
+        assert compute_arsenal(self.df, [None] * len(self.df)) == []
+
+    def test_accumulator_matches_dataframe_arsenal(self):
+        accumulator = ArsenalAccumulator()
+        records = self.df.astype(object).where(self.df.notna(), None).to_dict('records')
+        for pitcher_id, record in zip(self.pitcher_ids, records):
+            accumulator.add(pitcher_id, record)
+        expected = self.arsenal(compute_arsenal(self.df, self.pitcher_ids))
+        streamed = self.arsenal(accumulator.arsenal())
+        assert streamed.keys() == expected.keys()
+        for key, stats in streamed.items():
+            assert stats == pytest.approx(expected[key])
@@ -0,0 +1,41 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+from functions.process_trackman.image.src.batching import AdaptiveBatchSize
+
+
+def write(batch_size, seconds_per_batch):
+    """ Record one full batch at the current size, taking seconds_per_batch(size) to write. """
+    size = batch_size.size
+    batch_size.record(size, seconds_per_batch(size))
+    return size
+
+
+class TestAdaptiveBatchSize:
+    def test_grows_while_throughput_improves_then_settles_on_the_best_size(self):
+        # a round trip costs 50 ms and rows 0.1 ms each up to 2000 rows, 0.3 ms each beyond
+        seconds = lambda size: 0.05 + 0.0001 * min(size, 2000) + 0.0003 * max(size - 2000, 0)
+        batch_size = AdaptiveBatchSize(500, 50, 16000, 10.0)
+        sizes = [write(batch_size, seconds) for _ in range(8)]
+        assert sizes[:4] == [500, 1000, 2000, 4000]
+        assert set(sizes[4:]) == {2000}
+
+    def test_slow_batch_halves_the_size_and_caps_it(self):
+        batch_size = AdaptiveBatchSize(4000, 50, 5000, 2.0)
+        batch_size.record(4000, 3.0)
+        assert (batch_size.size, batch_size.maximum) == (2000, 2000)
+        batch_size.record(2000, 0.5) # faster, but growth stays capped below the size that was too slow
+        assert batch_size.size == 2000
+
+    def test_size_stays_within_bounds(self):
+        batch_size = AdaptiveBatchSize(10, 50, 100, 2.0)
+        assert batch_size.size == 50
+        for _ in range(5):
+            write(batch_size, lambda size: 0.001)
+        assert batch_size.size == 100
+        for _ in range(5):
+            write(batch_size, lambda size: 5.0)
+        assert batch_size.size == 50
+
+    def test_partial_batch_is_ignored(self):
+        batch_size = AdaptiveBatchSize(500, 50, 5000, 2.0)
+        batch_size.record(120, 9.0)
+        assert batch_size.size == 500
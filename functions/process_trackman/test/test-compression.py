@@ -0,0 +1,40 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+from functions.process_trackman.image.src.compression import open_text_stream, strip_compression_suffix
+from csv import DictReader
+import gzip
+import io
+import pytest
+
+CSV = 'PitchNo,HomeTeam,AwayTeam\n1,YOR_REV,LAN_BAR\n2,YOR_REV,LAN_BAR\n'
+
+
+class TrickleBody:
+    """ Like botocore's StreamingBody: read(n) only, and reads return at most a few bytes at a time. """
+    def __init__(self, data):
+        self.stream = io.BytesIO(data)
+
+    def read(self, size=-1):
+        return self.stream.read(min(size, 7) if size and size > 0 else 7)
+
+
+class TestOpenTextStream:
+    def rows(self, data, key):
+        return list(DictReader(open_text_stream(TrickleBody(data), key)))
+
+    def test_plain_csv(self):
+        assert self.rows(CSV.encode('utf-8'), 'a/20240629-ClipperMagazine-1.csv')[1]['PitchNo'] == '2'
+
+    def test_gzip_by_suffix(self):
+        assert len(self.rows(gzip.compress(CSV.encode('utf-8')), 'a/20240629-ClipperMagazine-1.csv.gz')) == 2
+
+    def test_gzip_by_magic_bytes(self):
+        assert self.rows(gzip.compress(CSV.encode('utf-8')), 'a/20240629-ClipperMagazine-1.csv')[0]['HomeTeam'] == 'YOR_REV'
+
+    def test_zstd_by_magic_bytes(self):
+        zstandard = pytest.importorskip('zstandard')
+        data = zstandard.ZstdCompressor().compress(CSV.encode('utf-8'))
+        assert len(self.rows(data, 'a/20240629-ClipperMagazine-1.csv')) == 2
+
+    def test_compression_suffix_is_stripped_from_file_name(self):
+        assert strip_compression_suffix('20240629-ClipperMagazine-1.csv.zst') == '20240629-ClipperMagazine-1.csv'
+        assert strip_compression_suffix('20240629-ClipperMagazine-1.csv') == '20240629-ClipperMagazine-1.csv'
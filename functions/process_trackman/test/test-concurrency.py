@@ -0,0 +1,83 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+# Stress test for concurrent ingestion: needs a Postgres database (ex: a local one) configured in .env.
+from functions.process_trackman.image.src.main import connect_to_db, determine_game_id, get_or_insert_player, get_or_insert_team_id
+from multiprocessing import get_context
+import psycopg2
+import pytest
+
+WORKERS = 8
+ROUNDS = 5
+HOME_TEAM, AWAY_TEAM, OTHER_TEAM = 'ZZA', 'ZZB', 'ZZC'
+PLAYER_NAME = 'Stress, Test'
+
+
+def make_game(home_team, away_team):
+    return {
+        'home_team': home_team,
+        'away_team': away_team,
+        'ballpark_id': None,
+        'verified': False,
+        'date': '2099-06-29',
+        'daily_game_number': 1,
+        'file_type': 'pitch data',
+    }
+
+
+def ingest_game_and_players(barrier, home_team, away_team):
+    """ Worker: wait for every other worker, then resolve the same game and players at the same time. """
+    conn = connect_to_db()
+    barrier.wait()
+    game_id = determine_game_id('', conn, None, make_game(home_team, away_team), None)
+    pitcher_id = get_or_insert_player(PLAYER_NAME, 'Right', home_team, 'pitcher', conn)
+    batter_id = get_or_insert_player(PLAYER_NAME, 'Left', home_team, 'batter', conn)
+    conn.close()
+    return game_id, pitcher_id, batter_id
+
+
+def run_workers(teams):
+    context = get_context('spawn')
+    barrier = context.Manager().Barrier(len(teams))
+    with context.Pool(len(teams)) as pool:
+        return pool.starmap(ingest_game_and_players, [(barrier, home, away) for home, away in teams])
+
+
+class TestConcurrentIngestion:
+    @pytest.fixture(autouse=True)
+    def conn(self):
+        try:
+            conn = connect_to_db()
+        except (KeyError, psycopg2.OperationalError): # DB_* variables unset, or no server
+            pytest.skip('needs a Postgres database configured in .env')
+        for team_code in (HOME_TEAM, AWAY_TEAM, OTHER_TEAM):
+            get_or_insert_team_id(team_code, conn)
+        self.cleanup(conn)
+        yield conn
+        self.cleanup(conn)
+        conn.close()
+
+    def cleanup(self, conn):
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM game WHERE date = '2099-06-29';")
+        cursor.execute("DELETE FROM player WHERE player_name = %s;", (PLAYER_NAME,))
+        conn.commit()
+
+    def count(self, conn, query, args=()):
+        cursor = conn.cursor()
+        cursor.execute(query, args)
+        return cursor.fetchone()[0]
+
+    def test_same_game_and_players_are_inserted_once(self, conn):
+        for _ in range(ROUNDS):
+            self.cleanup(conn)
+            results = run_workers([(HOME_TEAM, AWAY_TEAM)] * WORKERS)
+            # only the first worker inserts the (unverified) game; the rest see it and skip it
+            assert len({game_id for game_id, _, _ in results if game_id}) == 1
+            assert len({pitcher_id for _, pitcher_id, _ in results}) == 1
+            assert self.count(conn, "SELECT COUNT(*) FROM game WHERE date = '2099-06-29';") == 1
+            assert self.count(conn, "SELECT COUNT(*) FROM player WHERE player_name = %s;", (PLAYER_NAME,)) == 1
+
+    def test_different_games_are_all_inserted(self, conn):
+        results = run_workers([(HOME_TEAM, AWAY_TEAM), (AWAY_TEAM, HOME_TEAM), (OTHER_TEAM, HOME_TEAM)])
+        assert all(game_id for game_id, _, _ in results)
+        assert self.count(conn, "SELECT COUNT(*) FROM game WHERE date = '2099-06-29';") == 3
+        assert self.count(conn, "SELECT COUNT(*) FROM player WHERE player_name = %s;", (PLAYER_NAME,)) == 3
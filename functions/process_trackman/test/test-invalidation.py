@@ -0,0 +1,62 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+from functions.process_trackman.image.src.invalidation import (
+    game_entities, publish_entity_versions, notification_payloads, CHANNEL, IDS_PER_NOTIFICATION
+)
+import json
+
+GAME_ID = '6f1c2a4e-8a53-4f0e-9d1b-0c6e2f3a9b71'
+TEAM_IDS = ['0b9e6c1d-2f3a-4b5c-8d7e-9f0a1b2c3d4e', '1c0f7d2e-3a4b-4c6d-9e8f-0a1b2c3d4e5f']
+PLAYER_IDS = ['2d1a8e3f-4b5c-4d7e-8f9a-1b2c3d4e5f6a', '3e2b9f4a-5c6d-4e8f-9a0b-2c3d4e5f6a7b', '4f3c0a5b-6d7e-4f9a-8b1c-3d4e5f6a7b8c']
+
+
+class Cursor:
+    def __init__(self, results=()):
+        self.statements = []
+        self.results = list(results)
+
+    def execute(self, sql, params):
+        self.statements.append((sql, params))
+
+    def fetchone(self):
+        return self.results.pop(0)
+
+    def fetchall(self):
+        return self.results.pop(0)
+
+
+class TestGameEntities:
+    def test_players_of_the_previous_ingestion_are_included(self):
+        # PLAYER_IDS[0] was replaced by PLAYER_IDS[2], ex: by the verified file of the game
+        cursor = Cursor([(*TEAM_IDS, PLAYER_IDS[:2]), [(PLAYER_IDS[1],), (PLAYER_IDS[2],)]])
+        entities = game_entities(cursor, GAME_ID)
+        assert entities == {'game': [GAME_ID], 'team': TEAM_IDS, 'player': PLAYER_IDS}
+        sql, params = cursor.statements[-1]
+        assert 'published_player_ids' in sql and params == (PLAYER_IDS[1:], GAME_ID)
+
+    def test_first_ingestion_has_no_previous_players(self):
+        cursor = Cursor([(*TEAM_IDS, None), [(PLAYER_IDS[0],)]])
+        assert game_entities(cursor, GAME_ID)['player'] == PLAYER_IDS[:1]
+
+
+class TestPublishEntityVersions:
+    def test_versions_are_bumped_in_key_order_then_notified(self):
+        cursor = Cursor()
+        publish_entity_versions(cursor, {'team': TEAM_IDS[::-1], 'game': [GAME_ID], 'player': []})
+        (upsert, (types, ids)), *notifications = cursor.statements
+        assert 'ON CONFLICT (entity_type, entity_id)' in upsert
+        assert list(zip(types, ids)) == [('game', GAME_ID), ('team', TEAM_IDS[0]), ('team', TEAM_IDS[1])]
+        assert [params for _, params in notifications] == [
+            (CHANNEL, json.dumps({'type': 'game', 'ids': [GAME_ID]})),
+            (CHANNEL, json.dumps({'type': 'team', 'ids': TEAM_IDS})),
+        ]
+
+    def test_nothing_changed_publishes_nothing(self):
+        cursor = Cursor()
+        publish_entity_versions(cursor, {'player': []})
+        assert cursor.statements == []
+
+    def test_payloads_fit_in_a_notification(self):
+        player_ids = sorted(f'00000000-0000-0000-0000-{n:012d}' for n in range(IDS_PER_NOTIFICATION * 2 + 1))
+        payloads = list(notification_payloads([('player', player_id) for player_id in player_ids]))
+        assert [len(json.loads(payload)['ids']) for payload in payloads] == [IDS_PER_NOTIFICATION, IDS_PER_NOTIFICATION, 1]
+        assert all(len(payload.encode()) < 8000 for payload in payloads)
@@ -0,0 +1,59 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+from functions.process_trackman.image.src.metrics import (
+    compute_derived_metrics, approach_angles, time_at_plane, DERIVED_METRICS, APPROACH_ANGLE_PLANES, PLATE_FRONT_Y
+)
+import math
+import numpy as np
+import pytest
+
+
+def pitch(**overrides):
+    """ A 92 mph four-seamer with arm-side run and ride, as one-pitch columns. """
+    values = {
+        'y0': 50.0, 'vx0': 5.0, 'vy0': -135.0, 'vz0': -5.0, 'ax0': -10.0, 'ay0': 28.0, 'az0': -14.0,
+        'pfxx': -8.0, 'pfxz': 16.0, 'SpinRate': 2300.0, 'Extension': 6.2,
+    }
+    values.update(overrides)
+    return {name: np.array([value], dtype=float) for name, value in values.items()}
+
+
+class TestDerivedMetrics:
+    def metrics(self, **overrides):
+        return dict(zip(DERIVED_METRICS, compute_derived_metrics(pitch(**overrides))[0]))
+
+    def test_time_without_acceleration_is_distance_over_speed(self):
+        assert time_at_plane(pitch(ay0=0.0), 0.0)[0] == pytest.approx(50 / 135)
+
+    def test_release_to_plate_time(self):
+        # about 54.3 ft of flight at roughly 130 ft/s
+        assert self.metrics()['release_to_plate_time'] == pytest.approx(0.406, abs=0.002)
+
+    def test_straight_pitch_approach_angles_follow_its_velocity(self):
+        vert, horz = approach_angles(pitch(vx0=0.0, ax0=0.0, az0=0.0, ay0=0.0), 0.0)
+        assert vert[0] == pytest.approx(-math.degrees(math.atan(5 / 135)))
+        assert horz[0] == pytest.approx(0.0)
+
+    def test_total_break_and_spin_efficiency(self):
+        metrics = self.metrics()
+        assert metrics['total_break'] == pytest.approx(math.hypot(8, 16))
+        assert 0 < metrics['spin_efficiency'] <= 1
+        assert metrics['transverse_spin_rate'] == pytest.approx(metrics['spin_efficiency'] * 2300)
+
+    def test_missing_inputs_give_nan_for_dependent_metrics_only(self):
+        metrics = dict(zip(DERIVED_METRICS, compute_derived_metrics({'y0': [50.0], 'vy0': [-135.0], 'ay0': [28.0], 'vz0': [-5.0], 'az0': [-14.0], 'pfxx': [None], 'pfxz': [2.0]})[0]))
+        assert math.isnan(metrics['total_break'])
+        assert math.isnan(metrics['release_to_plate_time']) # no Extension
+        assert not math.isnan(metrics['tunnel_vert_appr_angle'])
+
+    def test_one_pair_of_angle_columns_per_plane(self):
+        metrics = self.metrics()
+        for name, y in APPROACH_ANGLE_PLANES:
+            vert, horz = approach_angles(pitch(), y)
+            assert (metrics[f'{name}_vert_appr_angle'], metrics[f'{name}_horz_appr_angle']) == pytest.approx((vert[0], horz[0]))
+        # the ball drops ever more steeply on its way in
+        assert metrics['plate_back_vert_appr_angle'] < metrics['tunnel_vert_appr_angle']
+
+    def test_angles_at_custom_planes(self):
+        metrics = compute_derived_metrics(pitch(), planes=(('front', PLATE_FRONT_Y),))[0]
+        assert len(metrics) == len(DERIVED_METRICS) - 2 * len(APPROACH_ANGLE_PLANES) + 2
+        assert metrics[1:3] == pytest.approx(tuple(angle[0] for angle in approach_angles(pitch(), PLATE_FRONT_Y)))
@@ -0,0 +1,146 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+# The parking tests need a Postgres database (ex: a local one) configured in .env.
+from functions.process_trackman.image.src import main
+from functions.process_trackman.image.src.sources import LocalSource
+from functions.process_trackman.image.src.main import (
+    connect_to_db, ingest_event, ingest_parked_positioning_files, get_player_positioning_teams
+)
+from functions.process_trackman.image.src.pending import (
+    game_key, is_player_positioning_file, park_positioning_file, parked_positioning_files, release_positioning_file
+)
+import io
+import psycopg2
+import pytest
+
+GAME_KEY = '20990629-TestBallpark-1'
+FILE_NAME = f'{GAME_KEY}_unverified_playerpositioning_FHC.csv'
+KEY = f'2099/06/30/CSV/{FILE_NAME}'
+TEAMS = ('YOR', 'LAN')
+
+
+class TestGameKey:
+    def test_files_of_one_game_share_a_key(self):
+        assert game_key('20240629-ClipperMagazine-1.csv') == '20240629-ClipperMagazine-1'
+        assert game_key('20240629-ClipperMagazine-1_unverified.csv') == '20240629-ClipperMagazine-1'
+        assert game_key('20240629-ClipperMagazine-1_unverified_playerpositioning_FHC.csv') == '20240629-ClipperMagazine-1'
+
+    def test_only_positioning_files_are_detected(self):
+        assert is_player_positioning_file('20240629-ClipperMagazine-1_unverified_playerpositioning_FHC.csv')
+        assert not is_player_positioning_file('20240629-ClipperMagazine-1_unverified.csv')
+
+
+class TestPlayerPositioningTeams:
+    @pytest.fixture
+    def bucket(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(main, 'trackman_source', lambda bucket, s3: LocalSource(str(tmp_path)))
+        tmp_path.joinpath('2099', '06', '30', 'CSV').mkdir(parents=True)
+        return tmp_path.joinpath('2099', '06', '30', 'CSV')
+
+    def test_teams_are_read_from_the_pitch_file(self, bucket):
+        bucket.joinpath(f'{GAME_KEY}_unverified.csv').write_text('PitchNo,HomeTeam,AwayTeam\n1,YOR_REV2,LAN\n')
+        assert get_player_positioning_teams(FILE_NAME, None) == TEAMS
+
+    def test_pitch_file_without_rows_gives_no_teams(self, bucket):
+        bucket.joinpath(f'{GAME_KEY}_unverified.csv').write_text('PitchNo,HomeTeam,AwayTeam\n')
+        assert get_player_positioning_teams(FILE_NAME, None) is None
+
+
+class Source:
+    """ Stand-in for the sources.py source of a parked file. """
+
+    def get(self, key):
+        return io.BytesIO(b'PitchNo\n'), 'etag-1', 8
+
+
+class TestParkedPositioningFiles:
+    @pytest.fixture(autouse=True)
+    def conn(self):
+        try:
+            conn = connect_to_db()
+        except (KeyError, psycopg2.OperationalError): # DB_* variables unset, or no server
+            pytest.skip('needs a Postgres database configured in .env')
+        self.cleanup(conn)
+        yield conn
+        self.cleanup(conn)
+        conn.close()
+
+    def cleanup(self, conn):
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM pending_positioning_file WHERE game_key = %s;", (GAME_KEY,))
+        cursor.execute("DELETE FROM ingestion_progress WHERE s3_key = %s;", (KEY,))
+        conn.commit()
+
+    @pytest.fixture
+    def ingested(self, monkeypatch):
+        """ The (file_name, teams) of every ingest_csv call; self.results gives what each call returns (or raises). """
+        calls = []
+
+        def ingest_csv(file, file_name, light, conn, s3, teams=None, progress=None):
+            calls.append((file_name, teams))
+            result = self.results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        monkeypatch.setattr(main, 'ingest_csv', ingest_csv)
+        monkeypatch.setattr(main, 'trackman_source', lambda bucket, s3: Source())
+        return calls
+
+    def test_parked_file_is_listed_once_until_released(self, conn):
+        park_positioning_file(conn, 'trackman-data', KEY)
+        park_positioning_file(conn, 'trackman-data', KEY) # re-sent event
+        assert parked_positioning_files(conn, GAME_KEY) == [('trackman-data', KEY)]
+        release_positioning_file(conn, KEY)
+        assert parked_positioning_files(conn, GAME_KEY) == []
+
+    def test_ingested_file_is_released(self, conn, ingested):
+        park_positioning_file(conn, 'trackman-data', KEY)
+        self.results = [{'file_type': 'player positioning'}]
+        ingest_parked_positioning_files(conn, GAME_KEY, TEAMS, None)
+        assert ingested == [(FILE_NAME, TEAMS)]
+        assert parked_positioning_files(conn, GAME_KEY) == []
+
+    def test_failed_file_stays_parked(self, conn, ingested):
+        park_positioning_file(conn, 'trackman-data', KEY)
+        self.results = [psycopg2.OperationalError('server closed the connection unexpectedly')]
+        ingest_parked_positioning_files(conn, GAME_KEY, TEAMS, None)
+        assert parked_positioning_files(conn, GAME_KEY) == [('trackman-data', KEY)]
+
+    def test_file_parked_while_its_pitch_file_is_ingested_is_not_lost(self, conn, ingested, monkeypatch):
+        # the pitch data file is not found when the positioning file looks for it, but is ingested before
+        # the positioning file is parked: the check after parking finds its game and ingests the file.
+        monkeypatch.setattr(main.boto3, 'client', lambda *args, **kwargs: None)
+        monkeypatch.setattr(main, 'get_csv', lambda event, s3: (io.StringIO(''), FILE_NAME))
+        monkeypatch.setattr(main, 'find_game_teams', lambda conn, key: TEAMS if key == GAME_KEY else None)
+        self.results = [None, {'file_type': 'player positioning'}]
+        event = {'Records': [{'s3': {'bucket': {'name': 'trackman-data'}, 'object': {'key': KEY, 'eTag': 'etag-1', 'size': 8}}}]}
+        ingest_event(event, None)
+        assert ingested == [(FILE_NAME, None), (FILE_NAME, TEAMS)]
+        assert parked_positioning_files(conn, GAME_KEY) == []
+
+    def test_positioning_file_waits_for_the_staged_pitch_file(self, conn, ingested, monkeypatch):
+        # in two-stage mode the pitch data file is only staged: the positioning file arriving before stage two
+        # applies it is parked instead of creating the game, and is ingested once stage two has applied it.
+        monkeypatch.setattr(main, 'INGEST_STAGED', '1')
+        monkeypatch.setattr(main.boto3, 'client', lambda *args, **kwargs: None)
+        monkeypatch.setattr(main, 'get_csv', lambda event, s3: (io.StringIO(''), FILE_NAME))
+        monkeypatch.setattr(main, 'find_game_teams', lambda conn, key: None)
+        event = {'Records': [{'s3': {'bucket': {'name': 'trackman-data'}, 'object': {'key': KEY, 'eTag': 'etag-1', 'size': 8}}}]}
+        ingest_event(event, None)
+        assert ingested == []
+        assert parked_positioning_files(conn, GAME_KEY) == [('trackman-data', KEY)]
+        self.results = [{'file_type': 'player positioning'}]
+        ingest_parked_positioning_files(conn, GAME_KEY, TEAMS, None) # as finish_staged_game does
+        assert ingested == [(FILE_NAME, TEAMS)]
+        assert parked_positioning_files(conn, GAME_KEY) == []
+
+    def test_positioning_file_of_an_applied_game_is_ingested(self, conn, ingested, monkeypatch):
+        monkeypatch.setattr(main, 'INGEST_STAGED', '1')
+        monkeypatch.setattr(main.boto3, 'client', lambda *args, **kwargs: None)
+        monkeypatch.setattr(main, 'get_csv', lambda event, s3: (io.StringIO(''), FILE_NAME))
+        monkeypatch.setattr(main, 'find_game_teams', lambda conn, key: TEAMS)
+        self.results = [{'file_type': 'player positioning'}]
+        event = {'Records': [{'s3': {'bucket': {'name': 'trackman-data'}, 'object': {'key': KEY, 'eTag': 'etag-1', 'size': 8}}}]}
+        ingest_event(event, None)
+        assert ingested == [(FILE_NAME, TEAMS)]
+        assert parked_positioning_files(conn, GAME_KEY) == []
@@ -0,0 +1,57 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+from functions.process_trackman.image.src.plate_appearances import (
+    compute_plate_appearances, PlateAppearanceAccumulator, PLATE_APPEARANCE_COLUMNS
+)
+import pandas as pd
+
+
+class TestComputePlateAppearances:
+    # a strikeout, a walk cut short by the end of the inning's half, and a single; the file is out of order
+    df = pd.DataFrame({
+        'PitchNo': [3.0, 1.0, 2.0, 4.0, 5.0, 6.0],
+        'Inning': [1.0, 1.0, 1.0, 1.0, 1.0, 1.0],
+        'Top/Bottom': ['Top', 'Top', 'Top', 'Top', 'Top', 'Bottom'],
+        'PAofInning': [1.0, 1.0, 1.0, 2.0, 2.0, 1.0],
+        'PitchofPA': [3.0, 1.0, 2.0, 1.0, 2.0, 1.0],
+        'Balls': [0.0, 0.0, 0.0, 0.0, 1.0, 0.0],
+        'Strikes': [2.0, 0.0, 1.0, 0.0, 0.0, 0.0],
+        'Outs': [0.0, 0.0, 0.0, 1.0, 1.0, 0.0],
+        'PitchCall': ['StrikeSwinging', 'StrikeCalled', 'FoulBall', 'BallCalled', 'BallCalled', 'InPlay'],
+        'KorBB': ['Strikeout', 'Undefined', 'Undefined', 'Undefined', 'Undefined', 'Undefined'],
+        'PlayResult': ['Undefined', 'Undefined', 'Undefined', 'Undefined', 'Undefined', 'Single'],
+        'OutsOnPlay': [0.0, 0.0, 0.0, 0.0, 1.0, 0.0],
+        'RunsScored': [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+    })
+    pitcher_ids = ['p1', 'p1', 'p1', 'p1', 'p1', 'p2']
+    batter_ids = ['b1', 'b1', 'b1', 'b2', 'b2', 'b3']
+
+    def plate_appearances(self):
+        rows = compute_plate_appearances(self.df, self.pitcher_ids, self.batter_ids)
+        return [dict(zip(PLATE_APPEARANCE_COLUMNS, row)) for row in rows]
+
+    def test_plate_appearances_follow_pitch_order(self):
+        strikeout, walk, single = self.plate_appearances()
+        assert (strikeout['pa_number'], strikeout['batter_id']) == (1, 'b1')
+        assert (strikeout['first_pitch_number'], strikeout['last_pitch_number'], strikeout['pitch_count']) == (1, 3, 3)
+        assert strikeout['result'] == 'Strikeout'
+        assert (strikeout['end_balls'], strikeout['end_strikes']) == (0, 2)
+        assert strikeout['strikes_sequence'] == [0, 1, 2]
+        assert strikeout['pitch_calls'] == ['StrikeCalled', 'FoulBall', 'StrikeSwinging']
+        assert (single['pa_number'], single['top_or_bottom'], single['pitcher_id'], single['result']) == (3, 'Bottom', 'p2', 'Single')
+
+    def test_unfinished_plate_appearance_has_no_result(self):
+        _, walk, _ = self.plate_appearances()
+        assert walk['result'] is None
+        assert walk['balls_sequence'] == [0, 1]
+        assert walk['outs_on_play'] == 1 # ex: a caught stealing ended the half inning
+
+    def test_new_plate_appearance_when_pitch_of_pa_restarts(self):
+        df = self.df.assign(PAofInning=1.0, **{'Top/Bottom': 'Top'})
+        assert len(compute_plate_appearances(df, self.pitcher_ids, self.batter_ids)) == 3
+
+    def test_accumulator_matches_dataframe_plate_appearances(self):
+        accumulator = PlateAppearanceAccumulator()
+        records = self.df.astype(object).where(self.df.notna(), None).to_dict('records')
+        for pitcher_id, batter_id, record in zip(self.pitcher_ids, self.batter_ids, records):
+            accumulator.add(pitcher_id, batter_id, record)
+        assert accumulator.plate_appearances() == compute_plate_appearances(self.df, self.pitcher_ids, self.batter_ids)
@@ -0,0 +1,53 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+from functions.process_trackman.image.src.main import connect_to_db, get_or_insert_player, get_or_insert_team_id, player_name_key
+import psycopg2
+import pytest
+
+TEAM = 'ZZN'
+SPELLINGS = ['Smith, John', 'John Smith', '  SMITH,   john ', 'John Smith', 'smith ,john']
+
+
+class TestPlayerNameKey:
+    @pytest.mark.parametrize('name', SPELLINGS)
+    def test_spelling_variants_share_a_key(self, name):
+        assert player_name_key(name) == 'john smith'
+
+    def test_names_without_a_single_comma_keep_their_order(self):
+        assert player_name_key('De La Cruz Jr.') == 'de la cruz jr.'
+        assert player_name_key('Cruz, Jr., Oneil') == 'cruz, jr., oneil'
+
+    def test_missing_names_have_no_key(self):
+        assert player_name_key(None) is None
+        assert player_name_key(' , ') is None
+
+
+class TestPlayerLookup:
+    @pytest.fixture(autouse=True)
+    def conn(self):
+        try:
+            conn = connect_to_db()
+        except (KeyError, psycopg2.OperationalError): # DB_* variables unset, or no server
+            pytest.skip('needs a Postgres database configured in .env')
+        self.team_id = get_or_insert_team_id(TEAM, conn)
+        self.cleanup(conn)
+        yield conn
+        self.cleanup(conn)
+        conn.close()
+
+    def cleanup(self, conn):
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM player WHERE team_id = %s;", (self.team_id,))
+        conn.commit()
+
+    def test_sql_key_matches_python_key(self, conn):
+        cursor = conn.cursor()
+        for name in SPELLINGS + ['De La Cruz Jr.', 'Cruz, Jr., Oneil', ' , ']:
+            cursor.execute("SELECT player_name_key(%s);", (name,))
+            assert cursor.fetchone()[0] == player_name_key(name)
+
+    def test_spelling_variants_resolve_to_one_player(self, conn):
+        player_ids = {get_or_insert_player(name, 'Right', TEAM, 'pitcher', conn) for name in SPELLINGS}
+        assert len(player_ids) == 1
+        cursor = conn.cursor()
+        cursor.execute("SELECT player_name FROM player WHERE team_id = %s;", (self.team_id,))
+        assert cursor.fetchall() == [(SPELLINGS[0],)]
@@ -1,5 +1,5 @@
 # To run test from terminal: py -m pytest the/test/location.py -s
-from functions.process_trackman.image.src.main import connect_to_db, get_csv, get_game_info, handler, determine_game_id, get_or_insert_player  
+from functions.process_trackman.image.src.main import connect_to_db, get_csv, get_game_info, handler, determine_game_id, get_or_insert_player, process_csv
 import sys
 import os
 import pytest
@@ -108,13 +108,41 @@ class TestDetermineGameIDAndInsertData:
 
 
     def call_determine_game_id(self, file_path):
+        return self.call_determine_game(file_path)['game_id']
+
+
+    def call_determine_game(self, file_path):
+        """Return the game details of the event's file, as determine_game_id leaves them."""
         event = open(os.path.join(test_dir, file_path))
         data = json.load(event)
         file, file_name = get_csv(data, s3)
         df = pd.read_csv(file)
         game = get_game_info(file_name, df, self.conn, s3)
-        return determine_game_id(file_name, self.conn, df, game, s3)
-        
+        game['game_id'] = determine_game_id(file_name, self.conn, df, game, s3)
+        return game
+
+
+    def read_event_csv(self, file_path):
+        """Return the event's file as a dataframe, with its file name."""
+        data = json.load(open(os.path.join(test_dir, file_path)))
+        file, file_name = get_csv(data, s3)
+        return pd.read_csv(file), file_name
+
+
+    def call_process_csv(self, df, file_name):
+        return process_csv(StringIO(df.to_csv(index=False)), file_name, self.conn, s3)
+
+
+    def get_pitch_speeds(self, cursor, game_ids):
+        cursor.execute(
+            """
+            SELECT pitch_number, rel_speed FROM pitch
+            WHERE game_id = %s;
+            """,
+            (game_ids[0][0],)
+        )
+        return dict(cursor.fetchall())
+
 
     def test_determine_playerpos_gameid_unverified_pitching_exists(self):
         cursor = self.conn.cursor()
@@ -161,15 +189,49 @@ class TestDetermineGameIDAndInsertData:
 
     def test_determine_verified_gameid_unverified_exists(self):
         cursor = self.conn.cursor()
-        self.call_determine_game_id('test_events/unverified_pitching_test.json')
+        self.call_process_csv(*self.read_event_csv('test_events/unverified_pitching_test.json'))
         verified_game_ids = None
         unverified_game_ids = None
         try:
             unverified_game_ids = self.get_game_ids(cursor, 'LAN', 'LI', 'ClipperMagazine', False, '2024-06-29', 1)
             assert len(unverified_game_ids) == 1
-            self.call_determine_game_id('test_events/verified_pitching_test.json')
+            # determine_game_id only flags the game; it is verified when the verified rows are swapped in
+            game = self.call_determine_game('test_events/verified_pitching_test.json')
+            assert game['replaces_unverified']
+            assert (game['game_id'],) == unverified_game_ids[0]
+            assert self.get_game_ids(cursor, 'LAN', 'LI', 'ClipperMagazine', False, '2024-06-29', 1) == unverified_game_ids
+
+            # the verified file drops the last pitch and re-measures the first one
+            df, file_name = self.read_event_csv('test_events/verified_pitching_test.json')
+            df = df.iloc[:-1].copy()
+            df.loc[df.index[0], 'RelSpeed'] = 99.5
+            self.call_process_csv(df, file_name)
+            verified_game_ids = self.get_game_ids(cursor, 'LAN', 'LI', 'ClipperMagazine', True, '2024-06-29', 1)
+            assert verified_game_ids == unverified_game_ids
+            pitch_speeds = self.get_pitch_speeds(cursor, verified_game_ids)
+            assert sorted(pitch_speeds) == sorted(df['PitchNo'])
+            assert pitch_speeds[df['PitchNo'].iloc[0]] == 99.5
+        finally:
+            self.delete_data_by_game_id(cursor, unverified_game_ids)
+            self.delete_data_by_game_id(cursor, verified_game_ids)
+
+
+    def test_verified_file_repeating_a_pitch_number_is_swapped_in(self):
+        cursor = self.conn.cursor()
+        self.call_process_csv(*self.read_event_csv('test_events/unverified_pitching_test.json'))
+        verified_game_ids = None
+        unverified_game_ids = None
+        try:
+            unverified_game_ids = self.get_game_ids(cursor, 'LAN', 'LI', 'ClipperMagazine', False, '2024-06-29', 1)
+            df, file_name = self.read_event_csv('test_events/verified_pitching_test.json')
+            # the first pitch is sent again at the end of the file, re-measured; the last row wins
+            df = pd.concat([df, df.iloc[[0]].assign(RelSpeed=99.5)], ignore_index=True)
+            self.call_process_csv(df, file_name)
             verified_game_ids = self.get_game_ids(cursor, 'LAN', 'LI', 'ClipperMagazine', True, '2024-06-29', 1)
-            assert unverified_game_ids == verified_game_ids
+            assert verified_game_ids == unverified_game_ids
+            pitch_speeds = self.get_pitch_speeds(cursor, verified_game_ids)
+            assert len(pitch_speeds) == df['PitchNo'].nunique()
+            assert pitch_speeds[df['PitchNo'].iloc[0]] == 99.5
         finally:
             self.delete_data_by_game_id(cursor, unverified_game_ids)
             self.delete_data_by_game_id(cursor, verified_game_ids)
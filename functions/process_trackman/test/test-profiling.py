@@ -0,0 +1,28 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+from functions.process_trackman.image.src.profiling import profile_invocation
+import pstats
+
+KEY = '2024/06/30/CSV/20240629-ClipperMagazine-1.csv'
+EVENT = {'Records': [{'s3': {'bucket': {'name': 'trackman-data'}, 'object': {'key': KEY}}}]}
+
+
+def ingest(event, context):
+    return sum(range(1000))
+
+
+class TestProfileInvocation:
+    def profile_files(self, tmp_path, mode, monkeypatch):
+        monkeypatch.setenv('PROFILE_DIR', str(tmp_path))
+        assert profile_invocation(ingest, EVENT, None, mode) == sum(range(1000))
+        profile_dir = tmp_path / 'profiles' / KEY
+        return sorted(profile_dir.iterdir())
+
+    def test_cpu_profile_is_written_under_the_file_key(self, tmp_path, monkeypatch):
+        stats_file, report_file = self.profile_files(tmp_path, 'cpu', monkeypatch)
+        assert stats_file.suffix == '.pstats' and report_file.suffix == '.txt'
+        assert pstats.Stats(str(stats_file)).total_calls > 0
+        assert 'allocation sites' not in report_file.read_text()
+
+    def test_memory_profile_reports_allocations(self, tmp_path, monkeypatch):
+        _, report_file = self.profile_files(tmp_path, 'memory', monkeypatch)
+        assert 'Peak traced memory' in report_file.read_text()
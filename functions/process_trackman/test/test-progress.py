@@ -0,0 +1,115 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+# Needs a Postgres database (ex: a local one) configured in .env.
+from functions.process_trackman.image.src import main
+from functions.process_trackman.image.src.main import connect_to_db, enqueue_continuation, MAX_INGEST_CONTINUATIONS
+from functions.process_trackman.image.src.progress import IngestionProgress, TimeBudgetExhausted, TIME_BUDGET_MARGIN_MS
+import json
+import psycopg2
+import pytest
+
+KEY = 'test/20990629-TestBallpark-1.csv'
+EVENT = {'Records': [{'s3': {'bucket': {'name': 'trackman-data'}, 'object': {'key': KEY, 'eTag': 'etag-1'}}}]}
+
+
+class TestIngestionProgress:
+    @pytest.fixture(autouse=True)
+    def conn(self):
+        try:
+            conn = connect_to_db()
+        except (KeyError, psycopg2.OperationalError): # DB_* variables unset, or no server
+            pytest.skip('needs a Postgres database configured in .env')
+        self.cleanup(conn)
+        yield conn
+        self.cleanup(conn)
+        conn.close()
+
+    def cleanup(self, conn):
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM ingestion_progress WHERE s3_key = %s;", (KEY,))
+        conn.commit()
+
+    def commit_chunks(self, conn, progress, *row_counts):
+        cursor = conn.cursor()
+        for row_count in row_counts:
+            progress.checkpoint(cursor, row_count)
+            conn.commit()
+            progress.chunk_committed(row_count)
+
+    def test_interrupted_run_resumes_after_last_committed_chunk(self, conn):
+        self.commit_chunks(conn, IngestionProgress(conn, KEY, 'etag-1'), 500, 500)
+        progress = IngestionProgress(conn, KEY, 'etag-1')
+        assert progress.resuming
+        assert (progress.last_committed_chunk, progress.committed_rows) == (2, 1000)
+
+    def test_uncommitted_checkpoint_is_not_resumed(self, conn):
+        progress = IngestionProgress(conn, KEY, 'etag-1')
+        self.commit_chunks(conn, progress, 500)
+        progress.checkpoint(conn.cursor(), 500)
+        conn.rollback()
+        assert IngestionProgress(conn, KEY, 'etag-1').committed_rows == 500
+
+    def test_new_etag_starts_over(self, conn):
+        self.commit_chunks(conn, IngestionProgress(conn, KEY, 'etag-1'), 500)
+        progress = IngestionProgress(conn, KEY, 'etag-2')
+        assert not progress.resuming
+        assert progress.committed_rows == 0
+
+    def test_completed_run_starts_over(self, conn):
+        progress = IngestionProgress(conn, KEY, 'etag-1')
+        self.commit_chunks(conn, progress, 500)
+        progress.complete()
+        assert not IngestionProgress(conn, KEY, 'etag-1').resuming
+
+    def test_out_of_time_stops_after_the_committed_chunk(self, conn):
+        remaining = [TIME_BUDGET_MARGIN_MS + 1000]
+        progress = IngestionProgress(conn, KEY, 'etag-1', lambda: remaining[0])
+        self.commit_chunks(conn, progress, 500)
+        remaining[0] = TIME_BUDGET_MARGIN_MS - 1
+        with pytest.raises(TimeBudgetExhausted) as exhausted:
+            self.commit_chunks(conn, progress, 500, 500)
+        assert exhausted.value.committed_rows == 1000
+        progress = IngestionProgress(conn, KEY, 'etag-1')
+        assert progress.resuming and progress.committed_rows == 1000
+
+    def test_failed_version_bump_leaves_the_file_to_retry(self, conn, monkeypatch):
+        def publish_entity_versions(cursor, entities):
+            raise psycopg2.OperationalError('server closed the connection unexpectedly')
+
+        monkeypatch.setattr(main, 'process_csv_light', lambda *args: {'game_id': None, 'file_type': 'pitch data'})
+        monkeypatch.setattr(main, 'game_entities', lambda cursor, game_id: {})
+        monkeypatch.setattr(main, 'publish_entity_versions', publish_entity_versions)
+        progress = IngestionProgress(conn, KEY, 'etag-1')
+        self.commit_chunks(conn, progress, 500)
+        with pytest.raises(psycopg2.OperationalError):
+            main.ingest_csv(None, KEY, True, conn, None, progress=progress)
+        assert IngestionProgress(conn, KEY, 'etag-1').resuming
+
+
+class LambdaContext:
+    invoked_function_arn = 'arn:aws:lambda:us-east-2:123456789012:function:process-trackman'
+
+
+class TestEnqueueContinuation:
+    @pytest.fixture(autouse=True)
+    def invocations(self, monkeypatch):
+        invocations = []
+
+        class LambdaClient:
+            def invoke(self, **kwargs):
+                invocations.append(kwargs)
+
+        monkeypatch.setattr(main.boto3, 'client', lambda service: LambdaClient())
+        return invocations
+
+    def test_same_event_is_reinvoked_with_resume_offset(self, invocations):
+        enqueue_continuation(EVENT, LambdaContext(), 1500)
+        invocation, = invocations
+        assert (invocation['FunctionName'], invocation['InvocationType']) == (LambdaContext.invoked_function_arn, 'Event')
+        payload = json.loads(invocation['Payload'])
+        assert payload['Records'] == EVENT['Records']
+        assert payload['continuation'] == {'count': 1, 'committed_rows': 1500}
+
+    def test_continuations_are_capped(self, invocations):
+        event = dict(EVENT, continuation={'count': MAX_INGEST_CONTINUATIONS, 'committed_rows': 1500})
+        enqueue_continuation(event, LambdaContext(), 2000)
+        assert invocations == []
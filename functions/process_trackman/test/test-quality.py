@@ -0,0 +1,37 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+from functions.process_trackman.image.src.quality import compute_file_profile, FileProfileAccumulator
+import pandas as pd
+
+NUMERIC_COLUMNS = ('PitchNo', 'SpinRate')
+
+
+class TestFileProfile:
+    df = pd.DataFrame({
+        'PitchNo': [1.0, 2.0, 2.0, 3.0, None],
+        'Date': ['2024-06-29', None, '2024-06-29', '2024-06-29', '2024-06-29'],
+        'PitchCall': ['StrikeCalled', 'Undefined', 'InPlay', 'Undefined', 'BallCalled'],
+        'SpinRate': [2300.0, None, 2500.0, 1800.0, None],
+    }).astype(object)
+
+    def records(self):
+        return self.df.where(self.df.notna(), None).to_dict('records')
+
+    def test_profile(self):
+        profile = compute_file_profile(self.df, NUMERIC_COLUMNS)
+        assert profile['row_count'] == 5
+        assert profile['duplicate_pitch_numbers'] == 1
+        assert profile['missing_date_rows'] == 1
+        assert profile['undefined_pitch_call_rows'] == 2
+        assert profile['missing_spin_rate_rows'] == 2
+        assert profile['columns']['SpinRate'] == {'null_rate': 0.4, 'min': 1800.0, 'max': 2500.0}
+        assert profile['columns']['PitchCall'] == {'null_rate': 0.0, 'sentinels': 2}
+        assert profile['columns']['Date'] == {'null_rate': 0.2}
+
+    def test_accumulator_matches_dataframe_profile(self):
+        accumulator = FileProfileAccumulator(NUMERIC_COLUMNS)
+        assert list(accumulator.observe(self.records())) == self.records()
+        assert accumulator.profile() == compute_file_profile(self.df, NUMERIC_COLUMNS)
+
+    def test_all_null_numeric_column_has_no_range(self):
+        df = pd.DataFrame({'PitchNo': [1.0, 2.0], 'SpinRate': [None, None]}).astype(object)
+        assert compute_file_profile(df, NUMERIC_COLUMNS)['columns']['SpinRate'] == {'null_rate': 1.0, 'min': None, 'max': None}
@@ -0,0 +1,84 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+from functions.process_trackman.image.src.main import connect_to_db, get_or_insert_player, get_or_insert_team_id
+from functions.process_trackman.image.src.season_stats import (
+    apply_stat_deltas, compute_stat_deltas, StatDeltaAccumulator, SEASON_COUNTERS
+)
+import pandas as pd
+import psycopg2
+import pytest
+
+TEAM = 'ZZS'
+
+
+class TestComputeStatDeltas:
+    df = pd.DataFrame({
+        'PitchCall': ['StrikeSwinging', 'InPlay', 'InPlay', 'BallCalled'],
+        'KorBB': ['Strikeout', 'Undefined', 'Undefined', 'Walk'],
+        'ExitSpeed': [None, 101.2, 80.0, None],
+    })
+    pitcher_ids = ['p1', 'p1', 'p2', 'p2']
+    batter_ids = ['b1', 'b2', 'b1', None]
+
+    def deltas(self, rows):
+        return {(player_id, role): dict(zip(SEASON_COUNTERS, counters)) for player_id, role, *counters in rows}
+
+    def test_counters_per_player_and_role(self):
+        deltas = self.deltas(compute_stat_deltas(self.df, self.pitcher_ids, self.batter_ids))
+        assert deltas[('p1', 'pitcher')] == {'pitch_count': 2, 'strikeouts': 1, 'walks': 0, 'balls_in_play': 1, 'hard_hit_balls': 1}
+        assert deltas[('p2', 'pitcher')] == {'pitch_count': 2, 'strikeouts': 0, 'walks': 1, 'balls_in_play': 1, 'hard_hit_balls': 0}
+        assert deltas[('b1', 'batter')] == {'pitch_count': 2, 'strikeouts': 1, 'walks': 0, 'balls_in_play': 1, 'hard_hit_balls': 0}
+        assert set(deltas) == {('p1', 'pitcher'), ('p2', 'pitcher'), ('b1', 'batter'), ('b2', 'batter')}
+
+    def test_accumulator_matches_dataframe_deltas(self):
+        accumulator = StatDeltaAccumulator()
+        records = self.df.astype(object).where(self.df.notna(), None).to_dict('records')
+        for pitcher_id, batter_id, record in zip(self.pitcher_ids, self.batter_ids, records):
+            accumulator.add(pitcher_id, batter_id, record)
+        assert sorted(accumulator.deltas()) == sorted(compute_stat_deltas(self.df, self.pitcher_ids, self.batter_ids))
+
+
+class TestApplyStatDeltas:
+    @pytest.fixture(autouse=True)
+    def conn(self):
+        try:
+            conn = connect_to_db()
+        except (KeyError, psycopg2.OperationalError): # DB_* variables unset, or no server
+            pytest.skip('needs a Postgres database configured in .env')
+        team_id = get_or_insert_team_id(TEAM, conn)
+        self.pitcher_id = get_or_insert_player('Delta, Pitcher', 'Right', TEAM, 'pitcher', conn)
+        self.batter_id = get_or_insert_player('Delta, Batter', 'Left', TEAM, 'batter', conn)
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO game (home_team_id, visiting_team_id, verified, date, daily_game_number) VALUES (%s, %s, true, '2099-06-29', 1), (%s, %s, true, '2099-06-30', 1) RETURNING game_id;",
+            (team_id, team_id, team_id, team_id)
+        )
+        self.game_ids = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+        yield conn
+        cursor.execute("DELETE FROM game WHERE game_id IN %s;", (tuple(self.game_ids),))
+        cursor.execute("DELETE FROM player WHERE player_id IN %s;", ((self.pitcher_id, self.batter_id),))
+        conn.commit()
+        conn.close()
+
+    def season(self, conn, player_id, role):
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT {', '.join(SEASON_COUNTERS)} FROM season_player_stats WHERE player_id = %s AND season = 2099 AND role = %s;",
+            (player_id, role)
+        )
+        return cursor.fetchone()
+
+    def test_reingesting_a_game_replaces_its_contribution(self, conn):
+        first_game, second_game = self.game_ids
+        apply_stat_deltas(conn, first_game, [(self.pitcher_id, 'pitcher', 10, 2, 1, 3, 1), (self.batter_id, 'batter', 4, 1, 0, 1, 0)])
+        apply_stat_deltas(conn, second_game, [(self.pitcher_id, 'pitcher', 5, 1, 0, 2, 2)])
+        assert self.season(conn, self.pitcher_id, 'pitcher') == (15, 3, 1, 5, 3)
+
+        # the corrected first game no longer has the batter and counts one more pitch
+        apply_stat_deltas(conn, first_game, [(self.pitcher_id, 'pitcher', 11, 2, 1, 3, 1)])
+        assert self.season(conn, self.pitcher_id, 'pitcher') == (16, 3, 1, 5, 3)
+        assert self.season(conn, self.batter_id, 'batter') == (0, 0, 0, 0, 0)
+
+        # re-applying the same delta changes nothing
+        apply_stat_deltas(conn, first_game, [(self.pitcher_id, 'pitcher', 11, 2, 1, 3, 1)])
+        assert self.season(conn, self.pitcher_id, 'pitcher') == (16, 3, 1, 5, 3)
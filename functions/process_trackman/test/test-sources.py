@@ -0,0 +1,63 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+from functions.process_trackman.image.src import sources
+from functions.process_trackman.image.src.sources import LocalSource, S3Source, trackman_source
+from functions.process_trackman.image.src.compression import open_text_stream
+import gzip
+import os
+import pytest
+
+KEY = '2024/06/30/CSV/20240629-ClipperMagazine-1.csv'
+CSV = 'PitchNo,HomeTeam,AwayTeam\n1,YOR_REV2,LAN\n'
+
+
+class TestLocalSource:
+    @pytest.fixture
+    def root(self, tmp_path):
+        path = tmp_path.joinpath(*KEY.split('/'))
+        path.parent.mkdir(parents=True)
+        path.write_text(CSV)
+        return tmp_path
+
+    def test_file_is_read_at_its_bucket_key(self, root):
+        body, etag, size = LocalSource(str(root)).get(KEY)
+        assert size == len(CSV)
+        assert open_text_stream(body, KEY).read() == CSV
+
+    def test_compressed_file_is_decompressed_by_the_parser(self, root):
+        root.joinpath(*(KEY + '.gz').split('/')).write_bytes(gzip.compress(CSV.encode()))
+        body, _, _ = LocalSource(str(root)).get(KEY + '.gz')
+        assert open_text_stream(body, KEY + '.gz').read() == CSV
+
+    def test_edited_file_gets_a_new_etag(self, root):
+        source = LocalSource(str(root))
+        _, etag, _ = source.get(KEY)
+        path = root.joinpath(*KEY.split('/'))
+        path.write_text(CSV + '2,YOR,LAN\n')
+        os.utime(path, ns=(1, 1))
+        assert source.get(KEY)[1] != etag
+
+    def test_empty_and_missing_files(self, root):
+        root.joinpath(*KEY.split('/')).write_text('')
+        body, _, size = LocalSource(str(root)).get(KEY)
+        assert (body.read(), size) == (b'', 0)
+        with pytest.raises(FileNotFoundError):
+            LocalSource(str(root)).get(KEY.replace('-1', '-2'))
+
+
+class TestS3Source:
+    class S3:
+        def get_object(self, Bucket, Key):
+            return {'Body': None, 'ETag': '"d41d8cd98f00b204e9800998ecf8427e"', 'ContentLength': 0}
+
+    def test_etag_matches_the_event_record(self):
+        # S3 event records carry the ETag unquoted; get_object quotes it
+        _, etag, _ = S3Source('trackman-data', self.S3()).get(KEY)
+        assert etag == 'd41d8cd98f00b204e9800998ecf8427e'
+
+
+class TestTrackmanSource:
+    def test_local_directory_replaces_the_bucket_when_set(self, monkeypatch, tmp_path):
+        assert isinstance(trackman_source('trackman-data', None), S3Source)
+        monkeypatch.setattr(sources, 'TRACKMAN_SOURCE_DIR', str(tmp_path))
+        source = trackman_source('trackman-data', None)
+        assert isinstance(source, LocalSource) and source.root == str(tmp_path)
@@ -0,0 +1,100 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+from functions.process_trackman.image.src.staging import (
+    write_staged_game, read_staged_game, list_staged_games, copy_rows, copy_rows_concurrently, staged_key, STAGING_PREFIX
+)
+import io
+
+KEY = '2024/06/30/CSV/20240629-ClipperMagazine-1.csv'
+
+
+class S3:
+    """ In-memory stand-in for the S3 client calls staging.py makes. """
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[Key] = Body
+
+    def get_object(self, Bucket, Key):
+        return {'Body': io.BytesIO(self.objects[Key])}
+
+    def get_paginator(self, name):
+        objects = self.objects
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix):
+                yield {'Contents': [{'Key': key, 'ETag': f'"{len(body)}"'} for key, body in sorted(objects.items()) if key.startswith(Prefix)]}
+
+        return Paginator()
+
+
+class Cursor:
+    def copy_expert(self, sql, file):
+        self.sql, self.copied = sql, file.read()
+
+
+class Connection:
+    def __init__(self):
+        self.cursors, self.committed, self.closed = [], False, False
+
+    def cursor(self):
+        self.cursors.append(Cursor())
+        return self.cursors[-1]
+
+    def commit(self):
+        self.committed = True
+
+    def close(self):
+        self.closed = True
+
+
+class TestStagedGame:
+    records = [
+        {'PitchNo': 1.0, 'Pitcher': 'Doe, John', 'Date': '2024-06-29', 'SpinRate': 2301.5},
+        {'PitchNo': 2.0, 'Pitcher': 'Doe, John', 'Date': '2024-06-29', 'SpinRate': None},
+    ]
+    columns = ['PitchNo', 'Pitcher', 'Date', 'SpinRate']
+
+    def test_records_and_header_round_trip(self):
+        s3 = S3()
+        header = lambda: {'file_name': '20240629-ClipperMagazine-1.csv', 'profile': {'row_count': 2}}
+        assert write_staged_game(s3, 'bucket', KEY, header, self.columns, iter(self.records)) == 2
+        header, records = read_staged_game(s3.get_object(Bucket='bucket', Key=staged_key(KEY))['Body'])
+        assert header == {'file_name': '20240629-ClipperMagazine-1.csv', 'profile': {'row_count': 2}, 'columns': self.columns}
+        assert list(records) == self.records
+
+    def test_header_is_built_after_the_records(self):
+        s3 = S3()
+        consumed = []
+        records = (consumed.append(record) or record for record in self.records)
+        write_staged_game(s3, 'bucket', KEY, lambda: {'row_count': len(consumed)}, self.columns, records)
+        header, _ = read_staged_game(s3.get_object(Bucket='bucket', Key=staged_key(KEY))['Body'])
+        assert header['row_count'] == 2
+
+    def test_only_staged_games_are_listed(self):
+        s3 = S3()
+        for key in (KEY, KEY.replace('-1', '-2')):
+            write_staged_game(s3, 'bucket', key, dict, self.columns, self.records)
+        s3.put_object(Bucket='bucket', Key=KEY, Body=b'')
+        staged = list_staged_games(s3, 'bucket', limit=1)
+        assert [key for key, _ in staged] == [staged_key(KEY)]
+        assert all(key.startswith(STAGING_PREFIX) for key, _ in list_staged_games(s3, 'bucket', limit=10))
+
+
+class TestCopyRows:
+    def test_nulls_whole_floats_and_quoting(self):
+        cursor = Cursor()
+        rows = [(1.0, 'Doe, John', None, 2301.5), (2.0, 'Say "hi"', None, 1e-05)]
+        assert copy_rows(cursor, 'pitch_bulk_staging', ('pitch_number', 'notes', 'spin_axis', 'spin_rate'), rows) == 2
+        assert cursor.sql == 'COPY pitch_bulk_staging (pitch_number, notes, spin_axis, spin_rate) FROM STDIN WITH (FORMAT csv)'
+        assert cursor.copied == '1,"Doe, John",,2301.5\n2,"Say ""hi""",,1e-05\n'
+
+    def test_each_part_is_copied_to_its_own_table_over_its_own_connection(self):
+        connections = []
+        connect = lambda: connections.append(Connection()) or connections[-1]
+        parts = [[(1.0, 'a')], [(2.0, 'b'), (3.0, 'c')]]
+        assert copy_rows_concurrently(connect, ['load_0', 'load_1'], ('pitch_number', 'notes'), parts) == 3
+        copied = {conn.cursors[0].sql.split()[1]: conn.cursors[0].copied for conn in connections}
+        assert copied == {'load_0': '1,a\n', 'load_1': '2,b\n3,c\n'}
+        assert all(conn.committed and conn.closed for conn in connections)
@@ -0,0 +1,80 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+from functions.process_trackman.image.src.summaries import compute_game_summaries, GameSummaryAccumulator, SUMMARY_STATS
+from functions.process_trackman.image.src.main import last_pitch_records
+import pandas as pd
+
+
+class TestComputeGameSummaries:
+    df = pd.DataFrame({
+        'TaggedPitchType': ['Fastball', 'Fastball', 'Slider', None],
+        'PitchCall': ['StrikeCalled', 'BallCalled', 'InPlay', 'FoulBall'],
+        'RelSpeed': [95.0, 93.0, 84.0, None],
+        'ExitSpeed': [None, None, 101.5, None],
+        'SpinRate': [2300.0, 2250.0, 2500.0, 2400.0],
+    })
+    pitcher_ids = ['p1', 'p1', 'p2', None]
+
+    def stats(self, row):
+        return dict(zip(SUMMARY_STATS, row))
+
+    def test_game_summary(self):
+        game_row, _, _ = compute_game_summaries(self.df, self.pitcher_ids)
+        stats = self.stats(game_row)
+        assert stats['pitch_count'] == 4
+        assert stats['strike_count'] == 3
+        assert stats['ball_count'] == 1
+        assert stats['max_rel_speed'] == 95.0
+        assert stats['avg_rel_speed'] == (95.0 + 93.0 + 84.0) / 3
+        assert stats['max_exit_speed'] == 101.5
+
+    def test_pitcher_summary_skips_unknown_pitchers(self):
+        _, pitcher_rows, _ = compute_game_summaries(self.df, self.pitcher_ids)
+        by_pitcher = {row[0]: self.stats(row[1:]) for row in pitcher_rows}
+        assert set(by_pitcher) == {'p1', 'p2'}
+        assert by_pitcher['p1']['pitch_count'] == 2
+        assert by_pitcher['p1']['avg_exit_speed'] is None
+
+    def test_pitch_type_summary_labels_missing_type_undefined(self):
+        _, _, pitch_type_rows = compute_game_summaries(self.df, self.pitcher_ids)
+        by_type = {row[0]: self.stats(row[1:]) for row in pitch_type_rows}
+        assert set(by_type) == {'Fastball', 'Slider', 'Undefined'}
+        assert by_type['Fastball']['ball_count'] == 1
+        assert isinstance(by_type['Fastball']['pitch_count'], int)
+
+    def test_accumulator_matches_dataframe_summaries(self):
+        accumulator = GameSummaryAccumulator()
+        records = self.df.astype(object).where(self.df.notna(), None).to_dict('records')
+        for pitcher_id, record in zip(self.pitcher_ids, records):
+            accumulator.add(pitcher_id, record)
+        game_row, pitcher_rows, pitch_type_rows = compute_game_summaries(self.df, self.pitcher_ids)
+        streamed_game_row, streamed_pitcher_rows, streamed_pitch_type_rows = accumulator.summaries()
+        assert streamed_game_row == game_row
+        assert sorted(streamed_pitcher_rows) == sorted(pitcher_rows)
+        assert sorted(streamed_pitch_type_rows) == sorted(pitch_type_rows)
+
+
+class TestRepeatedPitch:
+    # the file sends pitch 1 again at the end, re-called; 'pitch' keeps that last row only
+    df = pd.DataFrame({
+        'PitchNo': [1.0, 2.0, 1.0],
+        'Date': ['2024-06-29'] * 3,
+        'TaggedPitchType': ['Fastball', 'Slider', 'Fastball'],
+        'PitchCall': ['BallCalled', 'InPlay', 'StrikeCalled'],
+        'RelSpeed': [95.0, 84.0, 96.0],
+        'ExitSpeed': [None, 101.5, None],
+        'SpinRate': [2300.0, 2500.0, 2310.0],
+    })
+
+    def test_last_row_of_each_pitch_is_kept_where_it_repeats(self):
+        records = self.df.to_dict('records')
+        assert list(last_pitch_records(iter(records))) == [records[1], records[2]]
+
+    def test_streamed_and_dataframe_summaries_count_the_pitch_once(self):
+        accumulator = GameSummaryAccumulator()
+        for record in last_pitch_records(iter(self.df.astype(object).where(self.df.notna(), None).to_dict('records'))):
+            accumulator.add('p1', record)
+        df = self.df.drop_duplicates(subset=['PitchNo', 'Date'], keep='last') # as handle_pitch_data does
+        game_row, _, _ = compute_game_summaries(df, ['p1'] * len(df))
+        assert accumulator.summaries()[0] == game_row
+        stats = dict(zip(SUMMARY_STATS, game_row))
+        assert (stats['pitch_count'], stats['ball_count'], stats['max_rel_speed']) == (2, 0, 96.0)
@@ -0,0 +1,77 @@
+# To run test from terminal: py -m pytest the/test/location.py -s
+from functions.process_trackman.image.src.validation import (
+    validate_trackman_rows, record_failures, quarantine_records, REASONS_COLUMN, EXTRA_VALUES_COLUMN
+)
+from functions.process_trackman.image.src.main import read_trackman_records
+from csv import DictReader
+from io import StringIO
+import pandas as pd
+
+
+class TestValidateTrackmanRows:
+    def make_df(self, **overrides):
+        data = {
+            'PitchNo': [1, 2, 3],
+            'Balls': [0, 1, 2],
+            'Strikes': [0, 1, 2],
+            'RelSpeed': [92.1, 84.3, 78.0],
+            'SpinRate': [2300.0, 2500.0, None],
+            'PitchCall': ['BallCalled', 'StrikeSwinging', 'InPlay'],
+            'TaggedPitchType': ['Fastball', 'Slider', None],
+        }
+        data.update(overrides)
+        return pd.DataFrame(data)
+
+    def test_clean_frame_passes_through(self):
+        df = self.make_df()
+        clean, rejected = validate_trackman_rows(df)
+        assert len(clean) == 3
+        assert rejected.empty
+
+    def test_out_of_range_count_is_rejected(self):
+        clean, rejected = validate_trackman_rows(self.make_df(Balls=[0, 5, 2]))
+        assert list(clean['PitchNo']) == [1, 3]
+        assert list(rejected['PitchNo']) == [2]
+        assert rejected[REASONS_COLUMN].iloc[0] == 'Balls outside [0, 4]'
+
+    def test_non_numeric_value_is_rejected(self):
+        clean, rejected = validate_trackman_rows(self.make_df(RelSpeed=[92.1, 'fast', 78.0]))
+        assert list(rejected['PitchNo']) == [2]
+        assert 'RelSpeed is not numeric' in rejected[REASONS_COLUMN].iloc[0]
+
+    def test_all_failed_checks_are_reported(self):
+        clean, rejected = validate_trackman_rows(self.make_df(Strikes=[0, 1, 4], PitchCall=['BallCalled', 'StrikeSwinging', 'Bogus']))
+        assert list(rejected['PitchNo']) == [3]
+        assert rejected[REASONS_COLUMN].iloc[0] == 'Strikes outside [0, 3]; PitchCall not a known value'
+
+    def test_missing_pitch_number_is_rejected(self):
+        clean, rejected = validate_trackman_rows(self.make_df(PitchNo=[1, None, 3]))
+        assert len(clean) == 2
+        assert rejected[REASONS_COLUMN].iloc[0] == 'PitchNo is missing'
+
+
+class TestRecordFailures:
+    def test_matches_dataframe_reasons(self):
+        record = {'PitchNo': 3.0, 'Strikes': 4.0, 'RelSpeed': 'fast', 'PitchCall': 'Bogus', 'TaggedPitchType': None}
+        _, rejected = validate_trackman_rows(pd.DataFrame([record]))
+        assert '; '.join(record_failures(record)) == rejected[REASONS_COLUMN].iloc[0]
+
+    def test_clean_record_has_no_failures(self):
+        record = {'PitchNo': 1.0, 'Balls': 0.0, 'SpinRate': None, 'PitchCall': 'InPlay', 'TaggedPitchType': 'Slider'}
+        assert record_failures(record) == []
+
+
+class TestQuarantineRecords:
+    class S3:
+        def put_object(self, Bucket, Key, Body, ContentType):
+            self.key, self.body = Key, Body.decode('utf-8')
+
+    def test_records_with_different_columns_are_all_reported(self, monkeypatch):
+        monkeypatch.setenv('BUCKET', 'trackman-data')
+        # the second row has one cell more than the header
+        records = list(read_trackman_records(StringIO('PitchNo,Strikes\n1,4\n2,5,oops\n')))
+        s3 = self.S3()
+        quarantine_records([('Strikes is out of range', record) for record in records], 'test.csv', s3)
+        report = list(DictReader(StringIO(s3.body)))
+        assert list(report[0]) == [REASONS_COLUMN, 'PitchNo', 'Strikes', EXTRA_VALUES_COLUMN]
+        assert [row[EXTRA_VALUES_COLUMN] for row in report] == ['', "['oops']"]